@@ -1,7 +1,9 @@
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-import streamlit as st
+
+from app.components.plots import dark_layout, show_figure
+from src.data.downsample import downsample_xy
 
 
 def compute_delta_lap(telA, telB):
@@ -31,26 +33,37 @@ def compute_delta_lap(telA, telB):
     return df[["Distance", "DeltaTime"]]
 
 
-def plot_delta_lap(delta_df, driverA, driverB):
+def build_delta_lap(delta_df, driverA, driverB):
     """
-    Plots Δ-time over distance.
+    Interactive Δ-time over distance (downsampled to the chart width).
     Negative values => driver A faster.
     """
+    x, y = downsample_xy(delta_df["Distance"], delta_df["DeltaTime"], method="lttb")
 
-    fig, ax = plt.subplots(figsize=(11, 4))
-    ax.plot(delta_df["Distance"], delta_df["DeltaTime"], linewidth=1.8)
-
-    ax.set_title(f"Delta Lap: {driverA} vs {driverB}", fontsize=14, color="white")
-    ax.set_xlabel("Distance (m)", fontsize=12, color="white")
-    ax.set_ylabel("Delta Time (s)", fontsize=12, color="white")
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=x,
+            y=y,
+            mode="lines",
+            name=f"{driverA} – {driverB}",
+            line=dict(color="#A48FFF", width=1.8),
+        )
+    )
 
     # Zero line for reference
-    ax.axhline(0, color="gray", linewidth=1, linestyle="--")
+    fig.add_hline(y=0, line_color="gray", line_width=1, line_dash="dash")
+
+    fig = dark_layout(fig, f"Delta Lap: {driverA} vs {driverB}")
+    fig.update_layout(height=380, showlegend=False)
+    fig.update_xaxes(title_text="Distance (m)")
+    fig.update_yaxes(title_text="Delta Time (s)")
+    return fig
 
-    # Dark mode styling
-    ax.set_facecolor("#111111")
-    fig.patch.set_facecolor("#111111")
-    ax.tick_params(axis="x", colors="white")
-    ax.tick_params(axis="y", colors="white")
 
-    st.pyplot(fig)
+def plot_delta_lap(delta_df, driverA, driverB, key="delta_lap"):
+    """
+    Plots Δ-time over distance.
+    Negative values => driver A faster.
+    """
+    show_figure(build_delta_lap, delta_df, driverA, driverB, key=key)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+MAX_FIGURES = 256  # serialized specs kept per server process
+
+
+# ---------------------------------------------------------
+# 1. DATA FINGERPRINT
+# ---------------------------------------------------------
+def _update(h, obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        cols = list(obj.columns) if isinstance(obj, pd.DataFrame) else [obj.name]
+        h.update(repr((type(obj).__name__, cols, str(obj.dtypes))).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        except TypeError:
+            # Unhashable cells (lists, dicts): fall back to the pickled frame
+            h.update(pickle.dumps(obj))
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _update(h, item)
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=repr):
+            _update(h, k)
+            _update(h, obj[k])
+    else:
+        h.update(repr(obj).encode())
+
+
+def fingerprint(*parts) -> str:
+    """Content hash of DataFrames, arrays and plain values."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _update(h, part)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------
+# 2. FIGURE STORE
+# ---------------------------------------------------------
+@st.cache_resource
+def _figure_store():
+    """LRU of serialized figures, shared by all sessions of the server."""
+    return OrderedDict(), threading.Lock()
+
+
+def cached_figure_spec(builder, *args, theme=None, **kwargs):
+    """
+    Plotly figure spec (dict) of builder(*args, **kwargs).
+
+    The key is (builder, data fingerprint, theme); the builder only runs
+    when one of them changed, so a rerun with unchanged selections does
+    no plotting work. Returns None if the builder returns None.
+    """
+    key = (builder.__module__, builder.__qualname__, fingerprint(args, kwargs), theme)
+    store, lock = _figure_store()
+
+    with lock:
+        if key in store:
+            store.move_to_end(key)
+            return store[key]
+
+    fig = builder(*args, **kwargs)
+    spec = None if fig is None else json.loads(fig.to_json())
+
+    with lock:
+        store[key] = spec
+        while len(store) > MAX_FIGURES:
+            store.popitem(last=False)
+    return spec
+
+
+def figure_store_size() -> int:
+    """Number of serialized figures currently cached."""
+    store, lock = _figure_store()
+    with lock:
+        return len(store)
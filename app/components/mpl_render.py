@@ -0,0 +1,66 @@
+import io
+import os
+from contextlib import contextmanager
+
+import matplotlib.pyplot as plt
+
+from app.components.figure_cache import figure_store_size
+
+
+# ---------------------------------------------------------
+# 1. FIGURE LIFECYCLE
+# ---------------------------------------------------------
+@contextmanager
+def managed_figure(**subplots_kw):
+    """
+    plt.subplots() whose figure is always closed, also when drawing
+    fails, so nothing stays in pyplot's global figure registry.
+    """
+    fig, ax = plt.subplots(**subplots_kw)
+    try:
+        yield fig, ax
+    finally:
+        plt.close(fig)
+
+
+def figure_png(fig, **savefig_kw) -> bytes:
+    """PNG bytes of a figure (tight box, figure background kept)."""
+    savefig_kw.setdefault("bbox_inches", "tight")
+    savefig_kw.setdefault("facecolor", fig.get_facecolor())
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", **savefig_kw)
+    return buf.getvalue()
+
+
+# ---------------------------------------------------------
+# 2. DIAGNOSTICS
+# ---------------------------------------------------------
+def live_figures() -> int:
+    """Matplotlib figures still open in this process (should stay 0)."""
+    return len(plt.get_fignums())
+
+
+def process_memory_mb() -> float:
+    """Resident memory of the server process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        # No procfs (macOS): peak instead of current (ru_maxrss is bytes there)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e6
+    except ImportError:
+        return float("nan")
+
+
+def renderer_stats() -> dict:
+    """Live Matplotlib figures, cached Plotly specs and process memory."""
+    return {
+        "live_figures": live_figures(),
+        "cached_figures": figure_store_size(),
+        "memory_mb": round(process_memory_mb(), 1),
+    }
@@ -1,44 +1,31 @@
 """Navbar component for the Streamlit app."""
 
 import streamlit as st
-import base64
-import os
 
+from app.utils.assets import image_css, inject_bundle, read_asset
 
-def load_logo_base64(path):
-    """Loads image as base64 string."""
-    if not os.path.exists(path):
-        return None
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
 
-
-def load_navbar_css():
-    """Loads the external CSS file."""
-    css_path = os.path.join(os.path.dirname(__file__), "..", "assets", "navbar.css")
-    if os.path.exists(css_path):
-        with open(css_path) as f:
-            return f"<style>{f.read()}</style>"
-    return ""
+@st.cache_resource(show_spinner=False)
+def navbar_assets():
+    """Navbar CSS plus the logo as a CSS background (sent once per session)."""
+    css = read_asset("navbar.css") or ""
+    return css + "\n" + image_css("logo.png", ".nav-logo")
 
 
 def navbar():
     """Renders the navigation bar."""
-    # 1. Load assets
-    logo_path = "app/assets/logo.png"
-    logo_base64 = load_logo_base64(logo_path)
-    css_style = load_navbar_css()
+    # 1. Assets (injected once per browser session)
+    inject_bundle("navbar", css=navbar_assets())
 
-    # Prepare logo HTML
-    if logo_base64:
-        logo_html = f'<img src="data:image/png;base64,{logo_base64}" class="nav-logo">'
+    # Logo is the background image of .nav-logo (see navbar_assets)
+    if read_asset("logo.png", binary=True):
+        logo_html = '<div class="nav-logo" role="img" aria-label="Logo"></div>'
     else:
         logo_html = ""
 
     # 2. Define HTML structure
     # IMPORTANT: The string is not indented to avoid rendering issues.
     html_content = f"""
-{css_style}
  <div class="f1-nav-container">
     <div class="f1-nav-content">
         <!-- LEFT: BRANDING -->
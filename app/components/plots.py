@@ -2,6 +2,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from app.components.figure_cache import cached_figure_spec
+from src.data.downsample import downsample_xy
+
 # -------------------------------------------------------
 # GLOBAL DARK THEME
 # -------------------------------------------------------
@@ -11,6 +14,9 @@ TEXT_COLOR = "#FFFFFF"
 
 PASTEL_COLORS = ["#A48FFF", "#FFB7D5", "#8FD3FE", "#FFDD94", "#C9F7C5", "#FDCFE8"]
 
+# Part of every figure cache key: changing a colour invalidates the cache
+THEME = (DARK_BG, DARK_PAPER, TEXT_COLOR, tuple(PASTEL_COLORS))
+
 
 def dark_layout(fig, title=None):
     fig.update_layout(
@@ -27,10 +33,45 @@ def dark_layout(fig, title=None):
     return fig
 
 
+def show_figure(builder, *args, key=None, on_select="ignore", **kwargs):
+    """
+    Renders builder(*args, **kwargs) from the figure cache: the figure is
+    only rebuilt when its data, the builder or the theme changed.
+    With on_select="rerun" the chart's box-selection event is returned.
+    """
+    spec = cached_figure_spec(builder, *args, theme=THEME, **kwargs)
+    if spec is None:
+        return None
+    if on_select == "ignore":
+        return st.plotly_chart(spec, use_container_width=True, key=key)
+    return st.plotly_chart(
+        spec,
+        use_container_width=True,
+        key=key,
+        on_select=on_select,
+        selection_mode="box",
+    )
+
+
+def selected_x_range(event):
+    """(start, end) of a box selection on a chart, or None."""
+    try:
+        box = event.selection["box"][0]
+    except (AttributeError, KeyError, IndexError, TypeError):
+        return None
+    x = box.get("x") or []
+    return (min(x), max(x)) if len(x) == 2 else None
+
+
+def distance_trace(tel, channel, x_range=None, method="minmax"):
+    """Downsampled (Distance, channel) arrays for one line trace."""
+    return downsample_xy(tel["Distance"], tel[channel], x_range, method=method)
+
+
 # -------------------------------------------------------
 # 1) TIME LOSS BAR CHART
 # -------------------------------------------------------
-def plot_time_loss_bar(df, key="time_loss_bar"):
+def build_time_loss_bar(df):
     fig = px.bar(
         df,
         x="Corner",
@@ -45,13 +86,17 @@ def plot_time_loss_bar(df, key="time_loss_bar"):
     fig.update_xaxes(title_text="Corner")
     fig.update_yaxes(title_text="Time Loss (s)")
 
-    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
+
+
+def plot_time_loss_bar(df, key="time_loss_bar"):
+    show_figure(build_time_loss_bar, df, key=key)
 
 
 # -------------------------------------------------------
 # 2) SPEED DELTAS – APEX & EXIT
 # -------------------------------------------------------
-def plot_speed_deltas(df, driver_a, driver_b, key="speed_deltas"):
+def build_speed_deltas(df, driver_a, driver_b):
 
     fig = go.Figure()
 
@@ -77,107 +122,103 @@ def plot_speed_deltas(df, driver_a, driver_b, key="speed_deltas"):
     fig.update_xaxes(title_text="Corner")
     fig.update_yaxes(title_text="Speed Delta (km/h)")
 
-    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
+
+
+def plot_speed_deltas(df, driver_a, driver_b, key="speed_deltas"):
+    show_figure(build_speed_deltas, df, driver_a, driver_b, key=key)
 
 
 # -------------------------------------------------------
 # 3) SPEED PROFILE – LINE PLOT
 # -------------------------------------------------------
-def plot_speed_profile(telA, telB, driverA, driverB, key="speed_profile"):
+def build_speed_profile(telA, telB, driverA, driverB, x_range=None):
 
     fig = go.Figure()
 
-    fig.add_trace(
-        go.Scatter(
-            x=telA["Distance"],
-            y=telA["Speed"],
-            mode="lines",
-            name=f"{driverA} Speed",
-            line=dict(color="#A48FFF", width=2),
+    for tel, driver, color in ((telA, driverA, "#A48FFF"), (telB, driverB, "#FFB7D5")):
+        x, y = distance_trace(tel, "Speed", x_range, method="lttb")
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=y,
+                mode="lines",
+                name=f"{driver} Speed",
+                line=dict(color=color, width=2),
+            )
         )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=telB["Distance"],
-            y=telB["Speed"],
-            mode="lines",
-            name=f"{driverB} Speed",
-            line=dict(color="#FFB7D5", width=2),
-        )
-    )
 
     fig = dark_layout(fig, f"Speed Profile – {driverA} vs {driverB}")
     fig.update_xaxes(title_text="Distance (m)")
     fig.update_yaxes(title_text="Speed (km/h)")
 
-    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
+
+
+def plot_speed_profile(
+    telA, telB, driverA, driverB, key="speed_profile", x_range=None, brush=False
+):
+    """With brush=True, returns the box-selected distance range (or None)."""
+    cols = ["Distance", "Speed"]
+    event = show_figure(
+        build_speed_profile,
+        telA[cols],
+        telB[cols],
+        driverA,
+        driverB,
+        x_range,
+        key=key,
+        on_select="rerun" if brush else "ignore",
+    )
+    return selected_x_range(event) if brush else None
 
 
 # -------------------------------------------------------
 # 4) BRAKE & THROTTLE INPUTS
 # -------------------------------------------------------
-def plot_brake_throttle(telA, telB, driverA, driverB, key="brake_throttle"):
+def build_brake_throttle(telA, telB, driverA, driverB, x_range=None):
 
     fig = go.Figure()
 
-    # --- Driver A ---
-    fig.add_trace(
-        go.Scatter(
-            x=telA["Distance"],
-            y=telA["Brake"],
-            name=f"{driverA} Brake",
-            mode="lines",
-            line=dict(color="#A48FFF", width=2),
+    traces = [
+        (telA, driverA, "Brake", "#A48FFF"),
+        (telA, driverA, "Throttle", "#8FD3FE"),
+        (telB, driverB, "Brake", "#FFB7D5"),
+        (telB, driverB, "Throttle", "#FFDD94"),
+    ]
+    for tel, driver, channel, color in traces:
+        # Min-max buckets keep every brake spike and throttle lift
+        x, y = distance_trace(tel, channel, x_range)
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=y,
+                name=f"{driver} {channel}",
+                mode="lines",
+                line=dict(color=color, width=2),
+            )
         )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=telA["Distance"],
-            y=telA["Throttle"],
-            name=f"{driverA} Throttle",
-            mode="lines",
-            line=dict(color="#8FD3FE", width=2),
-        )
-    )
-
-    # --- Driver B ---
-    fig.add_trace(
-        go.Scatter(
-            x=telB["Distance"],
-            y=telB["Brake"],
-            name=f"{driverB} Brake",
-            mode="lines",
-            line=dict(color="#FFB7D5", width=2),
-        )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=telB["Distance"],
-            y=telB["Throttle"],
-            name=f"{driverB} Throttle",
-            mode="lines",
-            line=dict(color="#FFDD94", width=2),
-        )
-    )
 
     fig = dark_layout(fig, f"Brake & Throttle – {driverA} vs {driverB}")
     fig.update_xaxes(title_text="Distance (m)")
     fig.update_yaxes(title_text="Input (%)")
 
-    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
+
+
+def plot_brake_throttle(
+    telA, telB, driverA, driverB, key="brake_throttle", x_range=None
+):
+    cols = ["Distance", "Brake", "Throttle"]
+    show_figure(
+        build_brake_throttle, telA[cols], telB[cols], driverA, driverB, x_range, key=key
+    )
 
 
 # -------------------------------------------------------
 # 5) GEAR USAGE – DONUT
 # -------------------------------------------------------
-def plot_gear_usage(tel, driver, key=None):
-    # Falls key nicht übergeben wurde, generieren wir einen aus dem Fahrernamen
-    if key is None:
-        key = f"gear_usage_{driver}"
-
+def build_gear_usage(tel, driver):
     gear_counts = tel["nGear"].value_counts().sort_index()
 
     fig = px.pie(
@@ -189,15 +230,22 @@ def plot_gear_usage(tel, driver, key=None):
     )
 
     fig = dark_layout(fig)
-    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
+
+
+def plot_gear_usage(tel, driver, key=None):
+    # Falls key nicht übergeben wurde, generieren wir einen aus dem Fahrernamen
+    if key is None:
+        key = f"gear_usage_{driver}"
+    show_figure(build_gear_usage, tel[["nGear"]], driver, key=key)
 
 
 # -------------------------------------------------------
 # 6) APEX SPEED DISTRIBUTION – DONUT (FIXED)
 # -------------------------------------------------------
-def plot_apex_speed_share(df, key="apex_share"):
+def build_apex_speed_share(df):
     if df is None or df.empty or "Delta_ApexSpeed" not in df.columns:
-        return
+        return None
 
     # Fix für Pie-Charts (keine negativen Werte)
     plot_df = df.copy()
@@ -214,15 +262,19 @@ def plot_apex_speed_share(df, key="apex_share"):
     )
 
     fig = dark_layout(fig)
-    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
+
+
+def plot_apex_speed_share(df, key="apex_share"):
+    show_figure(build_apex_speed_share, df, key=key)
 
 
 # -------------------------------------------------------
 # 7) DRIVER DNA RADAR CHART (MIT KEY FIX)
 # -------------------------------------------------------
-def plot_driver_dna(dna_df, driver_a, driver_b, key="driver_dna_radar"):
+def build_driver_dna(dna_df, driver_a, driver_b):
     """
-    Plots a Radar Chart comparing two drivers' characteristics.
+    Radar chart figure comparing two drivers' characteristics.
     """
     fig = go.Figure()
 
@@ -278,21 +330,23 @@ def plot_driver_dna(dna_df, driver_a, driver_b, key="driver_dna_radar"):
         legend=dict(x=0.8, y=0.95),
     )
 
-    # Hier übergeben wir den Key an Streamlit!
-    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
+
+
+def plot_driver_dna(dna_df, driver_a, driver_b, key="driver_dna_radar"):
+    """
+    Plots a Radar Chart comparing two drivers' characteristics.
+    """
+    show_figure(build_driver_dna, dna_df, driver_a, driver_b, key=key)
 
 
 # -------------------------------------------------------
 # 8) CORNER TYPE PERFORMANCE
 # -------------------------------------------------------
-def plot_corner_type_performance(agg_df, key="corner_type_perf"):
+def build_corner_type_performance(agg_df):
     """
     Zeigt den kumulierten Zeitverlust pro Kurventyp an.
     """
-    if agg_df is None or agg_df.empty:
-        st.info("No classification data available.")
-        return
-
     color_map = {
         "Low Speed": "#FFDD94",  # Gelb
         "Medium Speed": "#8FD3FE",  # Blau
@@ -326,4 +380,137 @@ def plot_corner_type_performance(agg_df, key="corner_type_perf"):
         xaxis=dict(title=""),
     )
 
-    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
+
+
+def plot_corner_type_performance(agg_df, key="corner_type_perf"):
+    if agg_df is None or agg_df.empty:
+        st.info("No classification data available.")
+        return
+    show_figure(build_corner_type_performance, agg_df, key=key)
+
+
+# -------------------------------------------------------
+# 9) STINT CONSISTENCY PER CORNER
+# -------------------------------------------------------
+def build_corner_consistency(cons_df, metric="ApexSpeed"):
+    """
+    Mean of a corner metric over all laps with the lap-to-lap spread (std)
+    as error bars, one bar group per driver.
+    """
+    mean_col, std_col = f"{metric}_Mean", f"{metric}_Std"
+    fig = go.Figure()
+    for i, (driver, df) in enumerate(cons_df.groupby("Driver", sort=False)):
+        fig.add_trace(
+            go.Bar(
+                x=df["Corner"],
+                y=df[mean_col],
+                error_y=dict(type="data", array=df[std_col], visible=True),
+                name=driver,
+                marker_color=PASTEL_COLORS[i % len(PASTEL_COLORS)],
+            )
+        )
+
+    fig = dark_layout(fig, f"{metric} Consistency (mean ± std over laps)")
+    fig.update_xaxes(title_text="Corner")
+    fig.update_yaxes(title_text=f"{metric} (km/h)")
+
+    return fig
+
+
+def plot_corner_consistency(cons_df, metric="ApexSpeed", key="corner_consistency"):
+    if cons_df is None or cons_df.empty or f"{metric}_Mean" not in cons_df.columns:
+        st.info("No stint data available.")
+        return
+    show_figure(build_corner_consistency, cons_df, metric, key=key)
+
+
+# -------------------------------------------------------
+# 10) N-WAY OVERLAY ON A SHARED DISTANCE GRID
+# -------------------------------------------------------
+OVERLAY_UNITS = {
+    "Speed": "km/h",
+    "Throttle": "%",
+    "Brake": "",
+    "nGear": "",
+    "RPM": "1/min",
+}
+
+
+def build_trace_overlay(grid, values, labels, channel="Speed", x_range=None):
+    """
+    One WebGL line per row of `values` (n, G) on the common `grid`.
+    Rows are downsampled with the vectorised min-max buckets (LTTB is a
+    per-bucket loop, too slow for 20 traces per rerun).
+    """
+    colors = PASTEL_COLORS + px.colors.qualitative.Pastel
+
+    fig = go.Figure()
+    for i, (label, row) in enumerate(zip(labels, values)):
+        x, y = downsample_xy(grid, row, x_range)
+        fig.add_trace(
+            go.Scattergl(
+                x=x,
+                y=y,
+                mode="lines",
+                name=str(label),
+                line=dict(color=colors[i % len(colors)], width=1.6),
+            )
+        )
+
+    fig = dark_layout(fig, f"{channel} Overlay – {len(labels)} traces")
+    fig.update_xaxes(title_text="Distance (m)")
+    unit = OVERLAY_UNITS.get(channel)
+    fig.update_yaxes(title_text=f"{channel} ({unit})" if unit else channel)
+    return fig
+
+
+def plot_trace_overlay(overlay, channel="Speed", key="overlay", x_range=None):
+    """overlay: {"grid", "labels", "stack"} (see src.data.overlay)."""
+    if not overlay or not overlay["labels"]:
+        st.info("No laps selected for the overlay.")
+        return
+    show_figure(
+        build_trace_overlay,
+        overlay["grid"],
+        overlay["stack"][channel],
+        overlay["labels"],
+        channel,
+        x_range,
+        key=key,
+    )
+
+
+# -------------------------------------------------------
+# 11) RACING LINE – LATERAL OFFSET
+# -------------------------------------------------------
+def build_racing_line(distance, offset_a, offset_b, driver_a, driver_b):
+    fig = go.Figure()
+    for offset, driver, color in (
+        (offset_a, driver_a, "#A48FFF"),
+        (offset_b, driver_b, "#FFB7D5"),
+    ):
+        x, y = downsample_xy(distance, offset, method="lttb")
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=y,
+                mode="lines",
+                name=str(driver),
+                line=dict(color=color, width=2),
+            )
+        )
+
+    fig.add_hline(y=0, line_color="#555", line_width=1, line_dash="dot")
+    fig = dark_layout(fig, f"Racing Line – {driver_a} vs {driver_b}")
+    fig.update_xaxes(title_text="Distance (m)")
+    fig.update_yaxes(title_text="Offset from centerline (m, + = left)")
+    return fig
+
+
+def plot_racing_line(
+    distance, offset_a, offset_b, driver_a, driver_b, key="racing_line"
+):
+    show_figure(
+        build_racing_line, distance, offset_a, offset_b, driver_a, driver_b, key=key
+    )
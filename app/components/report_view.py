@@ -1,18 +1,10 @@
 import streamlit as st
 import re
 
+from app.utils.assets import inject_bundle
 
-def render_race_engineer_report(report_data):
-    """
-    Renders the report data in a stylized container.
-    """
-    if not report_data:
-        return
-
-    # 1. CSS Styles definieren
-    st.markdown(
-        """
-    <style>
+# Shared by the Coaching tab and the batch report export
+REPORT_CSS = """
     .report-container {
         background-color: #1E1E1E;
         border-left: 4px solid #7d0e0e;
@@ -52,28 +44,28 @@ def render_race_engineer_report(report_data):
         color: #FFF;
         font-weight: 900;
     }
-    </style>
-    """,
-        unsafe_allow_html=True,
-    )
+"""
+
+
+def md_to_html(text):
+    """Markdown bold (**) -> HTML bold (<b>)."""
+    if not text:
+        return ""
+    return re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", text)
+
 
-    # 2. Daten vorbereiten
+def build_report_html(report_data):
+    """Report data -> HTML block (styled by REPORT_CSS)."""
     headline = report_data.get("headline", "")
     type_summary = report_data.get("type_summary", [])
     key_fix = report_data.get("key_fix", "")
 
-    # Helper: Markdown Bold (**) in HTML Bold (<b>) umwandeln
-    def md_to_html(text):
-        if not text:
-            return ""
-        return re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", text)
-
     headline_html = md_to_html(headline)
     # Zeilenumbrüche mit <br> einfügen
     summary_html = "<br>".join([md_to_html(s) for s in type_summary])
     fix_html = md_to_html(key_fix)
 
-    # 3. HTML Zusammenbauen (Ohne textwrap, direkt als String)
+    # HTML Zusammenbauen (Ohne textwrap, direkt als String)
     # Wir nutzen .strip(), um sicherzustellen, dass keine Leerzeichen Markdown verwirren.
     html_content = f"""
 <div class="report-container">
@@ -89,5 +81,18 @@ def render_race_engineer_report(report_data):
     </div>
 </div>
 """
+    return html_content.strip()
+
+
+def render_race_engineer_report(report_data):
+    """
+    Renders the report data in a stylized container.
+    """
+    if not report_data:
+        return
+
+    # 1. CSS Styles (einmal pro Browser-Session)
+    inject_bundle("report", css=REPORT_CSS)
 
-    st.markdown(html_content.strip(), unsafe_allow_html=True)
+    # 2. HTML rendern
+    st.markdown(build_report_html(report_data), unsafe_allow_html=True)
@@ -1,13 +1,21 @@
 # app/components/track_map.py
 
 import os
+import fastf1
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
-from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.colors import LinearSegmentedColormap, TwoSlopeNorm
 import streamlit as st
 
-from src.data.load_data import load_telemetry_with_position
+from app.components.mpl_render import figure_png, managed_figure
+from src.data.circuit import (
+    load_circuit_geometry,
+    load_circuit_index,
+    values_on_geometry,
+)
+from src.data.distance_grid import elapsed_time
+from src.data.load_data import hash_session_id, load_telemetry
 
 # ---------------------------------------------------------
 # GLOBAL DARK THEME COLORS
@@ -16,6 +24,15 @@ DARK_BG = "#141414"
 DARK_PAPER = "#191919"
 TEXT_COLOR = "#FFFFFF"
 
+# mode -> (telemetry channel, colorbar label)
+MAP_MODES = {
+    "speed": ("Speed", "Speed (km/h)"),
+    "gear": ("nGear", "Gear"),
+    "throttle": ("Throttle", "Throttle (%)"),
+    "brake": ("Brake", "Brake"),
+    "delta": ("Speed", "Delta (s, + = behind)"),
+}
+
 
 # ---------------------------------------------------------
 # Pastel Neon Speed Colormap (matching your plotly theme)
@@ -33,22 +50,25 @@ def _dark_pastel_speed_cmap():
 # ---------------------------------------------------------
 # 1. Dark mode line heatmap
 # ---------------------------------------------------------
-def _line_heatmap_dark(x, y, values, ax, fig):
-    x = np.asarray(x)
-    y = np.asarray(y)
-    values = np.asarray(values)
+def _line_heatmap_dark(segments, values, ax, fig, mode="speed"):
+    values = np.asarray(values, dtype=float)
 
-    if len(x) < 2:
+    if len(segments) < 1:
         raise ValueError("Telemetry too short for track map.")
 
-    points = np.column_stack((x, y))
-    segments = np.stack([points[:-1], points[1:]], axis=1)
+    # One colour per segment: mean of its two end points
+    seg_values = 0.5 * (values[:-1] + values[1:])
 
-    norm = plt.Normalize(vmin=np.nanmin(values), vmax=np.nanmax(values))
-    cmap = _dark_pastel_speed_cmap()
+    if mode == "delta":
+        limit = max(np.nanmax(np.abs(seg_values)), 1e-3)
+        norm = TwoSlopeNorm(vmin=-limit, vcenter=0.0, vmax=limit)
+        cmap = plt.get_cmap("coolwarm")
+    else:
+        norm = plt.Normalize(vmin=np.nanmin(seg_values), vmax=np.nanmax(seg_values))
+        cmap = _dark_pastel_speed_cmap()
 
     lc = LineCollection(segments, cmap=cmap, norm=norm, linewidth=3.2)
-    lc.set_array(values)
+    lc.set_array(seg_values)
 
     ax.add_collection(lc)
     ax.set_aspect("equal", "box")
@@ -57,7 +77,7 @@ def _line_heatmap_dark(x, y, values, ax, fig):
 
     # Colorbar
     cbar = fig.colorbar(lc, ax=ax, fraction=0.045, pad=0.02)
-    cbar.set_label("Speed (km/h)", fontsize=8, color=TEXT_COLOR)
+    cbar.set_label(MAP_MODES[mode][1], fontsize=8, color=TEXT_COLOR)
 
     # Colorbar dark styling
     cbar.outline.set_edgecolor(TEXT_COLOR)
@@ -67,6 +87,38 @@ def _line_heatmap_dark(x, y, values, ax, fig):
     return lc
 
 
+def _label_corners(ax, index):
+    """Corner numbers at the apexes of the reference lap."""
+    if index is None or index.corners is None or index.corners.empty:
+        return
+    xs, ys = index.position_at(index.corners["ApexDistance"].to_numpy())
+    for number, x, y in zip(index.corners["Corner"], xs, ys):
+        ax.annotate(
+            str(int(number)),
+            (x, y),
+            xytext=(3, 3),
+            textcoords="offset points",
+            fontsize=4,
+            color=TEXT_COLOR,
+        )
+
+
+def track_map_values(tel, geometry, mode="speed", tel_other=None):
+    """
+    Colour values at every outline point of the cached geometry.
+    'delta': elapsed-time gap to tel_other (positive = tel is behind).
+    """
+    channel = MAP_MODES[mode][0]
+    values = values_on_geometry(tel, channel, geometry)
+    if mode != "delta":
+        return values
+
+    other = values_on_geometry(tel_other, channel, geometry)
+    distance = geometry["fraction"] * geometry["length"]
+    elapsed = elapsed_time(np.vstack([values, other]), distance)
+    return elapsed[0] - elapsed[1]
+
+
 # ---------------------------------------------------------
 # 2. Optional SVG Outline
 # ---------------------------------------------------------
@@ -83,41 +135,67 @@ def show_track_outline_svg(track: str):
 
 
 # ---------------------------------------------------------
-# 3. MAIN FUNCTION — Track Map (Dark Mode)
+# 3. RENDERING (CACHED PER SESSION, DRIVER, MODE)
 # ---------------------------------------------------------
-def plot_track_map(session, driver_code: str, track: str, mode="speed"):
-    tel = load_telemetry_with_position(session, driver_code)
+@st.cache_data(
+    show_spinner="Drawing track map...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def render_track_map(
+    session, driver_code: str, track: str, mode="speed", other_code=None
+):
+    """
+    PNG bytes of the track map. The outline comes from the circuit
+    geometry cache, so only the colour array changes between drivers
+    and modes.
+    """
+    geometry = load_circuit_geometry(session)
+    tel = load_telemetry(session, driver_code)
+    if geometry is None or tel is None or tel.empty:
+        return None
+
+    tel_other = load_telemetry(session, other_code) if mode == "delta" else None
+    values = track_map_values(tel, geometry, mode, tel_other)
 
-    for col in ["X", "Y", "Speed"]:
-        if col not in tel.columns:
-            st.error(f"Telemetry missing '{col}' for track map.")
-            return
+    # --------------- FIGURE ------------------
+    with managed_figure(figsize=(2.5, 2.5), dpi=260) as (fig, ax):
+        # DARK BACKGROUND for the whole map
+        fig.patch.set_facecolor(DARK_PAPER)
+        ax.set_facecolor(DARK_PAPER)
 
-    x = tel["X"].values
-    y = tel["Y"].values
+        _line_heatmap_dark(geometry["segments"], values, ax, fig, mode)
+        _label_corners(ax, load_circuit_index(session))
 
-    if mode.lower() == "speed":
-        values = tel["Speed"].values
-    else:
-        values = tel["Speed"].values
-        st.warning(f"Mode '{mode}' not implemented. Using Speed instead.")
+        title = f"{track} – {driver_code}"
+        if mode == "delta":
+            title += f" vs {other_code}"
+        ax.set_title(title, fontsize=10, pad=6, color=TEXT_COLOR)
+
+        return figure_png(fig)
 
-    # --------------- FIGURE ------------------
-    fig, ax = plt.subplots(figsize=(2.5, 2.5), dpi=260)
 
-    # DARK BACKGROUND for the whole map
-    fig.patch.set_facecolor(DARK_PAPER)
-    ax.set_facecolor(DARK_PAPER)
+# ---------------------------------------------------------
+# 4. MAIN FUNCTION — Track Map (Dark Mode)
+# ---------------------------------------------------------
+def plot_track_map(
+    session, driver_code: str, track: str, mode="speed", other_code=None
+):
+    mode = mode.lower()
+    if mode not in MAP_MODES or (mode == "delta" and not other_code):
+        st.warning(f"Mode '{mode}' not available here. Using Speed instead.")
+        mode = "speed"
+
+    # The opponent only matters for the delta map (keeps it out of the cache key)
+    if mode != "delta":
+        other_code = None
 
     try:
-        _line_heatmap_dark(x, y, values, ax, fig)
+        png = render_track_map(session, driver_code, track, mode, other_code)
     except Exception as e:
         st.error(f"Track map draw error: {e}")
-        plt.close(fig)
         return
 
-    # Dark title
-    ax.set_title(f"{track} – {driver_code}", fontsize=10, pad=6, color=TEXT_COLOR)
-
-    st.pyplot(fig)
-    plt.close(fig)
+    if png is None:
+        st.error("No position data for track map.")
+        return
+    st.image(png, use_container_width=True)
@@ -26,37 +26,244 @@ from app.components.plots import (
     plot_apex_speed_share,
     plot_driver_dna,
     plot_corner_type_performance,
+    plot_corner_consistency,
+    plot_trace_overlay,
+    plot_racing_line,
 )
-from app.components.track_map import plot_track_map
+from app.components.track_map import MAP_MODES, plot_track_map
 from app.components.advanced_plots.plot_delta_lap import (
     compute_delta_lap,
     plot_delta_lap,
 )
-from src.data.load_data import load_session, load_telemetry, get_tracks_for_year
-from src.data.compare import compare_drivers_corner_level, sync_telemetry
-from src.insights.time_loss_engine import estimate_time_loss_per_corner
+from src.data.load_data import (
+    load_session,
+    load_telemetry,
+    load_top_lap_telemetries,
+    get_tracks_for_year,
+)
+from src.data.circuit import canonical_lap_length
+from src.data.compare import (
+    compare_across_sessions,
+    compare_drivers_corner_level,
+    load_aligned_telemetry,
+    compare_telemetry_corner_level,
+    sync_telemetry,
+)
+from src.data.ideal_lap import (
+    IDEAL_SCOPE_DRIVER,
+    IDEAL_SCOPE_FIELD,
+    ideal_lap_code,
+    load_ideal_lap,
+)
+from src.data.racing_line import corner_line_offsets, load_session_line_offsets
+from src.data.range_index import RangeIndex
+from src.data.stint_analysis import session_stint_features
+from src.insights.consistency_engine import CONSISTENCY_METRICS, corner_consistency
+from src.insights.time_loss_engine import (
+    TOP_LAPS,
+    estimate_time_loss_per_corner,
+    split_laps,
+)
 from src.insights.coaching_engine import coaching_suggestions
-from src.insights.driver_dna import compare_driver_dna
+from src.insights.driver_dna import (
+    compare_driver_dna,
+    compare_session_dna,
+    load_session_dna,
+)
+from src.insights.dna_stream import compare_race_dna, load_race_dna
+from src.data.overlay import (
+    MAX_OVERLAY_LAPS,
+    OVERLAY_CHANNELS,
+    build_overlay,
+    last_laps,
+    load_field_overlay,
+    load_lap_overlay,
+    select_rows,
+)
+from src.insights.session_snapshot import (
+    get_snapshot,
+    snapshot_dna,
+    snapshot_overlay,
+    snapshot_pair,
+)
 from src.insights.corner_utils import (
     add_corner_classification,
     aggregate_time_loss_by_type,
     get_corner_type_advice,
 )
 from src.insights.report_engine import generate_race_engineer_report
+from src.insights.text_engine import (
+    build_insight_records,
+    insight_page_count,
+    render_corner_insights,
+)
 from app.components.report_view import render_race_engineer_report
+from app.components.mpl_render import renderer_stats
 
 
 # -------------------------------------------------------
 # UTILS — RESET CACHE
 # -------------------------------------------------------
-def reset_cache():
-    """Resets session state variables when selection changes."""
-    keys = ["session", "drivers_full", "driver_map", "compare_result"]
-    for k in keys:
+def reset_cache(suffix=""):
+    """
+    Resets session state variables when selection changes.
+    suffix selects the side ("" = A, "_b" = B in cross-session mode), so the
+    other side stays loaded.
+    """
+    keys = [f"session{suffix}", f"drivers_full{suffix}", f"driver_map{suffix}"]
+    for k in keys + ["compare_result"]:
         if k in st.session_state:
             st.session_state[k] = None
 
 
+@st.cache_data(show_spinner=False)
+def classify_time_loss(tl):
+    """Corner classification and per-type aggregation, cached by content."""
+    tl_classified = add_corner_classification(tl)
+    return tl_classified, aggregate_time_loss_by_type(tl_classified)
+
+
+@st.cache_data(show_spinner=False)
+def delta_lap_table(telA, telB):
+    """Δ-time over distance of two laps, cached by content."""
+    tel_sync = sync_telemetry(telA, telB)
+    dfA = tel_sync.rename(columns={"Speed_1": "Speed_A", "Time_1": "Time_A"})[
+        ["Distance", "Speed_A", "Time_A"]
+    ]
+    dfB = tel_sync.rename(columns={"Speed_2": "Speed_B", "Time_2": "Time_B"})[
+        ["Distance", "Speed_B", "Time_B"]
+    ]
+    return compute_delta_lap(dfA, dfB)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def pair_range_index(telA, telB, driverA, driverB):
+    """Prefix-sum window index of the two compared laps (one per pair)."""
+    label_b = driverB if driverB != driverA else f"{driverB} (B)"
+    overlay = build_overlay({driverA: telA, label_b: telB})
+    return RangeIndex.from_overlay(overlay)
+
+
+FALLBACK_TRACKS = [
+    "Silverstone",
+    "Monza",
+    "Monaco",
+    "Spa",
+    "Red Bull Ring",
+    "Suzuka",
+    "Interlagos",
+    "Bahrain",
+    "Barcelona",
+]
+
+
+def session_selector(suffix="", label=""):
+    """Year / Track / Session widgets for one side of the comparison."""
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        # Auswahl des Jahres triggert einen Rerun, damit die Streckenliste updated
+        year = st.selectbox(
+            f"Year{label}",
+            [2025, 2024, 2023, 2022, 2021, 2020, 2019, 2018],
+            index=1,  # Default zu 2024
+            key=f"year{suffix}",
+        )
+
+    with col2:
+        # 1. Dynamische Streckenliste laden
+        with st.spinner(f"Loading {year} Calendar..."):
+            tracks_for_year = get_tracks_for_year(year)
+
+        # 2. Fallback falls API offline ist (Offline Modus)
+        if not tracks_for_year:
+            tracks_for_year = FALLBACK_TRACKS
+
+        # 3. Default Wert finden (Silverstone oder der erste Eintrag)
+        default_idx = 0
+        if "Silverstone" in tracks_for_year:
+            default_idx = tracks_for_year.index("Silverstone")
+
+        track = st.selectbox(
+            f"Track{label}", tracks_for_year, index=default_idx, key=f"track{suffix}"
+        )
+
+    with col3:
+        session_type = st.selectbox(
+            f"Session{label}",
+            ["Q", "R", "FP1", "FP2", "FP3"],
+            key=f"session_type{suffix}",
+        )
+
+    return year, track, session_type
+
+
+def auto_reset(sel_tuple, suffix=""):
+    """Clears one side's loaded data when its selection changes."""
+    key = f"last_selection{suffix}"
+    if key not in st.session_state:
+        st.session_state[key] = sel_tuple
+
+    if st.session_state[key] != sel_tuple:
+        reset_cache(suffix)
+        st.session_state[key] = sel_tuple
+        st.rerun()
+
+
+def build_driver_map(session):
+    """Maps 'First Last (CODE)' labels to driver codes."""
+    driver_map = {}
+    # Robust check for drivers in the session
+    if hasattr(session, "laps"):
+        # session.laps kann leer sein, wenn Session noch nicht geladen
+        try:
+            unique_drivers = sorted(session.laps["Driver"].unique())
+        except Exception:
+            unique_drivers = []
+    else:
+        unique_drivers = []
+
+    for code in unique_drivers:
+        try:
+            info = session.get_driver(code)
+            fn = info.get("FirstName", info.get("given_name", ""))
+            ln = info.get("LastName", info.get("family_name", ""))
+            full = f"{fn} {ln} ({code})"
+            driver_map[full] = code
+        except:
+            driver_map[code] = code
+    return driver_map
+
+
+def load_side(year, track, session_type, suffix=""):
+    """
+    Loads one side's session (cached by load_session) into session state.
+    Returns True on success.
+    """
+    if st.session_state.get(f"session{suffix}") is not None:
+        return True
+
+    session = load_session(year, track, session_type)
+    if session is None:
+        st.error(f"Could not load {year} {track} {session_type} from FastF1.")
+        return False
+
+    driver_map = build_driver_map(session)
+    st.session_state[f"session{suffix}"] = session
+    st.session_state[f"drivers_full{suffix}"] = list(driver_map.keys())
+    st.session_state[f"driver_map{suffix}"] = driver_map
+    return True
+
+
+INSIGHTS_PAGE_SIZE = 5  # corners per page in the Coaching tab
+
+# Pseudo drivers selectable as Driver B
+IDEAL_LAP_OPTIONS = {
+    "Ideal Lap (Session Best Sectors)": IDEAL_SCOPE_FIELD,
+    "Ideal Lap (Driver A Best Sectors)": IDEAL_SCOPE_DRIVER,
+}
+
+
 # -------------------------------------------------------
 # PAGE CONFIG
 # -------------------------------------------------------
@@ -73,105 +280,57 @@ navbar()
 # -------------------------------------------------------
 st.markdown("<h2 class='section-title'>Session Selection</h2>", unsafe_allow_html=True)
 
-col1, col2, col3 = st.columns(3)
+cross_mode = st.toggle(
+    "Compare across sessions / seasons",
+    key="cross_mode",
+    help="Driver B comes from a different session or season on the same circuit.",
+)
 
-with col1:
-    # Auswahl des Jahres triggert einen Rerun, damit die Streckenliste updated
-    year = st.selectbox(
-        "Year",
-        [2025, 2024, 2023, 2022, 2021, 2020, 2019, 2018],
-        index=1,  # Default zu 2024
-    )
+if cross_mode:
+    st.markdown("<b>Driver A</b>", unsafe_allow_html=True)
+year, track, session_type = session_selector()
 
-with col2:
-    # 1. Dynamische Streckenliste laden
-    with st.spinner(f"Loading {year} Calendar..."):
-        tracks_for_year = get_tracks_for_year(year)
-
-    # 2. Fallback falls API offline ist (Offline Modus)
-    if not tracks_for_year:
-        tracks_for_year = [
-            "Silverstone",
-            "Monza",
-            "Monaco",
-            "Spa",
-            "Red Bull Ring",
-            "Suzuka",
-            "Interlagos",
-            "Bahrain",
-            "Barcelona",
-        ]
-        # Nur eine kleine Warnung, damit man weiß, dass es der Fallback ist
-        # st.caption("⚠️ Offline mode: Using fallback track list.")
-
-    # 3. Default Wert finden (Silverstone oder der erste Eintrag)
-    default_idx = 0
-    if "Silverstone" in tracks_for_year:
-        default_idx = tracks_for_year.index("Silverstone")
-
-    track = st.selectbox("Track", tracks_for_year, index=default_idx)
-
-with col3:
-    session_type = st.selectbox("Session", ["Q", "R", "FP1", "FP2", "FP3"])
+if cross_mode:
+    st.markdown("<b>Driver B</b>", unsafe_allow_html=True)
+    year_b, track_b, session_type_b = session_selector("_b", " (B)")
+else:
+    year_b, track_b, session_type_b = year, track, session_type
 
 # -------------------------------------------------------
 # AUTO-RESET LOGIC
 # -------------------------------------------------------
-sel_tuple = (year, track, session_type)
-
-if "last_selection" not in st.session_state:
-    st.session_state["last_selection"] = sel_tuple
+auto_reset((year, track, session_type))
+if cross_mode:
+    auto_reset((year_b, track_b, session_type_b), "_b")
 
-if st.session_state["last_selection"] != sel_tuple:
-    reset_cache()
-    st.session_state["last_selection"] = sel_tuple
-    st.rerun()
+if st.session_state.get("last_cross_mode") != cross_mode:
+    st.session_state["last_cross_mode"] = cross_mode
+    st.session_state["compare_result"] = None
 
 # -------------------------------------------------------
 # LOAD SESSION BUTTON
 # -------------------------------------------------------
 if st.button("Load session"):
     try:
-        session = load_session(year, track, session_type)
-
-        if session is None:
-            st.error("Could not load session data from FastF1.")
-        else:
-            driver_map = {}
-            # Robust check for drivers in the session
-            if hasattr(session, "laps"):
-                # session.laps kann leer sein, wenn Session noch nicht geladen
-                try:
-                    unique_drivers = sorted(session.laps["Driver"].unique())
-                except Exception:
-                    unique_drivers = []
-            else:
-                unique_drivers = []
-
-            for code in unique_drivers:
-                try:
-                    info = session.get_driver(code)
-                    fn = info.get("FirstName", info.get("given_name", ""))
-                    ln = info.get("LastName", info.get("family_name", ""))
-                    full = f"{fn} {ln} ({code})"
-                    driver_map[full] = code
-                except:
-                    driver_map[code] = code
-
-            st.session_state["session"] = session
-            st.session_state["drivers_full"] = list(driver_map.keys())
-            st.session_state["driver_map"] = driver_map
+        loaded = load_side(year, track, session_type)
+        if loaded and cross_mode:
+            loaded = load_side(year_b, track_b, session_type_b, "_b")
 
+        if loaded:
             st.success(f"Loaded: {year} {track} {session_type}")
             st.rerun()
 
     except Exception as e:
         st.error(f"Error loading session: {e}")
 
+ready = bool(st.session_state.get("drivers_full")) and (
+    not cross_mode or bool(st.session_state.get("drivers_full_b"))
+)
+
 # -------------------------------------------------------
 # DRIVER COMPARISON LOGIC
 # -------------------------------------------------------
-if st.session_state.get("drivers_full"):
+if ready:
 
     st.markdown(
         "<h2 class='section-title'>Driver Selection</h2>", unsafe_allow_html=True
@@ -183,34 +342,108 @@ if st.session_state.get("drivers_full"):
             "Driver A", st.session_state["drivers_full"], key="drvA"
         )
     with colB:
-        driverB_full = st.selectbox(
-            "Driver B", st.session_state["drivers_full"], key="drvB"
-        )
+        if cross_mode:
+            driverB_options = st.session_state["drivers_full_b"]
+        else:
+            driverB_options = st.session_state["drivers_full"] + list(IDEAL_LAP_OPTIONS)
+        driverB_full = st.selectbox("Driver B", driverB_options, key="drvB")
+
+    uncertainty = st.toggle(
+        "Uncertainty mode",
+        key="uncertainty_mode",
+        help=f"Per-corner time loss intervals from each driver's {TOP_LAPS} "
+        "fastest laps (bootstrap). Advice is suppressed where the interval "
+        "crosses zero.",
+    )
 
     if st.button("Compare drivers"):
         try:
             driverA = st.session_state["driver_map"][driverA_full]
-            driverB = st.session_state["driver_map"][driverB_full]
             session = st.session_state["session"]
+            session_b = session
+            ideal_scope = None if cross_mode else IDEAL_LAP_OPTIONS.get(driverB_full)
+            pair = None
 
             with st.spinner("Analyzing Telemetry..."):
                 # Load telemetry data
                 telA = load_telemetry(session, driverA)
-                telB = load_telemetry(session, driverB)
+
+                if cross_mode:
+                    # Other session / season: align both laps on the
+                    # canonical layout of side A
+                    session_b = st.session_state["session_b"]
+                    codeA = driverA
+                    codeB = st.session_state["driver_map_b"][driverB_full]
+                    driverA = f"{codeA} {year} {session_type}"
+                    driverB = f"{codeB} {year_b} {session_type_b}"
+
+                    ref_length = canonical_lap_length(session)
+                    telA = load_aligned_telemetry(session, codeA, ref_length)
+                    telB = load_aligned_telemetry(session_b, codeB, ref_length)
+                    comp = compare_across_sessions(
+                        session, codeA, session_b, codeB, driverA, driverB
+                    )
+                elif ideal_scope is None:
+                    driverB = st.session_state["driver_map"][driverB_full]
+                    # Precomputed session snapshot: the pair is a lookup
+                    pair = snapshot_pair(get_snapshot(session), driverA, driverB)
+                    if pair:
+                        telA, telB, comp = pair["telA"], pair["telB"], pair["comp"]
+                    else:
+                        telB = load_telemetry(session, driverB)
+                        comp = compare_drivers_corner_level(session, driverA, driverB)
+                else:
+                    # Ideal lap as Driver B (stitched best mini-sectors)
+                    owner = driverA if ideal_scope == IDEAL_SCOPE_DRIVER else None
+                    driverB = ideal_lap_code(owner)
+                    telB = load_ideal_lap(session, ideal_scope, owner)
+                    if telB is None:
+                        raise ValueError("Could not build the ideal lap.")
+                    comp = compare_telemetry_corner_level(telA, telB, driverA, driverB)
+
+                code_a = codeA if cross_mode else driverA
+                code_b = codeB if cross_mode else driverB
+
+                # Uncertainty mode: resample each driver's fastest laps
+                laps_a = laps_b = None
+                if uncertainty:
+                    laps_a = split_laps(
+                        load_top_lap_telemetries(session, code_a, TOP_LAPS)
+                    )
+                    if ideal_scope is None:
+                        laps_b = split_laps(
+                            load_top_lap_telemetries(session_b, code_b, TOP_LAPS)
+                        )
 
                 # Perform corner analysis
-                comp = compare_drivers_corner_level(session, driverA, driverB)
-                tl = estimate_time_loss_per_corner(comp, driverA, driverB)
+                if pair and not uncertainty:
+                    tl = pair["tl"]
+                else:
+                    tl = estimate_time_loss_per_corner(
+                        comp,
+                        driverA,
+                        driverB,
+                        tel_a=telA,
+                        tel_b=telB,
+                        circuit=track,
+                        laps_a=laps_a,
+                        laps_b=laps_b,
+                    )
 
             # Store results in session state
             st.session_state["compare_result"] = {
                 "session": session,
+                "session_b": session_b,
+                "track_b": track_b,
                 "driverA": driverA,
                 "driverB": driverB,
+                "codeA": code_a,
+                "codeB": code_b,
                 "telA": telA,
                 "telB": telB,
                 "comp": comp,
                 "tl": tl,
+                "ideal": ideal_scope is not None,
             }
             st.rerun()
 
@@ -228,16 +461,30 @@ if st.session_state.get("compare_result"):
     driverA = data["driverA"]
     driverB = data["driverB"]
     session = data["session"]
-
-    # Create Tabs
-    tab_overview, tab_inputs, tab_corners, tab_coaching = st.tabs(
-        ["Overview", "Driver Inputs", "Corners", "Coaching"]
+    session_b = data["session_b"]
+
+    # Race mode: every valid lap is analysed in the extra Stint tab
+    race_mode = session_type == "R" or session_type_b == "R"
+
+    same_session = not cross_mode and not data.get("ideal")
+
+    # Section switcher instead of st.tabs: st.tabs runs every tab's code on
+    # each rerun, here only the selected section is computed.
+    tab_names = ["Overview", "Driver Inputs", "Corners", "Coaching"]
+    if race_mode:
+        tab_names.append("Stint")
+    view = st.radio(
+        "Section",
+        tab_names,
+        horizontal=True,
+        key="results_view",
+        label_visibility="collapsed",
     )
 
     # -------------------------------------------------------
     # 1. OVERVIEW TAB
     # -------------------------------------------------------
-    with tab_overview:
+    if view == "Overview":
         st.markdown("<h2 class='section-title'>Summary</h2>", unsafe_allow_html=True)
         total_delta = tl["TimeLoss"].sum()
 
@@ -252,8 +499,24 @@ if st.session_state.get("compare_result"):
 
         # --- DRIVER DNA ANALYSIS ---
         st.markdown("<h3>Driver Style Analysis (DNA)</h3>", unsafe_allow_html=True)
+        dna_relative = st.toggle(
+            "Score relative to the field",
+            key="dna_relative",
+            disabled=not same_session,
+            help="Percentile of each metric among all drivers of this session.",
+        )
         try:
-            dna_df = compare_driver_dna(telA, telB, driverA, driverB)
+            dna_df = None
+            if same_session:
+                # Whole field computed once per session; any pair is instant
+                dna_table = snapshot_dna(get_snapshot(session), dna_relative)
+                if dna_table is None:
+                    dna_table = load_session_dna(session, relative=dna_relative)
+                dna_df = compare_session_dna(
+                    dna_table, data["codeA"], data["codeB"], driverA, driverB
+                )
+            if dna_df is None or dna_df.empty:
+                dna_df = compare_driver_dna(telA, telB, driverA, driverB)
 
             # Layout: Radar Chart Left, Time Loss Bar Right
             col_dna, col_loss = st.columns([1, 1])
@@ -276,11 +539,8 @@ if st.session_state.get("compare_result"):
         # --- CORNER TYPE ANALYSIS ---
         st.markdown("<h3>Performance by Corner Type</h3>", unsafe_allow_html=True)
 
-        # 1. Classify corners
-        tl_classified = add_corner_classification(tl)
-
-        # 2. Aggregate data
-        agg_types = aggregate_time_loss_by_type(tl_classified)
+        # 1. Classify corners, 2. aggregate per type (cached across reruns)
+        tl_classified, agg_types = classify_time_loss(tl)
 
         # 3. Visualization with Safety Check
         if agg_types is not None and not agg_types.empty:
@@ -319,38 +579,122 @@ if st.session_state.get("compare_result"):
         st.markdown("<h3>Apex Speed Share</h3>", unsafe_allow_html=True)
         plot_apex_speed_share(tl, key="apex_share_overview")
 
-    # -------------------------------------------------------
-    # DELTA LAP OVERLAY (Always visible below tabs)
-    # -------------------------------------------------------
-    st.markdown("<h3>Delta Lap Overlay</h3>", unsafe_allow_html=True)
-    try:
-        tel_sync = sync_telemetry(telA, telB)
-        dfA = tel_sync.rename(columns={"Speed_1": "Speed_A", "Time_1": "Time_A"})[
-            ["Distance", "Speed_A", "Time_A"]
-        ]
-        dfB = tel_sync.rename(columns={"Speed_2": "Speed_B", "Time_2": "Time_B"})[
-            ["Distance", "Speed_B", "Time_B"]
-        ]
-        delta_df = compute_delta_lap(dfA, dfB)
-        plot_delta_lap(delta_df, driverA, driverB)
-    except Exception as e:
-        st.warning(f"Could not compute Delta Lap: {e}")
-
     # -------------------------------------------------------
     # 2. DRIVER INPUTS TAB
     # -------------------------------------------------------
-    with tab_inputs:
+    elif view == "Driver Inputs":
         st.markdown(
             "<h2 class='section-title'>Driver Inputs</h2>", unsafe_allow_html=True
         )
+        map_modes = list(MAP_MODES)
+        if not same_session:
+            map_modes.remove("delta")
+        map_mode = st.radio(
+            "Track map colour",
+            map_modes,
+            horizontal=True,
+            format_func=str.capitalize,
+            key="track_map_mode",
+        )
         ctm1, ctm2 = st.columns(2)
         with ctm1:
-            plot_track_map(session, driverA, track)
+            plot_track_map(
+                session, data["codeA"], track, map_mode, other_code=data["codeB"]
+            )
         with ctm2:
-            plot_track_map(session, driverB, track)
+            if data.get("ideal"):
+                st.info("No position data for the ideal lap (stitched mini-sectors).")
+            else:
+                plot_track_map(
+                    session_b,
+                    data["codeB"],
+                    data["track_b"],
+                    map_mode,
+                    other_code=data["codeA"],
+                )
+
+        # Traces are downsampled to the chart width; a narrower range
+        # brings back full resolution for that part of the lap.
+        lap_end = float(max(telA["Distance"].max(), telB["Distance"].max()))
+        x_range = st.slider(
+            "Distance range (m)",
+            0.0,
+            lap_end,
+            (0.0, lap_end),
+            step=10.0,
+            key="inputs_x_range",
+        )
+        brushed = plot_speed_profile(
+            telA,
+            telB,
+            driverA,
+            driverB,
+            key="speed_prof_inputs",
+            x_range=x_range,
+            brush=True,
+        )
+
+        # Window statistics: box-select a range on the speed trace (or use
+        # the slider); answered from the prefix-sum index in O(1)
+        window = brushed or x_range
+        window_stats = pair_range_index(telA, telB, driverA, driverB).window(*window)
+        st.caption(
+            f"Window {window[0]:.0f}–{window[1]:.0f} m "
+            "(box-select on the speed trace to change)"
+        )
+        st.dataframe(
+            window_stats.style.format(
+                {
+                    "Time": "{:.3f}s",
+                    "TimeDelta": "{:+.3f}s",
+                    "AvgSpeed": "{:.1f}",
+                    "MinSpeed": "{:.1f}",
+                    "BrakePct": "{:.1f}%",
+                    "FullThrottlePct": "{:.1f}%",
+                }
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+        plot_brake_throttle(
+            telA, telB, driverA, driverB, key="brake_thr_inputs", x_range=x_range
+        )
+
+        # --- N-WAY OVERLAY (one stacked array on a shared grid) ---
+        st.markdown("<h3>Overlay</h3>", unsafe_allow_html=True)
+        col_src, col_ch = st.columns([2, 1])
+        with col_src:
+            overlay_source = st.radio(
+                "Overlay",
+                ["Drivers (fastest laps)", f"Laps of {driverA}"],
+                horizontal=True,
+                key="overlay_source",
+            )
+        with col_ch:
+            overlay_channel = st.selectbox(
+                "Channel", OVERLAY_CHANNELS, key="overlay_channel"
+            )
 
-        plot_speed_profile(telA, telB, driverA, driverB, key="speed_prof_inputs")
-        plot_brake_throttle(telA, telB, driverA, driverB, key="brake_thr_inputs")
+        if overlay_source.startswith("Drivers"):
+            field_overlay = snapshot_overlay(get_snapshot(session))
+            if field_overlay is None:
+                field_overlay = load_field_overlay(session)
+            options = field_overlay["labels"] if field_overlay else []
+            default = [c for c in (data["codeA"], data["codeB"]) if c in options]
+            overlay_codes = st.multiselect(
+                "Drivers", options, default=default, key="overlay_drivers"
+            )
+            overlay = select_rows(field_overlay, overlay_codes) if options else None
+        else:
+            n_laps = st.slider(
+                "Last laps", 2, MAX_OVERLAY_LAPS, 10, key="overlay_n_laps"
+            )
+            lap_overlay = load_lap_overlay(session, data["codeA"])
+            overlay = last_laps(lap_overlay, n_laps) if lap_overlay else None
+
+        plot_trace_overlay(
+            overlay, overlay_channel, key="overlay_inputs", x_range=x_range
+        )
 
         col_gear1, col_gear2 = st.columns(2)
         with col_gear1:
@@ -358,10 +702,18 @@ if st.session_state.get("compare_result"):
         with col_gear2:
             plot_gear_usage(telB, driverB, key="gear_B")
 
+        # --- DELTA LAP OVERLAY ---
+        st.markdown("<h3>Delta Lap Overlay</h3>", unsafe_allow_html=True)
+        try:
+            delta_df = delta_lap_table(telA, telB)
+            plot_delta_lap(delta_df, driverA, driverB)
+        except Exception as e:
+            st.warning(f"Could not compute Delta Lap: {e}")
+
     # -------------------------------------------------------
     # 3. CORNERS TAB
     # -------------------------------------------------------
-    with tab_corners:
+    elif view == "Corners":
         st.markdown(
             "<h2 class='section-title'>Corner-by-Corner Data</h2>",
             unsafe_allow_html=True,
@@ -370,13 +722,58 @@ if st.session_state.get("compare_result"):
         # Or None if stretch causes issues on your version
         st.dataframe(tl, use_container_width=True)
 
+        # --- RACING LINE (lateral offset from the circuit centerline) ---
+        st.markdown("<h3>Racing Line</h3>", unsafe_allow_html=True)
+        line = load_session_line_offsets(session) if same_session else None
+        apex_col = f"{driverA}_ApexDistance"
+        if (
+            line is None
+            or driverA not in line["labels"]
+            or driverB not in line["labels"]
+            or apex_col not in tl.columns
+        ):
+            st.info("Racing lines need position data of both drivers in one session.")
+        else:
+            offset_a = line["offset"][line["labels"].index(driverA)]
+            offset_b = line["offset"][line["labels"].index(driverB)]
+            plot_racing_line(
+                line["distance"], offset_a, offset_b, driverA, driverB, key="line_cmp"
+            )
+
+            # A's apexes on the centerline's distance axis
+            apex = tl[apex_col] / telA["Distance"].max() * line["distance"][-1]
+            line_table = corner_line_offsets(
+                line["distance"], offset_a, offset_b, apex, tl["Corner"]
+            )
+            st.caption(
+                "Lateral offset in metres, + = left of the centerline. "
+                "Delta = A - B at entry / apex / exit (±60 m around the apex)."
+            )
+            st.dataframe(
+                line_table.merge(
+                    tl[
+                        [
+                            "Corner",
+                            "Delta_EntrySpeed",
+                            "Delta_ApexSpeed",
+                            "Delta_ExitSpeed",
+                        ]
+                    ],
+                    on="Corner",
+                    how="left",
+                ).round(2),
+                hide_index=True,
+                use_container_width=True,
+            )
+
     # -------------------------------------------------------
     # 4. COACHING TAB
     # -------------------------------------------------------
-    with tab_coaching:
+    elif view == "Coaching":
         st.markdown(
             "<h2 class='section-title'>AI Race Engineer</h2>", unsafe_allow_html=True
         )
+        tl_classified, agg_types = classify_time_loss(tl)
 
         # 1. GENERATE EXECUTIVE REPORT (Macro View)
         if (
@@ -401,7 +798,7 @@ if st.session_state.get("compare_result"):
         st.markdown("### Detailed Corner Analysis")
         st.caption("Specific telemetry deviations per corner.")
 
-        suggestions = coaching_suggestions(tl, driverA, driverB)
+        suggestions = coaching_suggestions(tl, driverA, driverB, circuit=track)
 
         if not suggestions:
             st.info("No significant weaknesses found in detail analysis.")
@@ -410,3 +807,93 @@ if st.session_state.get("compare_result"):
             for s in suggestions:
                 with st.expander(f"{s.split(':')[0]}", expanded=False):
                     st.write(s.split(":")[1] if ":" in s else s)
+
+        st.markdown("---")
+
+        # 3. CORNER INSIGHTS (structured records, text rendered per page)
+        st.markdown("### Corner Insights")
+        st.caption("Corners ranked by impact (exit > apex > entry speed delta).")
+
+        insight_records = build_insight_records(tl, driverA, driverB)
+        n_pages = insight_page_count(insight_records, INSIGHTS_PAGE_SIZE)
+
+        if n_pages == 0:
+            st.info("No corner insights available.")
+        else:
+            page = (
+                st.number_input(
+                    f"Page (1–{n_pages})",
+                    min_value=1,
+                    max_value=n_pages,
+                    value=1,
+                    key="insights_page",
+                )
+                - 1
+            )
+            for line in render_corner_insights(
+                insight_records, page, INSIGHTS_PAGE_SIZE
+            ):
+                st.markdown(f"- {line}")
+
+    # -------------------------------------------------------
+    # 5. STINT TAB (RACE MODE)
+    # -------------------------------------------------------
+    elif view == "Stint":
+        st.markdown(
+            "<h2 class='section-title'>Stint Consistency</h2>",
+            unsafe_allow_html=True,
+        )
+        st.caption(
+            "Corner metrics over every valid race lap (no in/out laps). "
+            "Trend = change per lap, e.g. tyre degradation."
+        )
+
+        # One frame per side (sides may come from different sessions)
+        sides = [(session, data["codeA"], driverA)]
+        if not data.get("ideal"):
+            sides.append((session_b, data["codeB"], driverB))
+
+        frames = []
+        for side_session, code, label in sides:
+            if side_session.name != "Race":
+                continue
+            feats = session_stint_features(side_session, [code])
+            if not feats.empty:
+                frames.append(feats.assign(Driver=label))
+        lap_feats = pd.concat(frames) if frames else pd.DataFrame()
+        consistency = corner_consistency(lap_feats)
+
+        if consistency.empty:
+            st.warning("No valid race laps found for stint analysis.")
+        else:
+            metric = st.selectbox(
+                "Metric", CONSISTENCY_METRICS, index=1, key="stint_metric"
+            )
+            plot_corner_consistency(consistency, metric, key="stint_consistency")
+            st.dataframe(consistency, hide_index=True, use_container_width=True)
+
+        # Driver DNA over the whole race (streamed lap by lap)
+        race_sides = [s for s in sides if s[0].name == "Race"]
+        if len(race_sides) == 2:
+            st.markdown("<h3>Race DNA</h3>", unsafe_allow_html=True)
+            (sess_1, code_1, label_1), (sess_2, code_2, label_2) = race_sides
+            acc_1 = load_race_dna(sess_1, code_1)
+            acc_2 = load_race_dna(sess_2, code_2)
+            if acc_1.laps and acc_2.laps:
+                race_dna = compare_race_dna(acc_1, acc_2, label_1, label_2)
+                plot_driver_dna(race_dna, label_1, label_2, key="radar_race")
+                st.caption(
+                    f"Based on {acc_1.laps} laps ({label_1}) and "
+                    f"{acc_2.laps} laps ({label_2})."
+                )
+
+    # -------------------------------------------------------
+    # RENDERER DIAGNOSTICS
+    # -------------------------------------------------------
+    with st.expander("Renderer diagnostics"):
+        stats = renderer_stats()
+        st.caption(
+            f"Open Matplotlib figures: {stats['live_figures']} · "
+            f"Cached figures: {stats['cached_figures']} · "
+            f"Process memory: {stats['memory_mb']} MB"
+        )
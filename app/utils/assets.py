@@ -0,0 +1,109 @@
+"""
+Static assets (CSS, JS, images) for the Streamlit pages.
+
+Files are read and encoded once per server process. Each bundle is injected
+once per browser session into the parent document's <head> (via a
+zero-height component), where it survives reruns and page switches, so
+reruns no longer resend stylesheets, scripts or the base64 logo.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import struct
+from functools import lru_cache
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "..", "assets")
+
+# session_state key: ids of the bundles this browser session already has
+INJECTED_KEY = "_injected_assets"
+
+
+# ---------------------------------------------------------
+# 1. READ ONCE PER PROCESS
+# ---------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def read_asset(file_name: str, binary: bool = False):
+    """Contents of app/assets/<file_name> (None if missing)."""
+    path = os.path.join(ASSETS_DIR, file_name)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb" if binary else "r", encoding=None if binary else "utf-8") as f:
+        return f.read()
+
+
+@st.cache_resource(show_spinner=False)
+def image_css(file_name: str, selector: str) -> str:
+    """
+    CSS rule showing a PNG as the background of `selector`, with the
+    image's aspect ratio, so the markup only needs an empty element.
+    """
+    data = read_asset(file_name, binary=True)
+    if not data:
+        return ""
+    width, height = struct.unpack(">II", data[16:24])  # PNG IHDR
+    encoded = base64.b64encode(data).decode()
+    return (
+        f"{selector} {{ background: url(data:image/png;base64,{encoded}) "
+        f"center / contain no-repeat; aspect-ratio: {width} / {height}; }}"
+    )
+
+
+# ---------------------------------------------------------
+# 2. INJECT ONCE PER BROWSER SESSION
+# ---------------------------------------------------------
+@lru_cache(maxsize=64)
+def _bundle_id(name: str, css: str, js: str) -> str:
+    digest = hashlib.sha1((css + "\0" + js).encode()).hexdigest()[:12]
+    return f"asset-{name}-{digest}"
+
+
+def _script_literal(text: str) -> str:
+    # JSON string that cannot close the surrounding <script> tag
+    return json.dumps(text).replace("</", "<\\/")
+
+
+def inject_bundle(name: str, css: str = "", js: str = ""):
+    """
+    Adds a CSS / JS bundle to the page head once per browser session.
+    A changed bundle (new content hash) replaces the old version.
+    """
+    css, js = css or "", js or ""
+    bundle_id = _bundle_id(name, css, js)
+
+    injected = st.session_state.setdefault(INJECTED_KEY, set())
+    if bundle_id in injected:
+        return
+
+    components.html(
+        f"""
+<script>
+(function() {{
+    const doc = window.parent.document;
+    if (doc.getElementById({_script_literal(bundle_id)})) return;
+    doc.querySelectorAll('[data-asset-bundle={_script_literal(name)}]')
+        .forEach(el => el.remove());
+
+    const style = doc.createElement("style");
+    style.id = {_script_literal(bundle_id)};
+    style.dataset.assetBundle = {_script_literal(name)};
+    style.textContent = {_script_literal(css)};
+    doc.head.appendChild(style);
+
+    const js = {_script_literal(js)};
+    if (js) {{
+        const script = doc.createElement("script");
+        script.dataset.assetBundle = {_script_literal(name)};
+        script.textContent = js;
+        doc.head.appendChild(script);
+    }}
+}})();
+</script>
+""",
+        height=0,
+    )
+    injected.add(bundle_id)
@@ -1,9 +1,6 @@
-import streamlit as st
-import os
+from app.utils.assets import inject_bundle, read_asset
 
 
 def load_css(file_name="style.css"):
-    css_path = os.path.join(os.path.dirname(__file__), "..", "assets", file_name)
-
-    with open(css_path) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    """Injects app/assets/<file_name> once per browser session."""
+    inject_bundle(file_name, css=read_asset(file_name))
@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+
+from src.data.feature_engineering import corner_boundaries
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+APEX_WINDOW = 60.0  # metres around a reference apex searched for the lap's apex
+LAP_OFFSET = 1e5  # per-lap offset (> any lap length / duration) for stacked interp
+
+SECTOR_COLUMNS = ("Sector1SessionTime", "Sector2SessionTime")
+
+
+# ---------------------------------------------------------
+# 1. ANCHORS
+# ---------------------------------------------------------
+def sector_session_times(laps) -> np.ndarray:
+    """(n, 2) session times in seconds of the S1 / S2 boundaries (NaN if unknown)."""
+    if laps is None or not set(SECTOR_COLUMNS).issubset(laps.columns):
+        return np.full((0 if laps is None else len(laps), 2), np.nan)
+    return np.column_stack(
+        [pd.to_timedelta(laps[col]).dt.total_seconds() for col in SECTOR_COLUMNS]
+    )
+
+
+def _stacked_interp(lap_idx, x, xp_lap_idx, xp, fp):
+    """
+    np.interp of many laps in one call: every lap k is shifted by
+    k * LAP_OFFSET, so the concatenated anchor table stays increasing.
+    Anchors must be sorted by (lap, xp) and every lap needs at least one.
+    """
+    shift = lap_idx * LAP_OFFSET
+    anchor_shift = xp_lap_idx * LAP_OFFSET
+    return np.interp(x + shift, xp + anchor_shift, fp + anchor_shift) - shift
+
+
+def reference_anchors(ref_tel, sector_times) -> dict:
+    """
+    Anchor distances of the reference lap: lap length, the two sector
+    boundaries (from timing data) and the corner apexes.
+    """
+    dist = ref_tel["Distance"].to_numpy(dtype=float)
+    t = pd.to_timedelta(ref_tel["SessionTime"]).dt.total_seconds().to_numpy()
+    sectors = np.interp(sector_times, t, dist, left=np.nan, right=np.nan)
+    return {
+        "length": float(dist.max()),
+        "sectors": sectors,
+        "apexes": corner_boundaries(ref_tel)["ApexDistance"].to_numpy(dtype=float),
+    }
+
+
+def lap_anchors(tel, lap_numbers, sector_times, reference: dict) -> pd.DataFrame:
+    """
+    Matching anchor pairs for every lap of a stacked telemetry frame
+    ('LapNumber', 'SessionTime', 'Distance', 'Speed'), in one pass:
+
+    1. start / finish and the sector boundaries (timing data) give a
+       coarse piecewise mapping onto the reference lap
+    2. on that axis, the slowest sample within APEX_WINDOW of each
+       reference apex is the lap's apex
+
+    Returns LapNumber, RawDistance, Distance (reference), increasing in
+    both distances per lap.
+    """
+    lap_numbers = np.asarray(lap_numbers)
+    lap_idx = pd.Index(lap_numbers).get_indexer(tel["LapNumber"])
+    t = pd.to_timedelta(tel["SessionTime"]).dt.total_seconds().to_numpy()
+    order = np.lexsort((t, lap_idx))
+    lap_idx, t = lap_idx[order], t[order]
+    dist = tel["Distance"].to_numpy(dtype=float)[order]
+    speed = tel["Speed"].to_numpy(dtype=float)[order]
+    keep = lap_idx >= 0
+    lap_idx, t, dist, speed = lap_idx[keep], t[keep], dist[keep], speed[keep]
+
+    n = len(lap_numbers)
+    lengths = np.zeros(n)
+    np.maximum.at(lengths, lap_idx, dist)
+    starts = np.full(n, np.inf)
+    np.minimum.at(starts, lap_idx, t)
+    ends = np.full(n, -np.inf)
+    np.maximum.at(ends, lap_idx, t)
+
+    # 1. Start / finish + sector boundaries (lap distance at the timing event)
+    sector_times = np.asarray(sector_times, dtype=float).reshape(n, 2)
+    rows = np.repeat(np.arange(n), 2)
+    inside = (sector_times > starts[:, None]) & (sector_times < ends[:, None])
+    sector_raw = np.where(
+        inside.ravel(),
+        _stacked_interp(rows, sector_times.ravel(), lap_idx, t, dist),
+        np.nan,
+    )
+    coarse = pd.DataFrame(
+        {
+            "Lap": np.r_[np.arange(n), rows, np.arange(n)],
+            "RawDistance": np.r_[np.zeros(n), sector_raw, lengths],
+            "Distance": np.r_[
+                np.zeros(n),
+                np.tile(reference["sectors"], n),
+                np.full(n, reference["length"]),
+            ],
+        }
+    )
+    coarse = _monotonic(coarse)
+
+    # 2. Apexes: slowest sample near each reference apex on the coarse axis
+    apexes = np.sort(reference["apexes"])
+    pairs = coarse
+    if len(apexes) and len(dist):
+        approx = _stacked_interp(
+            lap_idx,
+            dist,
+            coarse["Lap"].to_numpy(),
+            coarse["RawDistance"].to_numpy(),
+            coarse["Distance"].to_numpy(),
+        )
+        hi = np.clip(np.searchsorted(apexes, approx), 0, len(apexes) - 1)
+        lo = np.clip(hi - 1, 0, None)
+        k = np.where(np.abs(approx - apexes[lo]) <= np.abs(approx - apexes[hi]), lo, hi)
+        near = np.abs(approx - apexes[k]) <= APEX_WINDOW
+        window = pd.DataFrame(
+            {
+                "Lap": lap_idx[near],
+                "Apex": k[near],
+                "Speed": speed[near],
+                "RawDistance": dist[near],
+                "Offset": np.abs(approx - apexes[k])[near],
+            }
+        ).dropna(subset=["Speed"])
+        if not window.empty:
+            slowest = window.loc[window.groupby(["Lap", "Apex"])["Speed"].idxmin()]
+            # A minimum on the window edge is not this corner's apex
+            slowest = slowest[slowest["Offset"] < 0.8 * APEX_WINDOW]
+            matched = pd.DataFrame(
+                {
+                    "Lap": slowest["Lap"].to_numpy(),
+                    "RawDistance": slowest["RawDistance"].to_numpy(),
+                    "Distance": apexes[slowest["Apex"].to_numpy()],
+                }
+            )
+            pairs = _monotonic(pd.concat([coarse, matched], ignore_index=True))
+
+    pairs.insert(0, "LapNumber", lap_numbers[pairs.pop("Lap").to_numpy()])
+    return pairs.reset_index(drop=True)
+
+
+def _monotonic(pairs: pd.DataFrame) -> pd.DataFrame:
+    """Drops missing anchors and those that would fold the lap back on itself."""
+    pairs = pairs.dropna().sort_values(["Lap", "Distance", "RawDistance"])
+    pairs = pairs.drop_duplicates(subset=["Lap", "Distance"])
+    keep = np.ones(len(pairs), dtype=bool)
+    while True:
+        kept = pairs[keep]
+        step = kept.groupby("Lap")["RawDistance"].diff()
+        bad = (step <= 0).to_numpy()
+        if not bad.any():
+            return kept
+        keep[np.flatnonzero(keep)[bad]] = False
+
+
+# ---------------------------------------------------------
+# 2. APPLY
+# ---------------------------------------------------------
+def apply_anchors(tel, anchors: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rescales 'Distance' of stacked lap telemetry piecewise linearly between
+    each lap's anchors (one np.interp for all laps). The integrated distance
+    is kept as 'RawDistance'. Laps without anchors are left unchanged.
+    """
+    if tel is None or tel.empty or anchors is None or anchors.empty:
+        return tel
+
+    lap_numbers = anchors["LapNumber"].unique()
+    lap_idx = pd.Index(lap_numbers).get_indexer(tel["LapNumber"])
+    anchor_idx = pd.Index(lap_numbers).get_indexer(anchors["LapNumber"])
+    order = np.lexsort((anchors["RawDistance"].to_numpy(), anchor_idx))
+
+    raw = tel["Distance"].to_numpy(dtype=float)
+    calibrated = _stacked_interp(
+        np.clip(lap_idx, 0, None),
+        raw,
+        anchor_idx[order],
+        anchors["RawDistance"].to_numpy(dtype=float)[order],
+        anchors["Distance"].to_numpy(dtype=float)[order],
+    )
+
+    tel = tel.copy()
+    tel["RawDistance"] = raw
+    tel["Distance"] = np.where(lap_idx >= 0, calibrated, raw)
+    return tel
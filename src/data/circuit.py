@@ -0,0 +1,302 @@
+import os
+import re
+
+import fastf1
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy.spatial import cKDTree
+
+from src.data.feature_engineering import corner_boundaries
+from src.data.load_data import cache_path, hash_session_id, load_reference_lap
+from src.data.resample import resample_telemetry
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+GEOMETRY_DIR = os.path.join(cache_path, "circuits")
+GEOMETRY_STEP = 5.0  # metres between outline points
+GEOMETRY_VERSION = 2  # bump when the loaders change (2: resampled, calibrated)
+INDEX_VERSION = 3  # bump when CircuitIndex changes (stored indexes rebuild)
+
+
+# ---------------------------------------------------------
+# 1. REFERENCE LAP (CANONICAL LAYOUT)
+# ---------------------------------------------------------
+def canonical_lap_length(session):
+    """Lap length in metres of the canonical layout (reference lap)."""
+    ref = load_reference_lap(session)
+    if ref is None or ref.empty:
+        return None
+    return float(ref["Distance"].max())
+
+
+# ---------------------------------------------------------
+# 2. DISTANCE NORMALIZATION
+# ---------------------------------------------------------
+def normalize_lap_distance(tel, reference_length: float):
+    """
+    Rescales a lap's 'Distance' onto the canonical lap length.
+
+    Adds:
+    - RawDistance: integrated distance as loaded
+    - LapFraction: normalized lap distance in [0, 1]
+    Distance becomes LapFraction * reference_length, so laps from different
+    sessions or seasons share one distance axis.
+    """
+    if tel is None or tel.empty or not reference_length:
+        return tel
+
+    df = pd.DataFrame(tel).copy()
+    lap_length = df["Distance"].max()
+    if lap_length <= 0:
+        return df
+
+    if "RawDistance" not in df.columns:
+        df["RawDistance"] = df["Distance"]
+    df["LapFraction"] = df["Distance"] / lap_length
+    df["Distance"] = df["LapFraction"] * reference_length
+    return df
+
+
+# ---------------------------------------------------------
+# 3. CIRCUIT GEOMETRY
+# ---------------------------------------------------------
+def circuit_key(session) -> str:
+    """'<year>_<location>': one layout per circuit and season."""
+    try:
+        event = session.event
+        name = f"{event['EventDate'].year}_{event['Location']}"
+    except Exception:
+        name = hash_session_id(session)
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", name)
+
+
+def build_circuit_geometry(pos, step: float = GEOMETRY_STEP) -> dict:
+    """
+    Track outline from a lap with X / Y / Distance, resampled every `step`
+    metres:
+    - fraction: (G,) lap fraction of every outline point (0..1)
+    - x, y:     (G,) outline coordinates
+    - segments: (G-1, 2, 2) line segments between consecutive points
+    """
+    pos = pos.dropna(subset=["X", "Y", "Distance"])
+    dist = pos["Distance"].to_numpy(dtype=float)
+    dist, first = np.unique(dist, return_index=True)
+    length = float(dist[-1])
+
+    n = max(int(round(length / step)), 1) + 1
+    fraction = np.linspace(0.0, 1.0, n)
+    x = np.interp(fraction * length, dist, pos["X"].to_numpy(dtype=float)[first])
+    y = np.interp(fraction * length, dist, pos["Y"].to_numpy(dtype=float)[first])
+
+    points = np.column_stack((x, y))
+    return {
+        "length": length,
+        "fraction": fraction,
+        "x": x,
+        "y": y,
+        "segments": np.stack([points[:-1], points[1:]], axis=1),
+    }
+
+
+@st.cache_data(
+    show_spinner="Loading circuit geometry...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_circuit_geometry(session):
+    """
+    Circuit geometry (see build_circuit_geometry) from the session's
+    fastest lap, computed once per circuit and stored in cache/circuits.
+    """
+    if session is None or not hasattr(session, "laps"):
+        return None
+
+    path = os.path.join(GEOMETRY_DIR, f"{circuit_key(session)}.v{GEOMETRY_VERSION}.npz")
+    if os.path.exists(path):
+        with np.load(path) as npz:
+            geometry = {k: npz[k] for k in npz.files}
+        geometry["length"] = float(geometry["length"])
+        return geometry
+
+    try:
+        fastest = session.laps.pick_fastest()
+        if fastest is None:
+            return None
+        pos = resample_telemetry(fastest.get_car_data(), fastest.get_pos_data())
+        geometry = build_circuit_geometry(pos)
+    except Exception as e:
+        print(f"Circuit Geometry Error: {e}")
+        return None
+
+    os.makedirs(GEOMETRY_DIR, exist_ok=True)
+    np.savez_compressed(path, **geometry)
+    return geometry
+
+
+def values_on_geometry(tel, channel: str, geometry: dict) -> np.ndarray:
+    """
+    A telemetry channel looked up at every outline point by lap fraction,
+    so any lap (any driver, any session) colours the cached outline.
+    """
+    dist = tel["Distance"].to_numpy(dtype=float)
+    frac = dist / dist.max()
+    return np.interp(geometry["fraction"], frac, tel[channel].to_numpy(dtype=float))
+
+
+# ---------------------------------------------------------
+# 4. SPATIAL INDEX (X / Y -> LAP DISTANCE)
+# ---------------------------------------------------------
+class CircuitIndex:
+    """
+    KD-tree over the circuit outline: maps track coordinates to lap
+    distance. A query finds the nearest outline point and projects onto
+    its two adjacent segments, so the distance is exact between points.
+
+    corners (optional): Corner / EntryDistance / ApexDistance / ExitDistance
+    on the same distance axis, for labelling map positions.
+    """
+
+    def __init__(self, geometry: dict, corners: pd.DataFrame = None):
+        self.length = float(geometry["length"])
+        self.fraction = np.asarray(geometry["fraction"], dtype=float)
+        self.points = np.column_stack((geometry["x"], geometry["y"])).astype(float)
+        self.tree = cKDTree(self.points)
+        self.corners = corners
+        self.version = INDEX_VERSION
+
+    def query(self, x, y, signed: bool = False):
+        """
+        Batch query (scalars or arrays of equal length).
+        Returns (distance along the lap in metres, distance to the
+        outline in track units). With signed=True the distance is
+        positive left of the driving direction and negative right of it.
+        """
+        p = np.column_stack((np.atleast_1d(x), np.atleast_1d(y))).astype(float)
+        _, nearest = self.tree.query(p)
+
+        last_segment = len(self.points) - 2
+        best_dist = np.full(len(p), np.inf)
+        best_along = np.zeros(len(p))
+        for k in (
+            np.clip(nearest - 1, 0, last_segment),
+            np.minimum(nearest, last_segment),
+        ):
+            a, b = self.points[k], self.points[k + 1]
+            ab = b - a
+            t = np.einsum("ij,ij->i", p - a, ab) / np.maximum(
+                np.einsum("ij,ij->i", ab, ab), 1e-12
+            )
+            t = np.clip(t, 0.0, 1.0)
+            dist = np.hypot(*(a + t[:, None] * ab - p).T)
+            frac = self.fraction[k] + t * (self.fraction[k + 1] - self.fraction[k])
+
+            if signed:
+                cross = ab[:, 0] * (p - a)[:, 1] - ab[:, 1] * (p - a)[:, 0]
+                side = np.where(cross < 0, -1.0, 1.0)
+            else:
+                side = 1.0
+
+            closer = dist < np.abs(best_dist)
+            best_dist[closer] = (side * dist)[closer]
+            best_along[closer] = frac[closer] * self.length
+        return best_along, best_dist
+
+    def metres_per_unit(self) -> float:
+        """Scale of the X / Y coordinates (FastF1: 1/10 m)."""
+        path = np.hypot(*np.diff(self.points, axis=0).T).sum()
+        return self.length / path if path > 0 else 1.0
+
+    def nearest_distance(self, x: float, y: float) -> float:
+        """
+        Lap distance (m) of a single track position (hover / click).
+        Scalar path of query() without array set-up.
+        """
+        _, i = self.tree.query((x, y))
+        last_segment = len(self.points) - 2
+        best = (np.inf, 0.0)
+        for k in (min(max(i - 1, 0), last_segment), min(i, last_segment)):
+            (ax, ay), (bx, by) = self.points[k], self.points[k + 1]
+            dx, dy = bx - ax, by - ay
+            t = ((x - ax) * dx + (y - ay) * dy) / max(dx * dx + dy * dy, 1e-12)
+            t = min(max(t, 0.0), 1.0)
+            dist = (ax + t * dx - x) ** 2 + (ay + t * dy - y) ** 2
+            if dist < best[0]:
+                frac = self.fraction[k] + t * (self.fraction[k + 1] - self.fraction[k])
+                best = (dist, frac * self.length)
+        return float(best[1])
+
+    def position_at(self, distance):
+        """Track coordinates (x, y) at the given lap distance(s)."""
+        frac = np.asarray(distance, dtype=float) / self.length
+        x = np.interp(frac, self.fraction, self.points[:, 0])
+        y = np.interp(frac, self.fraction, self.points[:, 1])
+        return x, y
+
+    def lap_distance(self, tel) -> np.ndarray:
+        """Lap distance of every X / Y sample of a lap (one batch query)."""
+        return self.query(tel["X"].to_numpy(), tel["Y"].to_numpy())[0]
+
+    def corner_at(self, distance):
+        """Corner number at the given lap distance(s), NaN on straights."""
+        distance = np.atleast_1d(np.asarray(distance, dtype=float))
+        if self.corners is None or self.corners.empty:
+            return np.full(len(distance), np.nan)
+        entry = self.corners["EntryDistance"].to_numpy(dtype=float)
+        exit_ = self.corners["ExitDistance"].to_numpy(dtype=float)
+        k = np.searchsorted(entry, distance, side="right") - 1
+        inside = (k >= 0) & (distance <= exit_[np.clip(k, 0, None)])
+        numbers = self.corners["Corner"].to_numpy(dtype=float)
+        return np.where(inside, numbers[np.clip(k, 0, None)], np.nan)
+
+
+def sample_at_distance(tel, distance):
+    """Index of the telemetry sample closest to each lap distance."""
+    dist = tel["Distance"].to_numpy(dtype=float)
+    distance = np.atleast_1d(np.asarray(distance, dtype=float))
+    k = np.clip(np.searchsorted(dist, distance), 1, len(dist) - 1)
+    return np.where(distance - dist[k - 1] <= dist[k] - distance, k - 1, k)
+
+
+def reference_corners(session, length: float):
+    """Corner windows of the reference lap, scaled to the geometry length."""
+    ref = load_reference_lap(session)
+    if ref is None or ref.empty:
+        return None
+    corners = corner_boundaries(ref).sort_values("EntryDistance")
+    scale = length / float(ref["Distance"].max())
+    for col in ("EntryDistance", "ApexDistance", "ExitDistance"):
+        corners[col] = corners[col] * scale
+    return corners.reset_index(drop=True)
+
+
+@st.cache_resource(
+    show_spinner="Building circuit index...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_circuit_index(session):
+    """
+    CircuitIndex of the session's circuit, shared by all sessions of the
+    server and stored next to the geometry in cache/circuits.
+    """
+    geometry = load_circuit_geometry(session)
+    if geometry is None:
+        return None
+
+    path = os.path.join(GEOMETRY_DIR, f"{circuit_key(session)}.index.pkl")
+    if os.path.exists(path):
+        try:
+            index = pd.read_pickle(path)
+            if getattr(index, "version", None) == INDEX_VERSION:
+                return index
+        except Exception as e:
+            print(f"Circuit Index Error: {e}")
+
+    try:
+        corners = reference_corners(session, geometry["length"])
+    except Exception as e:
+        print(f"Circuit Corner Error: {e}")
+        corners = None
+    index = CircuitIndex(geometry, corners)
+    pd.to_pickle(index, path)
+    return index
@@ -1,7 +1,15 @@
+import fastf1
 import pandas as pd
 import numpy as np
-from src.data.load_data import load_telemetry
+import streamlit as st
+from src.data.load_data import load_telemetry, hash_session_id
 from src.data.feature_engineering import build_features
+from src.data.circuit import (
+    canonical_lap_length,
+    normalize_lap_distance,
+    sample_at_distance,
+)
+from src.data.resample import STEPPED_CHANNELS
 
 # Falls preprocess_telemetry existiert, nutzen wir es.
 # Falls du die Datei nicht hast, können wir es hier auch weglassen oder einen Dummy nutzen.
@@ -16,7 +24,11 @@ except ImportError:
 def load_and_process_driver(session, driver_code):
     """Loads telemetry for a driver and runs full preprocessing + feature engineering."""
     tel = load_telemetry(session, driver_code)
+    return process_telemetry(tel, driver_code)
 
+
+def process_telemetry(tel, driver_code):
+    """Runs preprocessing + feature engineering on already loaded telemetry."""
     if tel is None or tel.empty:
         return pd.DataFrame()
 
@@ -30,21 +42,96 @@ def load_and_process_driver(session, driver_code):
     return features
 
 
+@st.cache_data(
+    show_spinner="Building corner features...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_driver_features(session, driver_code, reference_length=None):
+    """
+    Cached corner features of a driver's fastest lap.
+    With reference_length the lap is first rescaled onto the canonical
+    layout (see normalize_lap_distance), which makes ApexDistance
+    comparable across sessions.
+    """
+    tel = load_telemetry(session, driver_code)
+    if reference_length:
+        tel = normalize_lap_distance(tel, reference_length)
+    return process_telemetry(tel, driver_code)
+
+
+def load_aligned_telemetry(session, driver_code, reference_length):
+    """Fastest-lap telemetry on the canonical distance axis."""
+    return normalize_lap_distance(
+        load_telemetry(session, driver_code), reference_length
+    )
+
+
+def match_corners_by_apex(feat_ref, feat_other, tolerance=150.0):
+    """
+    Relabels the corners of feat_other with the Corner ID of the nearest
+    apex in feat_ref (both on the same distance axis).
+    Unmatched or duplicate detections are dropped.
+    """
+    if feat_ref.empty or feat_other.empty:
+        return feat_other
+
+    ref = (
+        feat_ref[["Corner", "ApexDistance"]]
+        .rename(columns={"Corner": "RefCorner"})
+        .sort_values("ApexDistance")
+    )
+    ref["RefApexDistance"] = ref["ApexDistance"]
+    matched = pd.merge_asof(
+        feat_other.sort_values("ApexDistance"),
+        ref,
+        on="ApexDistance",
+        direction="nearest",
+        tolerance=tolerance,
+    ).dropna(subset=["RefCorner"])
+
+    matched["Corner"] = matched["RefCorner"].astype(int)
+
+    # Two detections may snap to the same corner: keep the nearest one
+    matched["ApexOffset"] = (matched["ApexDistance"] - matched["RefApexDistance"]).abs()
+    matched = (
+        matched.sort_values("ApexOffset", kind="stable")
+        .drop_duplicates(subset="Corner")
+        .drop(columns=["RefCorner", "RefApexDistance", "ApexOffset"])
+    )
+    return matched.sort_values("Corner").reset_index(drop=True)
+
+
 def sync_telemetry(tel1, tel2):
     """
-    Synchronizes two telemetry datasets on the 'Distance' column.
-    Returns a DataFrame with matched speeds and timestamps.
+    Puts tel2 onto the distance samples of tel1: continuous and time
+    columns are interpolated linearly, discrete ones (integers, bools,
+    STEPPED_CHANNELS such as nGear) taken from the nearest sample.
+    Loaded laps share the calibrated distance axis, so no nearest-neighbour
+    join is needed. Shared column names get the suffixes _1 / _2.
     """
     if tel1 is None or tel2 is None:
         return pd.DataFrame()
 
-    merged = pd.merge_asof(
-        tel1.sort_values("Distance"),
-        tel2.sort_values("Distance"),
-        on="Distance",
-        direction="nearest",
-        suffixes=("_1", "_2"),
-    )
+    left = tel1.sort_values("Distance").reset_index(drop=True)
+    right = tel2.sort_values("Distance").reset_index(drop=True)
+    x = left["Distance"].to_numpy(dtype=float)
+    xp = right["Distance"].to_numpy(dtype=float)
+    nearest = sample_at_distance(right, x)
+
+    shared = (set(left.columns) & set(right.columns)) - {"Distance"}
+    merged = left.rename(columns={col: f"{col}_1" for col in shared})
+    for col in right.columns:
+        if col == "Distance":
+            continue
+        name = f"{col}_2" if col in shared else col
+        values = right[col]
+        if pd.api.types.is_timedelta64_dtype(values):
+            seconds = np.interp(x, xp, values.dt.total_seconds().to_numpy())
+            merged[name] = pd.to_timedelta(seconds, unit="s")
+        elif pd.api.types.is_float_dtype(values) and col not in STEPPED_CHANNELS:
+            merged[name] = np.interp(x, xp, values.to_numpy(dtype=float))
+        else:
+            merged[name] = values.to_numpy()[nearest]
     return merged
 
 
@@ -65,6 +152,26 @@ def compare_drivers_corner_level(session, driver_a: str, driver_b: str) -> pd.Da
     feat_a = load_and_process_driver(session, driver_a)
     feat_b = load_and_process_driver(session, driver_b)
 
+    return compare_corner_features(feat_a, feat_b, driver_a, driver_b)
+
+
+def compare_telemetry_corner_level(
+    tel_a, tel_b, driver_a: str, driver_b: str
+) -> pd.DataFrame:
+    """
+    Corner-by-corner comparison for two already loaded laps.
+    Used when one side is not a plain session driver (e.g. the ideal lap).
+    """
+    feat_a = process_telemetry(tel_a, driver_a)
+    feat_b = process_telemetry(tel_b, driver_b)
+
+    return compare_corner_features(feat_a, feat_b, driver_a, driver_b)
+
+
+def compare_corner_features(
+    feat_a: pd.DataFrame, feat_b: pd.DataFrame, driver_a: str, driver_b: str
+) -> pd.DataFrame:
+    """Merges two corner feature tables on Corner and computes the deltas (A - B)."""
     if feat_a.empty or feat_b.empty:
         return pd.DataFrame()
 
@@ -138,3 +245,26 @@ def compare_drivers_corner_level(session, driver_a: str, driver_b: str) -> pd.Da
     merged["CornerNumber"] = merged["Corner"]
 
     return merged
+
+
+def compare_across_sessions(
+    session_a, driver_a: str, session_b, driver_b: str, label_a: str, label_b: str
+) -> pd.DataFrame:
+    """
+    Corner-by-corner comparison of two laps from different sessions or
+    seasons on the same circuit (e.g. Q vs FP3, 2023 vs 2024).
+
+    Both laps are rescaled onto the canonical layout of session_a and
+    corners are matched by apex position instead of detection order.
+    Features are cached per (session, driver), so changing one side does
+    not recompute the other.
+    """
+    ref_length = canonical_lap_length(session_a)
+    if not ref_length:
+        return pd.DataFrame()
+
+    feat_a = load_driver_features(session_a, driver_a, ref_length)
+    feat_b = load_driver_features(session_b, driver_b, ref_length)
+    feat_b = match_corners_by_apex(feat_a, feat_b)
+
+    return compare_corner_features(feat_a, feat_b, label_a, label_b)
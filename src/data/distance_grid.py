@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+GRID_STEP = 2.0  # metres between grid points
+MIN_SPEED_MS = 1.0  # floor for dDistance / Speed integration
+
+
+def lap_length(tel) -> float:
+    """Integrated length of a lap in metres."""
+    return float(tel["Distance"].max())
+
+
+def make_grid(length: float, step: float = GRID_STEP) -> np.ndarray:
+    """Evenly spaced distance grid from 0 to length (both included)."""
+    n = max(int(round(length / step)), 1) + 1
+    return np.linspace(0.0, length, n)
+
+
+# ---------------------------------------------------------
+# 1. RESAMPLING ONTO A COMMON GRID
+# ---------------------------------------------------------
+def resample_laps(tels, channels=("Speed",), length=None, step=GRID_STEP):
+    """
+    Interpolates several laps onto one common distance grid.
+
+    Every lap's distance is rescaled to `length` (default: length of the
+    first lap) before interpolation, so start and finish line coincide.
+
+    Returns:
+        grid:  (G,) distance grid in metres
+        stack: dict channel -> (n_laps, G) float array
+    """
+    if length is None:
+        length = lap_length(tels[0])
+    grid = make_grid(length, step)
+
+    stack = {ch: np.full((len(tels), len(grid)), np.nan) for ch in channels}
+    for i, tel in enumerate(tels):
+        dist = tel["Distance"].to_numpy(dtype=float)
+        dist = dist / dist.max() * length
+        order = np.argsort(dist, kind="stable")
+        for ch in channels:
+            if ch not in tel.columns:
+                continue
+            values = pd.to_numeric(tel[ch], errors="coerce").to_numpy(dtype=float)
+            stack[ch][i] = np.interp(grid, dist[order], values[order])
+
+    return grid, stack
+
+
+# ---------------------------------------------------------
+# 2. INTEGRATED ELAPSED TIME
+# ---------------------------------------------------------
+def elapsed_time(speed_kmh: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    Elapsed time along the grid by integrating dDistance / Speed
+    (trapezoidal rule on 1 / v).
+
+    speed_kmh: (n_laps, G) speed on the grid
+    Returns (n_laps, G) elapsed seconds, starting at 0.
+    """
+    v = np.maximum(np.atleast_2d(speed_kmh) / 3.6, MIN_SPEED_MS)
+    inv_v = 1.0 / v
+    dt = np.diff(grid)[None, :] * 0.5 * (inv_v[:, :-1] + inv_v[:, 1:])
+    return np.concatenate([np.zeros((v.shape[0], 1)), np.cumsum(dt, axis=1)], axis=1)
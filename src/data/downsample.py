@@ -0,0 +1,110 @@
+import numpy as np
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+PLOT_WIDTH_PX = 1200  # typical width of a full-width chart
+POINTS_PER_PX = 2  # min + max per pixel column
+
+
+def max_points(width_px: int = PLOT_WIDTH_PX) -> int:
+    """Point budget of one trace for a chart `width_px` pixels wide."""
+    return int(width_px) * POINTS_PER_PX
+
+
+def _finite(x, y):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ok = np.isfinite(x) & np.isfinite(y)
+    return x[ok], y[ok]
+
+
+# ---------------------------------------------------------
+# 1. MIN-MAX PER PIXEL BUCKET
+# ---------------------------------------------------------
+def minmax_indices(x, y, n_buckets: int) -> np.ndarray:
+    """
+    Indices of the minimum and maximum sample in each of `n_buckets`
+    equally wide x-buckets (one per pixel column), plus first and last.
+
+    Keeps every spike and step (brake, throttle, gear), so the rendered
+    line looks the same as with all samples. x must be sorted.
+    """
+    n = len(x)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    span = x[-1] - x[0]
+    if span <= 0:
+        return np.array([0, n - 1])
+    bucket = np.minimum(((x - x[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+
+    # Sorted by (bucket, y): first of a bucket is its min, last its max
+    order = np.lexsort((y, bucket))
+    b_sorted = bucket[order]
+    first = np.r_[True, b_sorted[1:] != b_sorted[:-1]]
+    last = np.r_[b_sorted[1:] != b_sorted[:-1], True]
+
+    keep = np.concatenate([order[first], order[last], [0, n - 1]])
+    return np.unique(keep)
+
+
+# ---------------------------------------------------------
+# 2. LARGEST-TRIANGLE-THREE-BUCKETS
+# ---------------------------------------------------------
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: picks `n_out` samples that keep the
+    visual shape of a smooth line (speed, RPM). x must be sorted.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean of every bucket (used as the third triangle corner)
+    cx = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / np.diff(edges)
+    cy = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / np.diff(edges)
+    cx, cy = np.r_[cx, x[-1]], np.r_[cy, y[-1]]
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs(
+            (x[a] - cx[i + 1]) * (by - y[a]) - (x[a] - bx) * (cy[i + 1] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+# ---------------------------------------------------------
+# 3. TRACE HELPER
+# ---------------------------------------------------------
+def downsample_xy(x, y, x_range=None, n_points: int = None, method="minmax"):
+    """
+    Plot-ready (x, y) arrays for one trace.
+
+    x_range: optional (start, end) window; only samples inside it are
+             kept, so zooming in returns full resolution again once the
+             window holds fewer samples than the budget.
+    n_points: point budget (default: max_points()).
+    method:  'minmax' (spiky signals) or 'lttb' (smooth signals).
+    """
+    x, y = _finite(x, y)
+    if x_range is not None:
+        inside = (x >= x_range[0]) & (x <= x_range[1])
+        x, y = x[inside], y[inside]
+
+    n_points = n_points or max_points()
+    if len(x) <= n_points:
+        return x, y
+
+    if method == "lttb":
+        idx = lttb_indices(x, y, n_points)
+    else:
+        idx = minmax_indices(x, y, n_points // 2)
+    return x[idx], y[idx]
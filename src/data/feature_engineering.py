@@ -2,21 +2,31 @@ import pandas as pd
 import numpy as np
 from scipy.signal import find_peaks
 
+from src.data.resample import NATIVE_CAR_HZ, window_samples
+
+# Entry / exit search window in seconds (40 samples at FastF1's native car rate)
+CORNER_WINDOW_SECONDS = 40 / NATIVE_CAR_HZ
+
 # ----------------------------------------------------------
 # 1. Corner Segmentation
 # ----------------------------------------------------------
 
 
-def segment_corners(tel, prominence=5, window=40):
+def corner_boundaries(tel, prominence=5, window=None):
     """
-    Corner segmentation:
+    Corner boundaries on the lap distance axis:
     - Finds apexes via local speed minima
     - Detects entry: where speed begins to fall
     - Detects exit: where speed recovers after apex
-    - Assigns a corner ID only for valid corner segments
-    """
 
-    df = tel.copy()
+    window: samples scanned from the apex (default CORNER_WINDOW_SECONDS
+    at the frame's sample rate)
+
+    Returns DataFrame: Corner, EntryDistance, ApexDistance, ExitDistance
+    """
+    df = tel.reset_index(drop=True)
+    if window is None:
+        window = window_samples(df, CORNER_WINDOW_SECONDS)
 
     # Speed signal (smoothed if available)
     speed = df["Speed_smooth"] if "Speed_smooth" in df.columns else df["Speed"]
@@ -45,18 +55,32 @@ def segment_corners(tel, prominence=5, window=40):
         exit_dist = df["Distance"].iloc[exit]
 
         # Save segment
-        segments.append((entry_dist, apex_dist, exit_dist))
+        segments.append((corner_id, entry_dist, apex_dist, exit_dist))
 
         corner_id += 1
 
+    return pd.DataFrame(
+        segments,
+        columns=["Corner", "EntryDistance", "ApexDistance", "ExitDistance"],
+    )
+
+
+def segment_corners(tel, prominence=5, window=None):
+    """
+    Corner segmentation:
+    - Corner boundaries from corner_boundaries()
+    - Assigns a corner ID only for valid corner segments
+    """
+
+    df = tel.copy()
+    segments = corner_boundaries(df, prominence=prominence, window=window)
+
     # Assign Corner ID to telemetry
     df["Corner"] = 0
-    cid = 1
 
-    for entry, apex, exit in segments:
+    for cid, entry, apex, exit in segments.itertuples(index=False):
         mask = (df["Distance"] >= entry) & (df["Distance"] <= exit)
         df.loc[mask, "Corner"] = cid
-        cid += 1
 
     # Remove non-corner (=0)
     df = df[df["Corner"] > 0].copy()
@@ -77,6 +101,7 @@ def compute_corner_features(tel):
     - Exit Speed
     - Speed Loss (Entry → Apex)
     - Speed Gain (Apex → Exit)
+    - Apex Distance (position of the apex on the lap)
     """
     corner_ids = tel["Corner"].unique()
     features = []
@@ -90,6 +115,7 @@ def compute_corner_features(tel):
         entry = seg["Speed"].iloc[0]
         apex = seg["Speed"].min()
         exit = seg["Speed"].iloc[-1]
+        apex_dist = seg["Distance"].loc[seg["Speed"].idxmin()]
 
         features.append(
             {
@@ -99,6 +125,7 @@ def compute_corner_features(tel):
                 "ExitSpeed": float(exit),
                 "SpeedLoss": float(entry - apex),
                 "SpeedGain": float(exit - apex),
+                "ApexDistance": float(apex_dist),
             }
         )
 
@@ -0,0 +1,189 @@
+import fastf1
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.data.load_data import (
+    hash_session_id,
+    load_lap_telemetries,
+    load_telemetry,
+)
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+MINI_SECTORS = 50
+
+IDEAL_SCOPE_FIELD = "field"  # best mini-sector of any driver
+IDEAL_SCOPE_DRIVER = "driver"  # best mini-sector of one driver across all laps
+
+IDEAL_LAP_CODE = "IDEAL"
+
+# Channels carried over from the source laps into the stitched lap
+IDEAL_CHANNELS = ["Speed", "RPM", "nGear", "Throttle", "Brake", "DRS"]
+
+
+def ideal_lap_code(driver_code=None):
+    """Pseudo driver code used for the ideal lap in comparison tables."""
+    if driver_code:
+        return f"{driver_code}-{IDEAL_LAP_CODE}"
+    return IDEAL_LAP_CODE
+
+
+# ---------------------------------------------------------
+# 1. MINI-SECTOR TIME MATRIX
+# ---------------------------------------------------------
+def _stack_laps(laps_tel):
+    """
+    Concatenates lap telemetries into one long frame with a 'LapIndex'
+    (row of the time matrix), a 'SourceIndex' (position in laps_tel) and a
+    per-lap normalized distance 'LapFraction' in [0, 1].
+    """
+    frames = []
+    for i, tel in enumerate(laps_tel):
+        if tel is None or tel.empty or tel["Distance"].max() <= 0:
+            continue
+        df = pd.DataFrame(tel).sort_values("Distance").reset_index(drop=True)
+        df["LapIndex"] = len(frames)
+        df["SourceIndex"] = i
+        df["LapLength"] = df["Distance"].iloc[-1]
+        df["LapFraction"] = df["Distance"] / df["LapLength"]
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_sector_time_matrix(stacked: pd.DataFrame, n_sectors: int = MINI_SECTORS):
+    """
+    Builds the (lap × mini-sector) time matrix from stacked lap telemetry.
+
+    Mini-sector boundaries sit at equal fractions of each lap's own length,
+    so integration drift in 'Distance' does not shift sectors between laps.
+
+    Returns:
+        boundary_times: (n_laps, n_sectors + 1) elapsed time at each boundary
+        sector_times:   (n_laps, n_sectors) time spent in each mini-sector
+    """
+    n_laps = int(stacked["LapIndex"].max()) + 1
+    lap = stacked["LapIndex"].to_numpy()
+    frac = stacked["LapFraction"].to_numpy()
+    t = stacked["Time"].dt.total_seconds().to_numpy()
+
+    # One np.interp for all laps: shift every lap onto its own [2i, 2i + 1]
+    # interval and add the lap start (fraction 0, time 0) to each lap.
+    xp = np.concatenate([np.arange(n_laps) * 2.0, frac + lap * 2.0])
+    fp = np.concatenate([np.zeros(n_laps), t])
+    order = np.argsort(xp, kind="stable")
+
+    edges = np.linspace(0.0, 1.0, n_sectors + 1)
+    query = (edges[None, :] + np.arange(n_laps)[:, None] * 2.0).ravel()
+    boundary_times = np.interp(query, xp[order], fp[order]).reshape(n_laps, -1)
+
+    sector_times = np.diff(boundary_times, axis=1)
+    return boundary_times, sector_times
+
+
+# ---------------------------------------------------------
+# 2. STITCHING
+# ---------------------------------------------------------
+def stitch_ideal_lap(laps_tel, n_sectors: int = MINI_SECTORS, labels=None):
+    """
+    Stitches a theoretical best lap from the fastest mini-sectors of the
+    given laps.
+
+    Steps:
+    1. Stack all laps and build the (lap × mini-sector) time matrix
+    2. Pick the fastest lap per mini-sector (vectorized argmin)
+    3. Keep only the samples of the winning lap inside each mini-sector
+    4. Rebuild Time/Distance on the median lap length
+
+    labels: optional list (same order as laps_tel) naming the source of each
+    lap, e.g. driver codes. Stored in the 'SourceLap' column.
+    """
+    stacked = _stack_laps(laps_tel)
+    if stacked.empty:
+        return pd.DataFrame()
+
+    boundary_times, sector_times = build_sector_time_matrix(stacked, n_sectors)
+
+    best_lap = np.argmin(sector_times, axis=0)
+    best_times = sector_times[best_lap, np.arange(n_sectors)]
+    ideal_starts = np.concatenate([[0.0], np.cumsum(best_times)[:-1]])
+
+    # Samples belonging to the winning lap of their mini-sector
+    lap = stacked["LapIndex"].to_numpy()
+    sector = np.minimum(
+        (stacked["LapFraction"].to_numpy() * n_sectors).astype(int), n_sectors - 1
+    )
+    keep = best_lap[sector] == lap
+
+    ideal = stacked.loc[keep].copy()
+    lap = lap[keep]
+    sector = sector[keep]
+
+    t = ideal["Time"].dt.total_seconds().to_numpy()
+    t_ideal = t - boundary_times[lap, sector] + ideal_starts[sector]
+
+    ref_length = float(np.median(stacked.groupby("LapIndex")["LapLength"].first()))
+
+    ideal["Time"] = pd.to_timedelta(t_ideal, unit="s")
+    ideal["Distance"] = ideal["LapFraction"] * ref_length
+    ideal["MiniSector"] = sector + 1
+    source = ideal["SourceIndex"].to_numpy()
+    ideal["SourceLap"] = (
+        np.asarray(labels, dtype=object)[source] if labels is not None else source
+    )
+
+    cols = ["Time", "Distance"] + [c for c in IDEAL_CHANNELS if c in ideal.columns]
+    ideal = ideal[cols + ["MiniSector", "SourceLap"]]
+    ideal = ideal.sort_values("Distance").reset_index(drop=True)
+
+    if "nGear" not in ideal.columns:
+        ideal["nGear"] = 0
+    return ideal
+
+
+# ---------------------------------------------------------
+# 3. SESSION LEVEL (CACHED)
+# ---------------------------------------------------------
+@st.cache_data(
+    show_spinner="Building ideal lap...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_ideal_lap(
+    session,
+    scope: str = IDEAL_SCOPE_FIELD,
+    driver_code: str = None,
+    n_sectors: int = MINI_SECTORS,
+):
+    """
+    Theoretical best lap for a session.
+
+    scope="field":  fastest mini-sectors over every driver's fastest lap
+                    (load_telemetry data).
+    scope="driver": fastest mini-sectors over all valid laps of driver_code.
+    """
+    if session is None or not hasattr(session, "laps"):
+        return None
+
+    try:
+        if scope == IDEAL_SCOPE_DRIVER:
+            if not driver_code:
+                return None
+            stacked = load_lap_telemetries(session, driver_code)
+            if stacked is None or stacked.empty:
+                return None
+            groups = list(stacked.groupby("LapNumber"))
+            labels = [f"{driver_code} L{int(n)}" for n, _ in groups]
+            laps_tel = [g for _, g in groups]
+        else:
+            labels = sorted(session.laps["Driver"].dropna().unique())
+            laps_tel = [load_telemetry(session, code) for code in labels]
+
+        ideal = stitch_ideal_lap(laps_tel, n_sectors=n_sectors, labels=labels)
+        return ideal if not ideal.empty else None
+    except Exception as e:
+        print(f"Ideal Lap Error ({scope}): {e}")
+        return None
@@ -1,10 +1,20 @@
 import os
 import shutil
+import threading
+from collections import OrderedDict
 import fastf1
 import pandas as pd
 import numpy as np
 import streamlit as st
 
+from src.data.calibration import (
+    apply_anchors,
+    lap_anchors,
+    reference_anchors,
+    sector_session_times,
+)
+from src.data.resample import resample_telemetry
+
 # ---------------------------------------------------------
 # CONFIG & CACHE SETUP
 # ---------------------------------------------------------
@@ -19,6 +29,8 @@ os.makedirs(cache_path, exist_ok=True)
 # Cache aktivieren
 fastf1.Cache.enable_cache(cache_path)
 
+MAX_ANCHOR_LAPS = 5000  # laps of distance-calibration anchors kept per process
+
 
 # -------------------------------------------------------
 # HELPER: CUSTOM HASH FUNCTION
@@ -156,10 +168,8 @@ def load_telemetry(session, driver_code: str):
         if fastest is None:
             return None
 
-        tel = fastest.get_car_data().add_distance()
-        if "nGear" not in tel.columns:
-            tel["nGear"] = 0
-        return tel
+        # Same path as the multi-lap loaders, so Distance is calibrated too
+        return extract_lap_telemetries(laps[laps["LapNumber"] == fastest["LapNumber"]])
     except Exception as e:
         print(f"Telemetry Error ({driver_code}): {e}")
         return None
@@ -189,44 +199,16 @@ def load_telemetry_with_position(session, driver_code: str):
 
         # Positionsdaten können fehlen (z.B. 2017 und früher oft lückenhaft)
         try:
-            pos = fastest.get_telemetry()[["Time", "X", "Y"]].copy()
+            pos = fastest.get_pos_data()
         except:
             # Fallback für alte Jahre ohne GPS-Daten
             return None
 
-        pos["Time_s"] = pos["Time"].dt.total_seconds()
-        car = fastest.get_car_data().copy()
-        car["Time_s"] = car["Time"].dt.total_seconds()
-
-        merged = pd.merge_asof(
-            pos.sort_values("Time_s"),
-            car.sort_values("Time_s"),
-            on="Time_s",
-            direction="nearest",
-            tolerance=0.03,
-        )
-
-        # Fix Speed Gaps
-        if "Speed" in merged.columns and merged["Speed"].isna().sum() > 0:
-            dx = np.diff(merged["X"])
-            dy = np.diff(merged["Y"])
-            dist_xy = np.sqrt(dx**2 + dy**2)
-            dt = np.diff(merged["Time_s"])
-            dt = np.where(dt == 0, np.nan, dt)
-            speed_calc = np.zeros(len(merged))
-            speed_calc[1:] = (dist_xy / dt) * 3.6
-            merged["Speed"] = merged["Speed"].fillna(
-                pd.Series(speed_calc, index=merged.index)
-            )
-
-        # Fix Distance
-        if "Distance" not in merged.columns or merged["Distance"].isna().sum() > 0:
-            dx = np.diff(merged["X"])
-            dy = np.diff(merged["Y"])
-            d = np.sqrt(dx**2 + dy**2)
-            merged["Distance"] = np.concatenate([[0], np.cumsum(d)])
-
-        return merged
+        # Car + position on one time base; gaps are flagged in 'Dropout'
+        tel = resample_telemetry(fastest.get_car_data(), pos)
+        if tel is not None and "nGear" not in tel.columns:
+            tel["nGear"] = 0
+        return tel
     except Exception as e:
         print(f"Pos Telemetry Error ({driver_code}): {e}")
         return None
@@ -259,3 +241,245 @@ def get_tracks_for_year(year: int):
     except Exception as e:
         print(f"Schedule Error {year}: {e}")
         return []
+
+
+# ---------------------------------------------------------
+# 5. LOAD TELEMETRY FOR ALL VALID LAPS (ONE PASS)
+# ---------------------------------------------------------
+def pick_valid_laps(laps):
+    """
+    Keeps timed laps that are representative of pace:
+    no in/out laps, no deleted laps, FastF1 accuracy flag set.
+    """
+    if laps is None or laps.empty:
+        return laps
+
+    laps = laps[laps["LapTime"].notna() & laps["LapStartTime"].notna()]
+    laps = laps.pick_wo_box()
+    if "Deleted" in laps.columns:
+        laps = laps[~laps["Deleted"].fillna(False).astype(bool)]
+    if "IsAccurate" in laps.columns:
+        laps = laps[laps["IsAccurate"].fillna(False).astype(bool)]
+    return laps
+
+
+def extract_lap_telemetries(laps):
+    """
+    Slices the car data for a set of laps of ONE driver in a single pass and
+    splits it by lap start times.
+
+    Returns one stacked DataFrame with a 'LapNumber' column; 'Time' and
+    'Distance' restart at zero for every lap. Distance is calibrated onto
+    the session's reference lap (see calibrate_distance), the integrated
+    value is kept as 'RawDistance'. Not cached, so callers can stream over
+    lap chunks (the calibration anchors are cached per lap).
+    """
+    if laps is None or laps.empty:
+        return None
+
+    laps = laps.sort_values("LapStartTime")
+    car = resample_telemetry(laps.get_car_data(), time_col="SessionTime")
+    if car is None or car.empty:
+        return None
+
+    # Assign every sample to the lap whose [start, end] window contains it
+    starts = laps["LapStartTime"].dt.total_seconds().to_numpy()
+    ends = laps["Time"].dt.total_seconds().to_numpy()
+    session_t = car["SessionTime"].dt.total_seconds().to_numpy()
+
+    lap_idx = np.searchsorted(starts, session_t, side="right") - 1
+    valid = (lap_idx >= 0) & (session_t <= ends[np.clip(lap_idx, 0, None)])
+
+    tel = pd.DataFrame(car[valid]).reset_index(drop=True)
+    lap_idx = lap_idx[valid]
+
+    tel["LapNumber"] = laps["LapNumber"].to_numpy()[lap_idx].astype(int)
+    lap_t = session_t[valid] - starts[lap_idx]
+    tel["Time"] = pd.to_timedelta(lap_t, unit="s")
+
+    # Per-lap distance: the resampled Distance rebased to 0 at each lap's
+    # start line (interpolated between samples)
+    start_dist = np.interp(starts, session_t, car["Distance"].to_numpy())
+    tel["Distance"] = tel["Distance"].to_numpy() - start_dist[lap_idx]
+
+    if "nGear" not in tel.columns:
+        tel["nGear"] = 0
+
+    session = getattr(laps, "session", None)
+    if session is not None:
+        tel = calibrate_distance(session, tel, laps)
+    return tel
+
+
+@st.cache_data(
+    show_spinner="Processing lap telemetry...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_lap_telemetries(session, driver_code: str, lap_numbers=None):
+    """
+    Returns the car data of every valid lap of a driver as one stacked
+    DataFrame with a 'LapNumber' column (see extract_lap_telemetries).
+    """
+    if session is None:
+        return None
+    try:
+        if not hasattr(session, "laps"):
+            return None
+
+        laps = pick_valid_laps(session.laps.pick_driver(driver_code))
+        if laps is None or laps.empty:
+            return None
+        if lap_numbers is not None:
+            laps = laps[laps["LapNumber"].isin(list(lap_numbers))]
+
+        return extract_lap_telemetries(laps)
+    except Exception as e:
+        print(f"Lap Telemetry Error ({driver_code}): {e}")
+        return None
+
+
+@st.cache_data(
+    show_spinner="Processing fastest laps...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_top_lap_telemetries(session, driver_code: str, n: int = 5):
+    """
+    Car data of a driver's n fastest valid laps, stacked like
+    load_lap_telemetries (fastest lap first in 'LapRank' order).
+    """
+    if session is None or not hasattr(session, "laps"):
+        return None
+    try:
+        laps = pick_valid_laps(session.laps.pick_driver(driver_code))
+        if laps is None or laps.empty:
+            return None
+        laps = laps.sort_values("LapTime").head(n)
+
+        tel = extract_lap_telemetries(laps)
+        if tel is None:
+            return None
+        rank = dict(zip(laps["LapNumber"].astype(int), range(len(laps))))
+        tel["LapRank"] = tel["LapNumber"].map(rank)
+        return tel
+    except Exception as e:
+        print(f"Top Laps Error ({driver_code}): {e}")
+        return None
+
+
+@st.cache_data(
+    show_spinner="Loading field telemetry...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_field_telemetry(session):
+    """Fastest-lap telemetry of every driver in the session: code -> tel."""
+    if session is None or not hasattr(session, "laps"):
+        return {}
+    try:
+        drivers = session.laps["Driver"].dropna().unique()
+    except Exception as e:
+        print(f"Field Telemetry Error: {e}")
+        return {}
+
+    field = {code: load_telemetry(session, code) for code in drivers}
+    return {code: tel for code, tel in field.items() if tel is not None}
+
+
+# ---------------------------------------------------------
+# 6. DISTANCE CALIBRATION
+# ---------------------------------------------------------
+@st.cache_data(
+    show_spinner="Loading reference lap...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_reference_lap(session):
+    """
+    Car data of the session's overall fastest lap. It defines the canonical
+    layout of the circuit (lap length, distance axis) for this session.
+    """
+    if session is None or not hasattr(session, "laps"):
+        return None
+    try:
+        fastest = session.laps.pick_fastest()
+        if fastest is None:
+            return None
+        tel = resample_telemetry(fastest.get_car_data())
+        if tel is None:
+            return None
+        if "nGear" not in tel.columns:
+            tel["nGear"] = 0
+        return tel
+    except Exception as e:
+        print(f"Reference Lap Error: {e}")
+        return None
+
+
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_reference_anchors(session):
+    """Anchor distances (sector boundaries, apexes, length) of the reference lap."""
+    ref = load_reference_lap(session)
+    if ref is None or ref.empty:
+        return None
+    try:
+        fastest = session.laps.pick_fastest()
+        return reference_anchors(ref, sector_session_times(fastest.to_frame().T)[0])
+    except Exception as e:
+        print(f"Reference Anchor Error: {e}")
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def _anchor_store():
+    """LRU of (session, driver, lap number) -> anchor pairs, for all loaders."""
+    return OrderedDict(), threading.Lock()
+
+
+def calibrate_distance(session, tel, laps):
+    """
+    Rescales the Distance of stacked lap telemetry onto the session's
+    reference lap, piecewise between anchors (start / finish, sector
+    boundaries, corner apexes), so every lap's corners sit at the same
+    distance. Anchors are cached per lap; only laps seen for the first
+    time are matched (all of them in one vectorized pass).
+    """
+    if tel is None or tel.empty or laps is None or laps.empty:
+        return tel
+    try:
+        reference = load_reference_anchors(session)
+        if reference is None:
+            return tel
+
+        session_id = hash_session_id(session)
+        numbers = laps["LapNumber"].astype(int).to_numpy()
+        keys = {
+            n: (session_id, driver, n) for driver, n in zip(laps["Driver"], numbers)
+        }
+        store, lock = _anchor_store()
+        with lock:
+            anchors = {n: store[key] for n, key in keys.items() if key in store}
+            for n in anchors:
+                store.move_to_end(keys[n])
+
+        missing = ~np.isin(numbers, list(anchors))
+        if missing.any():
+            rows = tel[tel["LapNumber"].isin(numbers[missing])]
+            fresh = lap_anchors(
+                rows,
+                numbers[missing],
+                sector_session_times(laps[missing]),
+                reference,
+            )
+            with lock:
+                for n, pairs in fresh.groupby("LapNumber"):
+                    store[keys[int(n)]] = anchors[int(n)] = pairs
+                while len(store) > MAX_ANCHOR_LAPS:
+                    store.popitem(last=False)
+
+        if not anchors:
+            return tel
+        return apply_anchors(tel, pd.concat(anchors.values(), ignore_index=True))
+    except Exception as e:
+        print(f"Distance Calibration Error: {e}")
+        return tel
@@ -0,0 +1,95 @@
+import fastf1
+import numpy as np
+import streamlit as st
+
+from src.data.distance_grid import resample_laps
+from src.data.load_data import (
+    extract_lap_telemetries,
+    hash_session_id,
+    load_field_telemetry,
+    pick_valid_laps,
+)
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+OVERLAY_CHANNELS = ("Speed", "Throttle", "Brake", "nGear", "RPM")
+MAX_OVERLAY_LAPS = 20
+
+
+# ---------------------------------------------------------
+# 1. STACKS ON ONE DISTANCE GRID
+# ---------------------------------------------------------
+def build_overlay(tels: dict, channels=OVERLAY_CHANNELS) -> dict:
+    """
+    Resamples label -> telemetry onto one common distance grid.
+
+    Returns {"grid": (G,), "labels": [n], "stack": channel -> (n, G)}:
+    every trace of an overlay is then a row slice, no re-sync needed.
+    """
+    tels = {k: v for k, v in tels.items() if v is not None and not v.empty}
+    if not tels:
+        return None
+    labels = list(tels)
+    grid, stack = resample_laps([tels[k] for k in labels], channels=channels)
+    return {
+        "grid": grid,
+        "labels": labels,
+        "stack": {ch: arr.astype(np.float32) for ch, arr in stack.items()},
+    }
+
+
+def select_rows(overlay: dict, labels) -> dict:
+    """Sub-overlay with the given labels (in that order)."""
+    index = {label: i for i, label in enumerate(overlay["labels"])}
+    rows = [index[label] for label in labels if label in index]
+    return {
+        "grid": overlay["grid"],
+        "labels": [overlay["labels"][i] for i in rows],
+        "stack": {ch: arr[rows] for ch, arr in overlay["stack"].items()},
+    }
+
+
+def last_laps(overlay: dict, n: int) -> dict:
+    """Sub-overlay with the last n rows (laps)."""
+    return select_rows(overlay, overlay["labels"][-n:]) if n > 0 else None
+
+
+# ---------------------------------------------------------
+# 2. CACHED LOADERS
+# ---------------------------------------------------------
+@st.cache_data(
+    show_spinner="Building field overlay...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_field_overlay(session):
+    """Fastest lap of every driver, one row per driver code."""
+    field = load_field_telemetry(session)
+    return build_overlay(dict(sorted(field.items())))
+
+
+@st.cache_data(
+    show_spinner="Building lap overlay...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_lap_overlay(session, driver_code: str):
+    """
+    A driver's last MAX_OVERLAY_LAPS valid laps, one row per lap
+    ('L<number>', in lap order). Fewer laps are a row slice (last_laps).
+    """
+    if session is None or not hasattr(session, "laps"):
+        return None
+    try:
+        laps = pick_valid_laps(session.laps.pick_driver(driver_code))
+        if laps is None or laps.empty:
+            return None
+        laps = laps.sort_values("LapNumber").tail(MAX_OVERLAY_LAPS)
+        stacked = extract_lap_telemetries(laps)
+    except Exception as e:
+        print(f"Lap Overlay Error ({driver_code}): {e}")
+        return None
+    if stacked is None:
+        return None
+
+    tels = {f"L{lap}": tel for lap, tel in stacked.groupby("LapNumber", sort=True)}
+    return build_overlay(tels)
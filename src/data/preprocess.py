@@ -1,6 +1,11 @@
 import pandas as pd
 from scipy.signal import savgol_filter
 
+from src.data.resample import NATIVE_CAR_HZ, window_samples
+
+# Smoothing window in seconds (51 samples at FastF1's native car rate)
+SMOOTH_SECONDS = 51 / NATIVE_CAR_HZ
+
 
 def smooth_signal(series, window=51, poly=3):
     """Apply Savitzky–Golay smoothing to a telemetry series."""
@@ -12,7 +17,8 @@ def preprocess_telemetry(tel):
     Returns telemetry DataFrame with smoothed signals.
     """
     tel = tel.copy()
-    tel["Speed_smooth"] = smooth_signal(tel["Speed"])
-    tel["Throttle_smooth"] = smooth_signal(tel["Throttle"])
-    tel["Brake_smooth"] = smooth_signal(tel["Brake"])
+    window = window_samples(tel, SMOOTH_SECONDS, odd=True)
+    tel["Speed_smooth"] = smooth_signal(tel["Speed"], window)
+    tel["Throttle_smooth"] = smooth_signal(tel["Throttle"], window)
+    tel["Brake_smooth"] = smooth_signal(tel["Brake"], window)
     return tel
@@ -0,0 +1,220 @@
+"""
+Racing-line comparison: signed lateral offset of every driver from a
+per-circuit centerline.
+
+The centerline is the mean line of the session's fastest laps, built once
+per circuit and stored in cache/circuits next to the geometry. Offsets are
+in metres, positive = left of the driving direction.
+"""
+
+import os
+
+import fastf1
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.data.circuit import (
+    GEOMETRY_DIR,
+    CircuitIndex,
+    circuit_key,
+    load_circuit_index,
+)
+from src.data.load_data import hash_session_id, load_telemetry_with_position
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+MIN_CENTERLINE_LAPS = 3
+SMOOTH_POINTS = 9  # moving average of the mean offset (x 5 m outline step)
+CORNER_HALF_WINDOW = 60.0  # metres before / after the apex (entry / exit)
+CENTERLINE_VERSION = 2  # bump when the centerline build changes (file rebuilds)
+
+
+# ---------------------------------------------------------
+# 1. CENTERLINE
+# ---------------------------------------------------------
+def _moving_average(values, width):
+    """Centred moving average, wrapping around the lap."""
+    half = width // 2
+    if half == 0:
+        return values
+    padded = np.r_[values[len(values) - half :], values, values[:half]]
+    return np.convolve(padded, np.ones(2 * half + 1) / (2 * half + 1), mode="valid")
+
+
+def outline_normals(x, y):
+    """Unit normals pointing left of the driving direction."""
+    tx, ty = np.gradient(x), np.gradient(y)
+    norm = np.maximum(np.hypot(tx, ty), 1e-12)
+    return -ty / norm, tx / norm
+
+
+def build_centerline(index: CircuitIndex, laps_xy) -> dict:
+    """
+    Mean line of many laps: every lap's X / Y is projected onto the
+    outline (one batch query per lap), the signed offsets are averaged
+    per outline point and the outline is shifted along its normals.
+    Returns a geometry dict like build_circuit_geometry.
+    """
+    n_points = len(index.fraction)
+    sums = np.zeros(n_points)
+    counts = np.zeros(n_points)
+
+    for x, y in laps_xy:
+        along, offset = index.query(x, y, signed=True)
+        bins = np.rint(along / index.length * (n_points - 1)).astype(int)
+        sums += np.bincount(bins, weights=offset, minlength=n_points)
+        counts += np.bincount(bins, minlength=n_points)
+
+    seen = counts > 0
+    mean = np.zeros(n_points)
+    if seen.any():
+        mean = np.interp(
+            index.fraction, index.fraction[seen], sums[seen] / counts[seen]
+        )
+    mean = _moving_average(mean, SMOOTH_POINTS)
+
+    x, y = index.points[:, 0], index.points[:, 1]
+    nx, ny = outline_normals(x, y)
+    cx, cy = x + mean * nx, y + mean * ny
+    points = np.column_stack((cx, cy))
+    return {
+        "length": index.length,
+        "fraction": index.fraction,
+        "x": cx,
+        "y": cy,
+        "segments": np.stack([points[:-1], points[1:]], axis=1),
+    }
+
+
+@st.cache_data(
+    show_spinner="Loading position data...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_field_positions(session):
+    """Fastest-lap X / Y of every driver: code -> position telemetry."""
+    if session is None or not hasattr(session, "laps"):
+        return {}
+    drivers = sorted(session.laps["Driver"].dropna().unique())
+    field = {code: load_telemetry_with_position(session, code) for code in drivers}
+    return {
+        code: tel
+        for code, tel in field.items()
+        if tel is not None and {"X", "Y"}.issubset(tel.columns)
+    }
+
+
+@st.cache_resource(
+    show_spinner="Building centerline...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_centerline_index(session):
+    """
+    CircuitIndex over the circuit's centerline (built from the field's
+    fastest laps once per circuit, stored in cache/circuits).
+    """
+    base = load_circuit_index(session)
+    if base is None:
+        return None
+
+    path = os.path.join(
+        GEOMETRY_DIR, f"{circuit_key(session)}.centerline.v{CENTERLINE_VERSION}.npz"
+    )
+    if os.path.exists(path):
+        with np.load(path) as npz:
+            geometry = {k: npz[k] for k in npz.files}
+        geometry["length"] = float(geometry["length"])
+        return CircuitIndex(geometry, base.corners)
+
+    positions = load_field_positions(session)
+    if len(positions) < MIN_CENTERLINE_LAPS:
+        # Too few laps for a mean line: the outline itself is the reference
+        return base
+
+    laps_xy = [
+        (tel["X"].to_numpy(dtype=float), tel["Y"].to_numpy(dtype=float))
+        for tel in positions.values()
+    ]
+    geometry = build_centerline(base, laps_xy)
+    np.savez_compressed(path, **geometry)
+    return CircuitIndex(geometry, base.corners)
+
+
+# ---------------------------------------------------------
+# 2. LATERAL OFFSETS
+# ---------------------------------------------------------
+def lateral_offsets(index: CircuitIndex, positions: dict):
+    """
+    Signed lateral offset (m) of several laps, resampled onto the
+    centerline's points: returns (labels, (n, G) array).
+    """
+    scale = index.metres_per_unit()
+    distance = index.fraction * index.length
+    labels, rows = [], []
+    for label, tel in positions.items():
+        along, offset = index.query(
+            tel["X"].to_numpy(dtype=float), tel["Y"].to_numpy(dtype=float), True
+        )
+        order = np.argsort(along, kind="stable")
+        rows.append(np.interp(distance, along[order], offset[order] * scale))
+        labels.append(label)
+    return labels, np.array(rows).reshape(len(rows), len(distance))
+
+
+@st.cache_data(
+    show_spinner="Computing racing lines...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_session_line_offsets(session):
+    """
+    Lateral offsets of every driver's fastest lap in the session:
+    {"distance": (G,), "labels": [codes], "offset": (n, G)}.
+    """
+    index = load_centerline_index(session)
+    positions = load_field_positions(session)
+    if index is None or not positions:
+        return None
+    labels, offsets = lateral_offsets(index, positions)
+    return {
+        "distance": index.fraction * index.length,
+        "labels": labels,
+        "offset": offsets,
+    }
+
+
+# ---------------------------------------------------------
+# 3. PER-CORNER LINE DIFFERENCES
+# ---------------------------------------------------------
+def corner_line_offsets(distance, offset_a, offset_b, apex_distances, corners):
+    """
+    Line of two drivers at the corners given by their apex distances
+    (metres on the centerline axis):
+    Offset_{Entry,Apex,Exit}_A/B and Delta_* (A - B, + = A further left),
+    plus the mean absolute line difference over the corner window.
+    """
+    apex = np.asarray(apex_distances, dtype=float)
+    probes = {
+        "Entry": apex - CORNER_HALF_WINDOW,
+        "Apex": apex,
+        "Exit": apex + CORNER_HALF_WINDOW,
+    }
+    out = pd.DataFrame({"Corner": np.asarray(corners)})
+    for phase, at in probes.items():
+        a = np.interp(at, distance, offset_a)
+        b = np.interp(at, distance, offset_b)
+        out[f"LineOffset_{phase}_A"] = a
+        out[f"LineOffset_{phase}_B"] = b
+        out[f"Delta_Line{phase}"] = a - b
+
+    # Mean |A - B| over [entry, exit] from a prefix sum of the difference
+    gap = np.abs(np.asarray(offset_a) - np.asarray(offset_b))
+    step = np.diff(distance)
+    cum = np.r_[0.0, np.cumsum(step * 0.5 * (gap[:-1] + gap[1:]))]
+    lo = np.clip(probes["Entry"], distance[0], distance[-1])
+    hi = np.clip(probes["Exit"], distance[0], distance[-1])
+    width = np.maximum(hi - lo, 1e-9)
+    out["LineGap_Mean"] = (
+        np.interp(hi, distance, cum) - np.interp(lo, distance, cum)
+    ) / width
+    return out
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from src.data.distance_grid import elapsed_time
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+# Brake is a 0/1 step interpolated onto the grid: count a transition
+# sample as braking only from halfway up
+BRAKE_ON = 0.5  # Brake >= BRAKE_ON counts as braking
+FULL_THROTTLE_PCT = 99.0
+
+WINDOW_COLUMNS = [
+    "Lap",
+    "Time",
+    "TimeDelta",
+    "AvgSpeed",
+    "MinSpeed",
+    "BrakePct",
+    "FullThrottlePct",
+]
+
+
+def _cumulative(values, grid):
+    """(n, G) running trapezoid integral of values over distance."""
+    steps = np.diff(grid)[None, :] * 0.5 * (values[:, :-1] + values[:, 1:])
+    return np.concatenate([np.zeros((values.shape[0], 1)), np.cumsum(steps, axis=1)], 1)
+
+
+def _sparse_table(values):
+    """levels[k][:, i] = min(values[:, i : i + 2**k])"""
+    levels = [values]
+    width = 1
+    while 2 * width <= values.shape[1]:
+        prev = levels[-1]
+        levels.append(np.minimum(prev[:, :-width], prev[:, width:]))
+        width *= 2
+    return levels
+
+
+class RangeIndex:
+    """
+    O(1) window statistics for laps on a common distance grid.
+
+    Built once per set of laps (rows of an overlay stack, see
+    src.data.overlay): prefix integrals of elapsed time, braking and full
+    throttle plus a sparse table for the minimum speed. Any distance
+    window [start, end] is then answered from two lookups per row, no
+    matter how long the window or how many samples the laps had.
+    """
+
+    def __init__(self, grid, speed, brake, throttle, labels=None):
+        self.grid = np.asarray(grid, dtype=float)
+        speed = np.atleast_2d(np.asarray(speed, dtype=float))
+        self.labels = list(labels) if labels is not None else list(range(len(speed)))
+
+        self.time = elapsed_time(speed, self.grid)
+        braking = (np.atleast_2d(brake) >= BRAKE_ON).astype(float)
+        self.brake = _cumulative(braking, self.grid)
+        full = (np.atleast_2d(throttle) >= FULL_THROTTLE_PCT).astype(float)
+        self.full_throttle = _cumulative(full, self.grid)
+        self.min_levels = _sparse_table(np.nan_to_num(speed, nan=np.inf))
+
+    @classmethod
+    def from_overlay(cls, overlay: dict):
+        stack = overlay["stack"]
+        return cls(
+            overlay["grid"],
+            stack["Speed"],
+            stack["Brake"],
+            stack["Throttle"],
+            overlay["labels"],
+        )
+
+    def _bounds(self, start, end):
+        """Grid indices i <= j covering [start, end] (clipped to the lap)."""
+        start, end = sorted((float(start), float(end)))
+        i = int(np.searchsorted(self.grid, start, side="left"))
+        j = int(np.searchsorted(self.grid, end, side="right")) - 1
+        last = len(self.grid) - 1
+        i, j = min(max(i, 0), last), min(max(j, 0), last)
+        return (i, j) if i <= j else (j, i)
+
+    def _range_min(self, i, j):
+        k = int(np.log2(j - i + 1))
+        level = self.min_levels[k]
+        return np.minimum(level[:, i], level[:, j - 2**k + 1])
+
+    def window(self, start, end, reference=0) -> pd.DataFrame:
+        """
+        Statistics of every lap between two distances (metres): Time,
+        TimeDelta (vs. the reference row), AvgSpeed (distance / time, km/h),
+        MinSpeed and the distance share spent braking / at full throttle (%).
+        """
+        i, j = self._bounds(start, end)
+        length = self.grid[j] - self.grid[i]
+
+        time = self.time[:, j] - self.time[:, i]
+        if length > 0:
+            avg_speed = length / time * 3.6
+            brake = (self.brake[:, j] - self.brake[:, i]) / length * 100
+            full = (self.full_throttle[:, j] - self.full_throttle[:, i]) / length * 100
+        else:
+            avg_speed = brake = full = np.full(len(self.labels), np.nan)
+        min_speed = self._range_min(i, j)
+
+        return pd.DataFrame(
+            {
+                "Lap": self.labels,
+                "Time": time,
+                "TimeDelta": time - time[reference],
+                "AvgSpeed": avg_speed,
+                "MinSpeed": np.where(np.isfinite(min_speed), min_speed, np.nan),
+                "BrakePct": brake,
+                "FullThrottlePct": full,
+            },
+            columns=WINDOW_COLUMNS,
+        )
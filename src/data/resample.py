@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+RESAMPLE_HZ = 10.0  # common time base for car and position channels
+MAX_GAP_S = 0.5  # source interval longer than this = dropout (nominal ~0.25 s)
+NATIVE_CAR_HZ = 4.0  # FastF1 car data rate the sample-count windows were tuned on
+
+# Linearly interpolated vs. held at the last sample (discrete signals)
+CONTINUOUS_CHANNELS = ("Speed", "RPM", "Throttle", "X", "Y", "Z")
+STEPPED_CHANNELS = ("nGear", "DRS", "Brake")
+
+
+# ---------------------------------------------------------
+# 1. ONE CHANNEL ONTO THE TIME BASE
+# ---------------------------------------------------------
+def _seconds(values) -> np.ndarray:
+    """Timedelta column -> float seconds."""
+    return pd.to_timedelta(values).dt.total_seconds().to_numpy()
+
+
+def time_base(start: float, end: float, hz: float = RESAMPLE_HZ) -> np.ndarray:
+    """Fixed-rate sample times from start to end (seconds)."""
+    n = max(int(np.floor((end - start) * hz + 1e-9)), 0) + 1
+    return start + np.arange(n) / hz
+
+
+def source_gaps(source_t: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """
+    Length of the source interval each time falls into (inf outside the
+    source span), i.e. how far the interpolation has to bridge.
+    """
+    if len(source_t) < 2:
+        return np.full(len(t), np.inf)
+    idx = np.clip(np.searchsorted(source_t, t, side="right"), 1, len(source_t) - 1)
+    gaps = source_t[idx] - source_t[idx - 1]
+    outside = (t < source_t[0]) | (t > source_t[-1])
+    return np.where(outside, np.inf, gaps)
+
+
+def resample_channel(source_t, values, t, stepped=False):
+    """
+    Values of one channel at times t, from its finite source samples only
+    (NaN samples count as missing). Returns (values, gap lengths).
+    """
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    ok = np.isfinite(values) & np.isfinite(source_t)
+    source_t, values = source_t[ok], values[ok]
+    if len(values) == 0:
+        return np.full(len(t), np.nan), np.full(len(t), np.inf)
+
+    if stepped:
+        idx = np.searchsorted(source_t, t, side="right") - 1
+        out = values[np.clip(idx, 0, len(values) - 1)]
+    else:
+        out = np.interp(t, source_t, values)
+    return out, source_gaps(source_t, t)
+
+
+def sample_rate(tel, default: float = RESAMPLE_HZ) -> float:
+    """Samples per second of a telemetry frame (median 'Time' step)."""
+    if tel is None or "Time" not in tel.columns or len(tel) < 2:
+        return default
+    step = np.nanmedian(np.diff(_seconds(tel["Time"])))
+    return 1.0 / step if np.isfinite(step) and step > 0 else default
+
+
+def window_samples(tel, seconds: float, odd: bool = False) -> int:
+    """
+    A window given in seconds as a sample count for this frame, so
+    sample-based filters mean the same at any rate.
+    """
+    n = max(int(round(seconds * sample_rate(tel))), 1)
+    return n + 1 if odd and n % 2 == 0 else n
+
+
+# ---------------------------------------------------------
+# 2. CAR + POSITION ON ONE FIXED-RATE TIME BASE
+# ---------------------------------------------------------
+def _resample_stream(df, t, time_col):
+    """channel -> values at t, plus channel -> source gap lengths."""
+    source_t = _seconds(df[time_col])
+    order = np.argsort(source_t, kind="stable")
+    source_t = source_t[order]
+
+    columns, gaps = {}, {}
+    for ch in CONTINUOUS_CHANNELS + STEPPED_CHANNELS:
+        if ch not in df.columns:
+            continue
+        columns[ch], gaps[ch] = resample_channel(
+            source_t, df[ch].to_numpy()[order], t, stepped=ch in STEPPED_CHANNELS
+        )
+
+    # Other clocks (Time / SessionTime / Date) are affine in the time base
+    for col in df.columns:
+        if col == time_col or col in columns:
+            continue
+        if pd.api.types.is_timedelta64_dtype(df[col]):
+            clock = _seconds(df[col])[order]
+            columns[col] = pd.to_timedelta(np.interp(t, source_t, clock), unit="s")
+        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+            clock = df[col].to_numpy().astype("datetime64[ns]").astype(np.int64)[order]
+            columns[col] = pd.to_datetime(
+                np.interp(t, source_t, clock).astype(np.int64)
+            )
+    return columns, gaps
+
+
+def _dropouts(gaps: dict, n: int) -> np.ndarray:
+    """Samples where any channel bridged a source gap > MAX_GAP_S."""
+    dropout = np.zeros(n, dtype=bool)
+    for channel_gaps in gaps.values():
+        dropout |= channel_gaps > MAX_GAP_S
+    return dropout
+
+
+def xy_speed(x, y, dt, metres_per_unit=1.0) -> np.ndarray:
+    """Speed in km/h from positions sampled every dt seconds."""
+    return np.hypot(np.gradient(x, dt), np.gradient(y, dt)) * metres_per_unit * 3.6
+
+
+def integrate_distance(speed_kmh, dt) -> np.ndarray:
+    """Distance in metres from a fixed-rate speed trace (trapezoid rule)."""
+    v = np.nan_to_num(np.asarray(speed_kmh, dtype=float)) / 3.6
+    return np.concatenate([[0.0], np.cumsum(0.5 * (v[:-1] + v[1:]) * dt)])
+
+
+def resample_telemetry(car, pos=None, hz: float = RESAMPLE_HZ, time_col="Time"):
+    """
+    Car data (and optionally position data) on one fixed-rate time base.
+
+    Continuous channels are interpolated linearly, discrete ones (gear,
+    DRS, brake) held at the last sample. A sample is flagged in 'Dropout'
+    when any channel had to bridge a source gap > MAX_GAP_S. Speed inside
+    car-data dropouts is repaired from the X / Y track (when position is
+    available there) and Distance is always integrated from the repaired
+    speed, so every loader gets the same, spike-free Distance.
+    """
+    if car is None or car.empty or "Speed" not in car.columns:
+        return None
+
+    car_t = _seconds(car[time_col])
+    t = time_base(np.nanmin(car_t), np.nanmax(car_t), hz)
+    dt = 1.0 / hz
+
+    columns, car_gaps = _resample_stream(car, t, time_col)
+    car_dropout = _dropouts(car_gaps, len(t))
+    dropout = car_dropout.copy()
+
+    if pos is not None and not pos.empty and {"X", "Y"}.issubset(pos.columns):
+        pos_columns, pos_gaps = _resample_stream(pos[[time_col, "X", "Y"]], t, time_col)
+        pos_dropout = _dropouts(pos_gaps, len(t))
+        columns["X"], columns["Y"] = pos_columns["X"], pos_columns["Y"]
+        dropout |= pos_dropout
+
+        # Speed gaps: position-derived speed, scaled to metres on clean samples
+        speed = columns["Speed"]
+        broken = (car_gaps["Speed"] > MAX_GAP_S) & ~pos_dropout
+        if broken.any():
+            clean = ~car_dropout & ~pos_dropout
+            step_xy = np.hypot(np.gradient(columns["X"]), np.gradient(columns["Y"]))
+            path = step_xy[clean].sum()
+            scale = (speed[clean] / 3.6 * dt).sum() / path if path > 0 else 1.0
+            from_xy = xy_speed(columns["X"], columns["Y"], dt, scale)
+            columns["Speed"] = np.where(broken, from_xy, speed)
+
+    out = pd.DataFrame(columns)
+    out[time_col] = pd.to_timedelta(t, unit="s")
+    if "Brake" in out.columns:
+        out["Brake"] = out["Brake"].fillna(0).astype(bool)
+    if "nGear" in out.columns:
+        out["nGear"] = out["nGear"].fillna(0).astype(int)
+    out["Distance"] = integrate_distance(out["Speed"], dt)
+    out["Dropout"] = dropout
+
+    first = [time_col] + [c for c in car.columns if c in out.columns and c != time_col]
+    return out[first + [c for c in out.columns if c not in first]]
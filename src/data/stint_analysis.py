@@ -0,0 +1,168 @@
+import fastf1
+import pandas as pd
+import streamlit as st
+
+from src.data.load_data import (
+    extract_lap_telemetries,
+    hash_session_id,
+    pick_valid_laps,
+)
+from src.data.compare import process_telemetry
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+CHUNK_LAPS = 10  # laps held in memory at once per driver
+APEX_MATCH_TOLERANCE = 150.0  # metres between a lap apex and the reference apex
+
+
+def iter_lap_chunks(laps, chunk_size: int = CHUNK_LAPS):
+    """Yields consecutive slices of `laps` with at most chunk_size laps."""
+    laps = laps.sort_values("LapNumber")
+    for start in range(0, len(laps), chunk_size):
+        yield laps.iloc[start : start + chunk_size]
+
+
+# ---------------------------------------------------------
+# 1. PER-LAP CORNER FEATURES
+# ---------------------------------------------------------
+def build_lap_features(stacked: pd.DataFrame, driver_code: str) -> pd.DataFrame:
+    """
+    Runs preprocessing + corner feature engineering for every lap of a
+    stacked lap telemetry frame (see extract_lap_telemetries).
+    """
+    if stacked is None or stacked.empty:
+        return pd.DataFrame()
+
+    frames = []
+    for lap_number, tel in stacked.groupby("LapNumber", sort=True):
+        try:
+            feat = process_telemetry(tel.reset_index(drop=True), driver_code)
+        except ValueError:
+            # Lap too short for smoothing/segmentation
+            continue
+        if feat.empty:
+            continue
+        feat["LapNumber"] = int(lap_number)
+        frames.append(feat)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def align_corners(lap_features: pd.DataFrame, tolerance=APEX_MATCH_TOLERANCE):
+    """
+    Maps the corner IDs of every lap onto a reference lap (the fastest one
+    with the most common corner count) by nearest apex distance, so that
+    'Corner' means the same physical corner on every lap.
+    """
+    if lap_features.empty:
+        return lap_features
+
+    counts = lap_features.groupby("LapNumber")["Corner"].count()
+    modal = counts.mode().iloc[0]
+    candidates = counts[counts == modal].index
+    ref_lap = candidates[0]
+    if "LapTime" in lap_features.columns:
+        lap_times = lap_features.groupby("LapNumber")["LapTime"].first()
+        ref_lap = lap_times.loc[candidates].idxmin()
+    ref = (
+        lap_features.loc[
+            lap_features["LapNumber"] == ref_lap, ["Corner", "ApexDistance"]
+        ]
+        .rename(columns={"Corner": "RefCorner"})
+        .sort_values("ApexDistance")
+    )
+    ref["RefApexDistance"] = ref["ApexDistance"]
+
+    aligned = pd.merge_asof(
+        lap_features.drop(columns="Corner").sort_values("ApexDistance"),
+        ref,
+        on="ApexDistance",
+        direction="nearest",
+        tolerance=tolerance,
+    )
+    aligned = aligned.dropna(subset=["RefCorner"])
+    aligned = aligned.rename(columns={"RefCorner": "Corner"})
+    aligned["Corner"] = aligned["Corner"].astype(int)
+
+    # Two detections on one lap may snap to the same corner: keep the one
+    # closest to the reference apex
+    aligned["ApexOffset"] = (aligned["ApexDistance"] - aligned["RefApexDistance"]).abs()
+    aligned = (
+        aligned.sort_values("ApexOffset", kind="stable")
+        .drop_duplicates(subset=["LapNumber", "Corner"])
+        .drop(columns=["ApexOffset", "RefApexDistance"])
+    )
+    return aligned.sort_values(["LapNumber", "Corner"]).reset_index(drop=True)
+
+
+# ---------------------------------------------------------
+# 2. DRIVER / SESSION PIPELINE (CHUNKED)
+# ---------------------------------------------------------
+def stint_features(session, driver_code: str, chunk_size: int = CHUNK_LAPS):
+    """
+    Corner features for every valid lap of one driver.
+
+    Car data is extracted in one pass per chunk of laps and discarded after
+    feature engineering, so memory stays bounded by chunk_size laps of raw
+    telemetry regardless of race length.
+    """
+    if session is None or not hasattr(session, "laps"):
+        return pd.DataFrame()
+
+    laps = pick_valid_laps(session.laps.pick_driver(driver_code))
+    if laps is None or laps.empty:
+        return pd.DataFrame()
+
+    frames = []
+    for chunk in iter_lap_chunks(laps, chunk_size):
+        try:
+            stacked = extract_lap_telemetries(chunk)
+        except Exception as e:
+            print(f"Stint Telemetry Error ({driver_code}): {e}")
+            continue
+        feats = build_lap_features(stacked, driver_code)
+        del stacked
+        if not feats.empty:
+            frames.append(feats)
+
+    if not frames:
+        return pd.DataFrame()
+
+    feats = pd.concat(frames, ignore_index=True)
+
+    # Lap time for trend context
+    lap_times = laps.set_index("LapNumber")["LapTime"].dt.total_seconds()
+    feats["LapTime"] = feats["LapNumber"].map(lap_times)
+
+    return align_corners(feats)
+
+
+@st.cache_data(
+    show_spinner="Processing all laps...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_stint_features(session, driver_code: str, chunk_size: int = CHUNK_LAPS):
+    """Cached per (session, driver) wrapper around stint_features."""
+    return stint_features(session, driver_code, chunk_size)
+
+
+def session_stint_features(session, drivers=None, chunk_size: int = CHUNK_LAPS):
+    """
+    Per-lap corner features for all drivers of a session (long format).
+    Drivers are processed one after another; only the compact feature
+    tables are kept.
+    """
+    if session is None or not hasattr(session, "laps"):
+        return pd.DataFrame()
+
+    if drivers is None:
+        drivers = sorted(session.laps["Driver"].dropna().unique())
+
+    frames = [load_stint_features(session, code, chunk_size) for code in drivers]
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,276 @@
+"""
+Headless race-engineer reports for many driver pairs.
+
+Runs comparison -> corner classification -> report for every pair on a
+process pool and writes one JSON and one HTML file per pair.
+
+    python -m src.insights.batch_reports --year 2023 --track Silverstone --session Q
+    python -m src.insights.batch_reports --year 2023 --track Silverstone --pair VER:HAM
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from app.components.report_view import REPORT_CSS, build_report_html
+from src.data.compare import compare_drivers_corner_level
+from src.data.load_data import load_session, load_telemetry, project_root
+from src.insights.corner_utils import (
+    add_corner_classification,
+    aggregate_time_loss_by_type,
+)
+from src.insights.report_engine import generate_race_engineer_report
+from src.insights.time_loss_engine import estimate_time_loss_per_corner
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+REPORTS_DIR = os.path.join(project_root, "reports")
+MAX_WORKERS = 4
+
+# Corner table columns kept in the JSON output (if present)
+CORNER_COLUMNS = [
+    "Corner",
+    "CornerType",
+    "TimeLoss",
+    "TimeLoss_Braking",
+    "TimeLoss_MidCorner",
+    "TimeLoss_Traction",
+    "Delta_EntrySpeed",
+    "Delta_ApexSpeed",
+    "Delta_ExitSpeed",
+]
+
+
+# ---------------------------------------------------------
+# 1. PAIRS
+# ---------------------------------------------------------
+def session_report_pairs(session, teammates=True, pole=True):
+    """
+    (driver_a, driver_b, kind) for every driver vs. their teammate and vs.
+    the driver with the session's fastest lap (pole in qualifying).
+    """
+    laps = session.laps
+    drivers = sorted(laps["Driver"].dropna().unique())
+    pairs = []
+
+    if teammates and "Team" in laps.columns:
+        teams = laps.groupby("Driver")["Team"].first()
+        for code in drivers:
+            mates = teams[(teams == teams.get(code)) & (teams.index != code)]
+            pairs += [(code, mate, "teammate") for mate in mates.index]
+
+    if pole:
+        fastest = laps.pick_fastest()
+        if fastest is not None:
+            ref = fastest["Driver"]
+            pairs += [(code, ref, "pole") for code in drivers if code != ref]
+
+    return unique_pairs(pairs)
+
+
+def unique_pairs(pairs):
+    """
+    One entry per (driver_a, driver_b), so no pair is computed and written
+    twice (the pole driver's teammate is both); kinds are joined ('teammate+pole').
+    """
+    kinds = {}
+    for driver_a, driver_b, kind in pairs:
+        known = kinds.setdefault((driver_a, driver_b), [])
+        if kind not in known:
+            known.append(kind)
+    return [(a, b, "+".join(k)) for (a, b), k in kinds.items()]
+
+
+# ---------------------------------------------------------
+# 2. PIPELINE (ONE PAIR)
+# ---------------------------------------------------------
+def build_pair_report(session, driver_a, driver_b, circuit):
+    """Comparison -> classification -> report, as in the Coaching tab."""
+    tel_a = load_telemetry(session, driver_a)
+    tel_b = load_telemetry(session, driver_b)
+    comp = compare_drivers_corner_level(session, driver_a, driver_b)
+    tl = estimate_time_loss_per_corner(
+        comp, driver_a, driver_b, tel_a=tel_a, tel_b=tel_b, circuit=circuit
+    )
+
+    tl_classified = add_corner_classification(tl)
+    agg_types = aggregate_time_loss_by_type(tl_classified)
+    report = generate_race_engineer_report(
+        tl_classified, agg_types, driver_a, driver_b, circuit
+    )
+
+    corners = pd.DataFrame()
+    if tl_classified is not None and not tl_classified.empty:
+        corners = tl_classified[
+            [c for c in CORNER_COLUMNS if c in tl_classified.columns]
+        ]
+    return report, corners, agg_types
+
+
+def write_pair_outputs(out_dir, meta, report, corners, agg_types):
+    """Writes <A>_vs_<B>.json (structured) and .html (rendered) files."""
+    name = f"{meta['driver_a']}_vs_{meta['driver_b']}"
+    json_path = os.path.join(out_dir, f"{name}.json")
+    html_path = os.path.join(out_dir, f"{name}.html")
+
+    payload = {
+        **meta,
+        "report": report,
+        "corners": _records(corners),
+        "corner_types": _records(agg_types),
+    }
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+    title = f"{meta['event']} {meta['session']}: {name}"
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(
+            f"<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<title>{title}</title><style>body {{ background: #121212; }}"
+            f"{REPORT_CSS}</style></head><body>{build_report_html(report)}"
+            f"</body></html>"
+        )
+    return json_path, html_path
+
+
+def _records(df):
+    if df is None or df.empty:
+        return []
+    return json.loads(df.replace({np.nan: None}).to_json(orient="records"))
+
+
+# ---------------------------------------------------------
+# 3. PROCESS POOL
+# ---------------------------------------------------------
+def _report_worker(year, track, session_type, pairs, out_dir):
+    """Loads the session once (FastF1 cache) and reports a chunk of pairs."""
+    session = load_session(year, track, session_type)
+    if session is None:
+        return [
+            {
+                "driver_a": a,
+                "driver_b": b,
+                "kind": k,
+                "ok": False,
+                "error": "session not available",
+                "seconds": 0.0,
+            }
+            for a, b, k in pairs
+        ]
+
+    results = []
+    for driver_a, driver_b, kind in pairs:
+        t0 = time.perf_counter()
+        meta = {
+            "year": year,
+            "event": track,
+            "session": session.name,
+            "driver_a": driver_a,
+            "driver_b": driver_b,
+            "kind": kind,
+        }
+        try:
+            report, corners, agg_types = build_pair_report(
+                session, driver_a, driver_b, track
+            )
+            write_pair_outputs(out_dir, meta, report, corners, agg_types)
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, str(e)
+        results.append(
+            {
+                **meta,
+                "ok": ok,
+                "error": error,
+                "seconds": round(time.perf_counter() - t0, 3),
+            }
+        )
+    return results
+
+
+def run_batch(year, track, session_type, pairs=None, out_dir=None, workers=None):
+    """
+    Reports for all pairs of one session. Pairs are split into one chunk
+    per worker, so each process loads the session only once.
+    """
+    session = load_session(year, track, session_type)
+    if session is None:
+        return pd.DataFrame()
+
+    pairs = unique_pairs(pairs or session_report_pairs(session))
+    out_dir = out_dir or os.path.join(
+        REPORTS_DIR, f"{year}_{track}_{session_type}".replace(" ", "_")
+    )
+    os.makedirs(out_dir, exist_ok=True)
+
+    workers = max(1, min(workers or MAX_WORKERS, len(pairs), os.cpu_count() or 1))
+    chunks = [pairs[i::workers] for i in range(workers)]
+
+    t0 = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_report_worker, year, track, session_type, chunk, out_dir)
+            for chunk in chunks
+            if chunk
+        ]
+        for future in as_completed(futures):
+            results += future.result()
+    wall = time.perf_counter() - t0
+
+    summary = pd.DataFrame(results)
+    with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "wall_seconds": round(wall, 3),
+                "pairs_per_second": round(len(summary) / wall, 3) if wall else None,
+                "pairs": results,
+            },
+            f,
+            indent=2,
+        )
+    summary.attrs["wall_seconds"] = wall
+    return summary
+
+
+def parse_pair(text):
+    """'VER:HAM' -> ('VER', 'HAM', 'custom')"""
+    a, b = text.upper().split(":")
+    return a, b, "custom"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch race-engineer reports.")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--track", required=True)
+    parser.add_argument("--session", default="Q")
+    parser.add_argument("--pair", action="append", type=parse_pair)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(
+        args.year, args.track, args.session, args.pair, args.out, args.workers
+    )
+    if summary.empty:
+        print("No reports generated.")
+        return 1
+
+    print(summary[["driver_a", "driver_b", "kind", "ok", "seconds"]].to_string())
+    wall = summary.attrs["wall_seconds"]
+    print(
+        f"\n{int(summary['ok'].sum())}/{len(summary)} reports in {wall:.1f}s "
+        f"({len(summary) / wall:.2f} pairs/s, "
+        f"{summary['seconds'].mean():.2f}s per pair in the workers)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
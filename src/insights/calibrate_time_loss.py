@@ -0,0 +1,226 @@
+"""
+Offline calibration of the time-loss weights.
+
+Fits seconds-per-km/h weights for entry, apex and exit speed deltas per
+circuit and corner type from every valid lap of the given sessions, and
+writes them to the versioned model file read by
+estimate_time_loss_per_corner.
+
+    python -m src.insights.calibrate_time_loss --year 2023 --session Q
+    python -m src.insights.calibrate_time_loss --year 2023 --track Silverstone
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data.circuit import load_reference_lap
+from src.data.load_data import (
+    extract_lap_telemetries,
+    get_tracks_for_year,
+    load_session,
+    pick_valid_laps,
+)
+from src.insights.corner_utils import classify_corner_types
+from src.insights.time_loss_engine import corner_phase_times
+from src.insights.time_loss_model import (
+    FEATURES,
+    MIN_SAMPLES,
+    MODEL_PATH,
+    corner_weights,
+    fit_time_loss_model,
+    model_report,
+    save_time_loss_model,
+)
+
+
+# ---------------------------------------------------------
+# 1. CALIBRATION SAMPLES
+# ---------------------------------------------------------
+def session_lap_telemetries(session):
+    """
+    Every valid lap of every driver as a list of per-lap DataFrames, plus
+    a table (Driver, LapNumber, LapTime in seconds) in the same order.
+    """
+    laps = pick_valid_laps(session.laps)
+    if laps is None or laps.empty:
+        return [], pd.DataFrame()
+
+    tels, meta = [], []
+    for driver in laps["Driver"].unique():
+        driver_laps = laps[laps["Driver"] == driver]
+        try:
+            stacked = extract_lap_telemetries(driver_laps)
+        except Exception as e:
+            print(f"Calibration Telemetry Error ({driver}): {e}")
+            continue
+        if stacked is None:
+            continue
+
+        lap_times = driver_laps.set_index("LapNumber")["LapTime"].dt.total_seconds()
+        for lap_number, tel in stacked.groupby("LapNumber", sort=True):
+            tels.append(tel.reset_index(drop=True))
+            meta.append((driver, int(lap_number), lap_times.get(lap_number, np.nan)))
+
+    return tels, pd.DataFrame(meta, columns=["Driver", "LapNumber", "LapTime"])
+
+
+def session_calibration_samples(session, circuit: str) -> pd.DataFrame:
+    """
+    One row per (lap, corner) for a session, measured against the
+    session's fastest lap:
+
+    - Delta_EntrySpeed / Delta_ApexSpeed / Delta_ExitSpeed: lap - reference
+    - TimeLoss: integrated corner time, reference - lap (positive = lap
+      faster, same sign convention as estimate_time_loss_per_corner)
+    - LapTimeDelta: official lap time delta (reference - lap), used to check
+      the fitted weights against timing data
+    """
+    reference = load_reference_lap(session)
+    fastest = session.laps.pick_fastest()
+    if reference is None or fastest is None:
+        return pd.DataFrame()
+
+    tels, meta = session_lap_telemetries(session)
+    if not tels:
+        return pd.DataFrame()
+
+    windows, times, _, speeds = corner_phase_times([reference] + tels, reference=0)
+    if windows.empty:
+        return pd.DataFrame()
+
+    n_laps, n_corners = len(tels), len(windows)
+    corner_time = times.sum(axis=2)
+    delta_speed = (speeds[1:] - speeds[0]).reshape(-1, 3)
+    time_loss = (corner_time[0] - corner_time[1:]).reshape(-1)
+
+    samples = pd.DataFrame(delta_speed, columns=FEATURES)
+    samples.insert(0, "Circuit", circuit)
+    samples.insert(1, "Session", session.name)
+    samples.insert(2, "Driver", np.repeat(meta["Driver"].to_numpy(), n_corners))
+    samples.insert(3, "LapNumber", np.repeat(meta["LapNumber"].to_numpy(), n_corners))
+    samples.insert(4, "Corner", np.tile(windows["Corner"].to_numpy(), n_laps))
+    samples.insert(
+        5, "CornerType", np.tile(classify_corner_types(speeds[0, :, 1]), n_laps)
+    )
+    samples["TimeLoss"] = time_loss
+    samples["LapTimeDelta"] = np.repeat(
+        fastest["LapTime"].total_seconds() - meta["LapTime"].to_numpy(), n_corners
+    )
+    samples["ReferenceApexSpeed"] = np.tile(speeds[0, :, 1], n_laps)
+    return samples
+
+
+# ---------------------------------------------------------
+# 2. LAP-LEVEL CHECK
+# ---------------------------------------------------------
+def lap_fit_quality(samples: pd.DataFrame, model: dict) -> pd.DataFrame:
+    """
+    Sums the predicted corner losses per lap and compares them with the
+    official lap time delta. Corner zones cover the whole lap, so this is
+    an end-to-end check of the weights against timing data.
+    """
+    pred = np.zeros(len(samples))
+    X = samples[FEATURES].to_numpy(dtype=float)
+    for circuit, idx in samples.groupby("Circuit").indices.items():
+        w = corner_weights(
+            samples["ReferenceApexSpeed"].to_numpy()[idx], circuit, model
+        )
+        pred[idx] = np.einsum("ij,ij->i", np.nan_to_num(X[idx]), w)
+
+    keys = ["Circuit", "Session", "Driver", "LapNumber"]
+    laps = (
+        samples.assign(Predicted=pred)
+        .groupby(keys, sort=False)
+        .agg(Predicted=("Predicted", "sum"), Measured=("LapTimeDelta", "first"))
+        .dropna()
+    )
+    resid = laps["Measured"] - laps["Predicted"]
+    centered = laps["Measured"] - laps.groupby("Circuit")["Measured"].transform("mean")
+
+    out = pd.DataFrame(
+        {
+            "Laps": laps.groupby("Circuit").size(),
+            "R2": 1
+            - (resid**2).groupby("Circuit").sum()
+            / (centered**2).groupby("Circuit").sum(),
+            "RMSE": np.sqrt((resid**2).groupby("Circuit").mean()),
+        }
+    )
+    return out.reset_index()
+
+
+# ---------------------------------------------------------
+# 3. CLI
+# ---------------------------------------------------------
+def calibrate(years, tracks=None, session_types=("Q",), min_samples=MIN_SAMPLES):
+    """Collects samples for all sessions and fits the model."""
+    frames = []
+    for year in years:
+        for track in tracks or get_tracks_for_year(year):
+            for session_type in session_types:
+                t0 = time.perf_counter()
+                session = load_session(year, track, session_type)
+                if session is None:
+                    continue
+                samples = session_calibration_samples(session, track)
+                if samples.empty:
+                    continue
+                frames.append(samples.assign(Year=year))
+                print(
+                    f"{year} {track} {session_type}: "
+                    f"{len(samples.groupby(['Driver', 'LapNumber']))} laps, "
+                    f"{len(samples)} corners "
+                    f"({time.perf_counter() - t0:.1f}s)"
+                )
+
+    if not frames:
+        return None, pd.DataFrame()
+
+    samples = pd.concat(frames, ignore_index=True)
+    t0 = time.perf_counter()
+    model = fit_time_loss_model(samples, min_samples=min_samples)
+    model["sessions"] = sorted(
+        {f"{y} {c} {s}" for y, c, s in samples[["Year", "Circuit", "Session"]].values}
+    )
+    print(f"Fitted {len(samples)} corner samples in {time.perf_counter() - t0:.2f}s")
+
+    lap_fit = lap_fit_quality(samples, model)
+    model["lap_fit"] = {
+        row.Circuit: {
+            "laps": int(row.Laps),
+            "r2": float(row.R2),
+            "rmse": float(row.RMSE),
+        }
+        for row in lap_fit.itertuples(index=False)
+    }
+    return model, lap_fit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate time-loss weights.")
+    parser.add_argument("--year", type=int, action="append", required=True)
+    parser.add_argument("--track", action="append", help="default: all tracks")
+    parser.add_argument("--session", action="append", help="default: Q")
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES)
+    parser.add_argument("--out", default=MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    model, lap_fit = calibrate(
+        args.year, args.track, args.session or ["Q"], args.min_samples
+    )
+    if model is None:
+        print("No calibration samples collected.")
+        return 1
+
+    print(model_report(model).to_string(index=False))
+    print("\nLap-level fit (predicted vs. official lap time delta):")
+    print(lap_fit.to_string(index=False))
+    print(f"\nSaved model to {save_time_loss_model(model, args.out)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
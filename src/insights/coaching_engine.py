@@ -1,74 +1,186 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
+# ---------------------------------------------------------
+# 1. RULE TABLE
+# ---------------------------------------------------------
+# Each rule fires for the driver who loses time in a corner when the
+# metric (Delta_* = A - B) is against them by more than `threshold`.
+#
+# sign:
+# - "deficit": losing driver has the LOWER value (e.g. less exit speed)
+# - "excess":  losing driver has the HIGHER value (e.g. more coasting)
+#
+# priority: lower = more important; messages are joined in this order.
+COACHING_RULES = [
+    {
+        "name": "exit",
+        "metric": "Delta_ExitSpeed",
+        "sign": "deficit",
+        "threshold": 1.0,
+        "message": "Improve exit acceleration. Consider earlier throttle commitment and smoother rotation.",
+        "priority": 1,
+    },
+    {
+        "name": "apex",
+        "metric": "Delta_ApexSpeed",
+        "sign": "deficit",
+        "threshold": 1.0,
+        "message": "Increase apex speed. Commit more to mid-corner rotation and carry more minimum speed.",
+        "priority": 2,
+    },
+    {
+        "name": "entry",
+        "metric": "Delta_EntrySpeed",
+        "sign": "deficit",
+        "threshold": 1.0,
+        "message": "Raise entry speed by braking slightly later and reducing pre-apex conservatism.",
+        "priority": 3,
+    },
+    {
+        "name": "brake",
+        "metric": "Delta_AvgBrake",
+        "sign": "deficit",
+        "threshold": 0.1,
+        "message": "Increase brake pressure stability to shorten braking phase.",
+        "priority": 4,
+    },
+    {
+        "name": "throttle",
+        "metric": "Delta_ThrottleBelow30Pct",
+        "sign": "excess",
+        "threshold": 0.05,
+        "message": "Reduce throttle hesitation and coasting time after the apex.",
+        "priority": 5,
+    },
+]
+
+# Per-circuit threshold overrides, e.g. {"circuits": {"Monaco": {"exit": 0.5}}}
+RULES_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "coaching_rules.json")
+
+SIGN_FACTORS = {"deficit": -1.0, "excess": 1.0}
+
+
+@lru_cache(maxsize=None)
+def load_circuit_overrides(path: str = RULES_CONFIG_PATH) -> dict:
+    """Reads the per-circuit threshold overrides (cached per process)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("circuits", {})
+
+
+# ---------------------------------------------------------
+# 2. COMPILATION
+# ---------------------------------------------------------
+@lru_cache(maxsize=64)
+def compile_rules(circuit: str = None):
+    """
+    Turns the rule table (+ circuit overrides) into arrays, sorted by
+    priority:
+    metrics (list), signs, thresholds, priorities, messages, names (r,)
+    """
+    overrides = load_circuit_overrides().get(circuit, {}) if circuit else {}
+    rules = sorted(COACHING_RULES, key=lambda r: r["priority"])
+
+    metrics = [r["metric"] for r in rules]
+    signs = np.array([SIGN_FACTORS[r["sign"]] for r in rules])
+    thresholds = np.array(
+        [float(overrides.get(r["name"], r["threshold"])) for r in rules]
+    )
+    priorities = np.array([r["priority"] for r in rules])
+    messages = np.array([r["message"] for r in rules], dtype=object)
+    names = np.array([r["name"] for r in rules], dtype=object)
+    return metrics, signs, thresholds, priorities, messages, names
+
+
+def evaluate_coaching_rules(
+    df: pd.DataFrame, driver_a=None, driver_b=None, circuit: str = None
+) -> pd.DataFrame:
+    """
+    Evaluates all rules over all rows at once.
+
+    df may hold one driver pair (pass driver_a / driver_b) or many pairs
+    stacked, with per-row 'DriverA' / 'DriverB' columns.
 
-def coaching_suggestions(df: pd.DataFrame, driver_a: str, driver_b: str):
+    Returns one row per fired rule:
+    Row, Corner, LosingDriver, Rule, Priority, Value, Message
+    """
+    if df is None or df.empty or "TimeLoss" not in df.columns:
+        return pd.DataFrame()
+
+    metrics, signs, thresholds, priorities, messages, names = compile_rules(circuit)
+
+    # (n_rows, n_rules) metric matrix; missing metrics never fire
+    values = df.reindex(columns=metrics).to_numpy(dtype=float)
+
+    # +1 where A loses time (TimeLoss < 0), -1 where B loses, 0 = no advice
+    loser_sign = -np.sign(df["TimeLoss"].to_numpy(dtype=float))
+
+    # Loser minus winner value, flipped for "deficit" rules so that a value
+    # against the losing driver is always positive
+    oriented = values * loser_sign[:, None] * signs[None, :]
+    mask = np.nan_to_num(oriented, nan=-np.inf) > thresholds[None, :]
+
+    rows, rules = np.nonzero(mask)
+    if len(rows) == 0:
+        return pd.DataFrame()
+
+    drv_a = df["DriverA"].to_numpy() if "DriverA" in df.columns else None
+    drv_b = df["DriverB"].to_numpy() if "DriverB" in df.columns else None
+    losing = np.where(
+        loser_sign[rows] > 0,
+        drv_a[rows] if drv_a is not None else driver_a,
+        drv_b[rows] if drv_b is not None else driver_b,
+    )
+
+    return pd.DataFrame(
+        {
+            "Row": rows,
+            "Corner": df["Corner"].to_numpy()[rows].astype(int),
+            "LosingDriver": losing,
+            "Rule": names[rules],
+            "Priority": priorities[rules],
+            "Value": values[rows, rules],
+            "Message": messages[rules],
+        }
+    )
+
+
+# ---------------------------------------------------------
+# 3. SUGGESTIONS
+# ---------------------------------------------------------
+def coaching_suggestions(
+    df: pd.DataFrame, driver_a: str, driver_b: str, circuit: str = None
+):
     """
     Generate automatic improvement suggestions based on:
     - Time loss
     - Entry / Apex / Exit speed deficits
     - Brake / Throttle behavior
+
+    Returns one line per corner: "Corner <n> – <losing driver>: <advice>".
     """
+    hits = evaluate_coaching_rules(df, driver_a, driver_b, circuit)
+    if hits.empty:
+        return []
+
+    hits = hits.sort_values(["Row", "Priority"], kind="stable")
+    grouped = hits.groupby("Row", sort=True).agg(
+        Corner=("Corner", "first"),
+        LosingDriver=("LosingDriver", "first"),
+        Message=("Message", " ".join),
+    )
 
-    suggestions = []
-
-    for _, row in df.iterrows():
-        c = int(row["Corner"])
-        loss = row["TimeLoss"]  # positive = Aahead, negative = B ahead
-
-        entry = row["Delta_EntrySpeed"]
-        apex = row["Delta_ApexSpeed"]
-        exit = row["Delta_ExitSpeed"]
-        brake = row["Delta_AvgBrake"]
-        throt = row["Delta_ThrottleBelow30Pct"]
-
-        # Determine who needs advice
-        if loss < 0:
-            losing_driver = driver_a
-            winning_driver = driver_b
-        elif loss > 0:
-            losing_driver = driver_b
-            winning_driver = driver_a
-        else:
-            continue
-
-        line = f"Corner {c} – {losing_driver}: "
-
-        # EXIT SPEED – höchste Priorität
-        if abs(exit) > 1.0:
-            if losing_driver == driver_a and exit < 0:
-                line += "Improve exit acceleration. Consider earlier throttle commitment and smoother rotation. "
-            elif losing_driver == driver_b and exit > 0:
-                line += "Improve exit acceleration. Focus on earlier throttle application and reducing hesitation. "
-
-        # APEX SPEED
-        if abs(apex) > 1.0:
-            if losing_driver == driver_a and apex < 0:
-                line += "Increase apex speed. Possible later turn-in, less brake pressure at rotation point. "
-            elif losing_driver == driver_b and apex > 0:
-                line += "Increase apex speed. Commit more to mid-corner rotation and carry more minimum speed. "
-
-        # ENTRY SPEED
-        if abs(entry) > 1.0:
-            if losing_driver == driver_a and entry < 0:
-                line += "Raise entry speed by braking slightly later and reducing pre-apex conservatism. "
-            elif losing_driver == driver_b and entry > 0:
-                line += "Raise entry speed by braking later and reducing early brake-phase. "
-
-        # BRAKING BEHAVIOR
-        if abs(brake) > 0.1:
-            if losing_driver == driver_a and brake < 0:
-                line += "Increase brake pressure stability to shorten braking phase. "
-            elif losing_driver == driver_b and brake > 0:
-                line += "Optimize brake pressure modulation to avoid over-braking. "
-
-        # THROTTLE HESITATION
-        if abs(throt) > 0.05:
-            if losing_driver == driver_a and throt < 0:
-                line += "Reduce throttle hesitation at the exit. "
-            elif losing_driver == driver_b and throt > 0:
-                line += "Minimize coasting time after apex. "
-
-        if line.strip() != f"Corner {c} – {losing_driver}:":
-            suggestions.append(line.strip())
-
-    return suggestions
+    return (
+        "Corner "
+        + grouped["Corner"].astype(str)
+        + " – "
+        + grouped["LosingDriver"].astype(str)
+        + ": "
+        + grouped["Message"]
+    ).tolist()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+CONSISTENCY_METRICS = ["EntrySpeed", "ApexSpeed", "ExitSpeed"]
+
+
+def corner_consistency(lap_features: pd.DataFrame, metrics=None) -> pd.DataFrame:
+    """
+    Lap-to-lap consistency per driver and corner.
+
+    For every metric:
+    - <metric>_Mean:  average over all valid laps
+    - <metric>_Std:   spread (standard deviation) between laps
+    - <metric>_Trend: least-squares slope vs. lap number (units per lap),
+                      e.g. negative ApexSpeed trend = tyre degradation
+
+    All statistics come from one grouped aggregation of running sums,
+    no per-corner loops.
+    """
+    if lap_features is None or lap_features.empty:
+        return pd.DataFrame()
+
+    metrics = metrics or [m for m in CONSISTENCY_METRICS if m in lap_features.columns]
+    keys = ["Driver", "Corner"] if "Driver" in lap_features.columns else ["Corner"]
+
+    df = lap_features[keys + ["LapNumber"] + metrics].copy()
+    x = df["LapNumber"].astype(float)
+    df["_x"] = x
+    df["_xx"] = x * x
+    for m in metrics:
+        df[f"_{m}_xy"] = x * df[m]
+        df[f"_{m}_yy"] = df[m] * df[m]
+
+    sums = df.drop(columns="LapNumber").groupby(keys).sum()
+    n = df.groupby(keys).size()
+
+    out = pd.DataFrame(index=sums.index)
+    out["Laps"] = n
+
+    var_x = sums["_xx"] - sums["_x"] ** 2 / n
+    for m in metrics:
+        mean = sums[m] / n
+        var_y = (sums[f"_{m}_yy"] - sums[m] ** 2 / n) / (n - 1).where(n > 1)
+        cov_xy = sums[f"_{m}_xy"] - sums["_x"] * sums[m] / n
+
+        out[f"{m}_Mean"] = mean
+        out[f"{m}_Std"] = np.sqrt(var_y.clip(lower=0))
+        out[f"{m}_Trend"] = cov_xy / var_x.where(var_x > 0)
+
+    return out.reset_index()
+
+
+def least_consistent_corners(consistency: pd.DataFrame, metric="ApexSpeed", top=3):
+    """Returns the corners with the largest lap-to-lap spread for a metric."""
+    col = f"{metric}_Std"
+    if consistency is None or consistency.empty or col not in consistency.columns:
+        return pd.DataFrame()
+    return consistency.sort_values(col, ascending=False).head(top)
@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 
+CORNER_TYPES = ["Low Speed", "Medium Speed", "High Speed"]
+
 
 def classify_corner_type(speed):
     """
@@ -19,6 +22,16 @@ def classify_corner_type(speed):
         return "High Speed"
 
 
+def classify_corner_types(speeds):
+    """Vectorized classify_corner_type for an array of apex speeds."""
+    speeds = np.asarray(speeds, dtype=float)
+    return np.select(
+        [np.isnan(speeds), speeds < 110, speeds < 180],
+        ["Unknown", "Low Speed", "Medium Speed"],
+        "High Speed",
+    ).astype(object)
+
+
 def add_corner_classification(time_loss_df):
     """
     Adds the 'CornerType' column to the DataFrame.
@@ -42,7 +55,7 @@ def add_corner_classification(time_loss_df):
         return None
 
     # 2. Apply classification
-    df["CornerType"] = df[target_col].apply(classify_corner_type)
+    df["CornerType"] = classify_corner_types(df[target_col])
     return df
 
 
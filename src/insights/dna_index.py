@@ -0,0 +1,235 @@
+import argparse
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from src.data.load_data import get_tracks_for_year, load_field_telemetry, load_session
+from src.insights.dna_stream import stream_driver_dna
+from src.insights.driver_dna import RAW_METRICS, score_dna, session_dna_raw
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data",
+    "dna_index.sqlite",
+)
+
+# DNA score -> column name in the index
+METRIC_COLUMNS = {
+    "Aggressiveness": "aggressiveness",
+    "Cornering": "cornering",
+    "Traction/Smoothness": "smoothness",
+    "Full Throttle %": "full_throttle",
+    "Workload (Gears)": "gear_workload",
+}
+SCORE_COLUMNS = list(METRIC_COLUMNS.values())
+
+KEY_COLUMNS = ["year", "event", "session", "driver"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS dna (
+    year INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    session TEXT NOT NULL,
+    driver TEXT NOT NULL,
+    date TEXT,
+    laps INTEGER,
+    {", ".join(f"{c} REAL" for c in SCORE_COLUMNS)},
+    {", ".join(f"raw_{c} REAL" for c in RAW_METRICS)},
+    PRIMARY KEY (year, event, session, driver)
+);
+CREATE INDEX IF NOT EXISTS dna_driver ON dna (driver, date);
+"""
+
+
+def open_index(path: str = INDEX_PATH):
+    """Opens (and creates if needed) the DNA index database."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def metric_column(metric: str) -> str:
+    """Accepts a DNA score name ('Aggressiveness') or a column name."""
+    if metric in METRIC_COLUMNS:
+        return METRIC_COLUMNS[metric]
+    if metric in SCORE_COLUMNS:
+        return metric
+    raise ValueError(f"Unknown DNA metric: {metric}")
+
+
+# ---------------------------------------------------------
+# 1. INGESTION
+# ---------------------------------------------------------
+def session_dna_rows(session, year: int, event: str, all_laps: bool = False):
+    """
+    One row per driver with DNA scores and raw metrics for a session.
+
+    all_laps=False: fastest lap of every driver (as on the comparison page)
+    all_laps=True:  every valid lap, streamed through DnaAccumulator
+    """
+    if all_laps:
+        drivers = sorted(session.laps["Driver"].dropna().unique())
+        raw = pd.DataFrame(
+            {code: stream_driver_dna(session, code).raw_metrics() for code in drivers}
+        ).T
+        raw = raw[raw["Laps"] > 0]
+        laps = raw["Laps"].astype(int)
+    else:
+        raw = session_dna_raw(load_field_telemetry(session))
+        laps = pd.Series(1, index=raw.index)
+
+    if raw.empty:
+        return pd.DataFrame()
+
+    scores = score_dna(raw).rename(columns=METRIC_COLUMNS)
+    rows = pd.concat(
+        [scores, raw[RAW_METRICS].add_prefix("raw_").astype(float)], axis=1
+    )
+    rows.insert(0, "driver", rows.index.astype(str))
+    rows.insert(0, "session", session.name)
+    rows.insert(0, "event", event)
+    rows.insert(0, "year", int(year))
+    rows.insert(4, "date", str(session.date.date()) if session.date else None)
+    rows.insert(5, "laps", laps.to_numpy())
+    return rows.reset_index(drop=True)
+
+
+def upsert_rows(conn, rows: pd.DataFrame):
+    """Inserts or replaces rows (key: year, event, session, driver)."""
+    if rows is None or rows.empty:
+        return 0
+    cols = list(rows.columns)
+    sql = (
+        f"INSERT OR REPLACE INTO dna ({', '.join(cols)}) "
+        f"VALUES ({', '.join('?' for _ in cols)})"
+    )
+    values = rows.astype(object).where(rows.notna(), None).itertuples(index=False)
+    with conn:
+        conn.executemany(sql, values)
+    return len(rows)
+
+
+def ingest(conn, years, tracks=None, session_types=("Q",), all_laps=False):
+    """Batch ingestion: every (year, track, session type) into the index."""
+    total = 0
+    for year in years:
+        for track in tracks or get_tracks_for_year(year):
+            for session_type in session_types:
+                session = load_session(year, track, session_type)
+                if session is None:
+                    continue
+                try:
+                    rows = session_dna_rows(session, year, track, all_laps)
+                except Exception as e:
+                    print(f"DNA Index Error ({year} {track} {session_type}): {e}")
+                    continue
+                n = upsert_rows(conn, rows)
+                total += n
+                print(f"{year} {track} {session_type}: {n} drivers")
+    return total
+
+
+# ---------------------------------------------------------
+# 2. QUERIES
+# ---------------------------------------------------------
+def dna_trend(conn, driver: str, metric: str, year: int = None, session=None):
+    """
+    One DNA metric of a driver over time, e.g.
+    dna_trend(conn, "VER", "Aggressiveness", 2023).
+    """
+    col = metric_column(metric)
+    sql = f"SELECT year, event, session, date, {col} AS value FROM dna WHERE driver = ?"
+    params = [driver]
+    if year is not None:
+        sql += " AND year = ?"
+        params.append(int(year))
+    if session is not None:
+        sql += " AND session = ?"
+        params.append(session)
+    return pd.read_sql_query(sql + " ORDER BY date", conn, params=params)
+
+
+def load_vectors(conn, year: int = None, session=None):
+    """All DNA vectors (optionally one season / session type) as a frame."""
+    sql = f"SELECT {', '.join(KEY_COLUMNS + SCORE_COLUMNS)} FROM dna WHERE 1 = 1"
+    params = []
+    if year is not None:
+        sql += " AND year = ?"
+        params.append(int(year))
+    if session is not None:
+        sql += " AND session = ?"
+        params.append(session)
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def nearest_styles(conn, driver: str, year: int = None, session=None, k: int = 5):
+    """
+    Drivers whose average DNA is closest to `driver` (Euclidean distance on
+    the 0..100 scores), within an optional season / session type.
+    """
+    vectors = load_vectors(conn, year, session)
+    if vectors.empty:
+        return pd.DataFrame(columns=["driver", "distance"] + SCORE_COLUMNS)
+
+    profiles = vectors.groupby("driver")[SCORE_COLUMNS].mean()
+    if driver not in profiles.index:
+        return pd.DataFrame(columns=["driver", "distance"] + SCORE_COLUMNS)
+
+    X = profiles.to_numpy(dtype=float)
+    q = profiles.loc[driver].to_numpy(dtype=float)
+    dist = np.sqrt(np.nansum((X - q) ** 2, axis=1))
+
+    out = profiles.assign(distance=dist).drop(index=driver)
+    out = out.sort_values("distance").head(k).reset_index()
+    return out[["driver", "distance"] + SCORE_COLUMNS]
+
+
+# ---------------------------------------------------------
+# 3. CLI
+# ---------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Historical Driver DNA index.")
+    parser.add_argument("--db", default=INDEX_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="add sessions to the index")
+    p_ingest.add_argument("--year", type=int, action="append", required=True)
+    p_ingest.add_argument("--track", action="append", help="default: all tracks")
+    p_ingest.add_argument("--session", action="append", help="default: Q")
+    p_ingest.add_argument("--all-laps", action="store_true")
+
+    p_trend = sub.add_parser("trend", help="one metric of a driver over time")
+    p_trend.add_argument("--driver", required=True)
+    p_trend.add_argument("--metric", default="Aggressiveness")
+    p_trend.add_argument("--year", type=int)
+    p_trend.add_argument("--session")
+
+    p_near = sub.add_parser("similar", help="drivers with the closest style")
+    p_near.add_argument("--driver", required=True)
+    p_near.add_argument("--year", type=int)
+    p_near.add_argument("--session")
+    p_near.add_argument("-k", type=int, default=5)
+
+    args = parser.parse_args(argv)
+    conn = open_index(args.db)
+
+    if args.command == "ingest":
+        n = ingest(conn, args.year, args.track, args.session or ["Q"], args.all_laps)
+        print(f"Indexed {n} driver sessions in {args.db}")
+    elif args.command == "trend":
+        print(dna_trend(conn, args.driver, args.metric, args.year, args.session))
+    else:
+        print(nearest_styles(conn, args.driver, args.year, args.session, args.k))
+
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,283 @@
+import fastf1
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.data.load_data import extract_lap_telemetries, hash_session_id, pick_valid_laps
+from src.data.stint_analysis import CHUNK_LAPS, iter_lap_chunks
+from src.insights.driver_dna import DNA_METRICS, score_dna
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+DECEL_RANGE = (0.0, 100.0)  # m/s², braking deceleration histogram range
+DECEL_BINS = 1000  # 0.1 m/s² resolution for the quantile sketch
+DECEL_QUANTILE = 0.95
+
+
+# ---------------------------------------------------------
+# 1. MERGEABLE STATISTICS
+# ---------------------------------------------------------
+class HistogramSketch:
+    """
+    Fixed-bin histogram for approximate quantiles in constant memory.
+
+    Sketches with the same range and bin count merge by adding counts, so
+    laps, sessions and worker processes can be combined in any order.
+    Quantile error is at most one bin width.
+    """
+
+    def __init__(self, lo, hi, bins):
+        self.lo, self.hi, self.bins = float(lo), float(hi), int(bins)
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return self
+        idx = (values - self.lo) / (self.hi - self.lo) * self.bins
+        idx = np.clip(idx.astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(idx, minlength=self.bins)
+        return self
+
+    def merge(self, other):
+        if (self.lo, self.hi, self.bins) != (other.lo, other.hi, other.bins):
+            raise ValueError("Cannot merge sketches with different bins.")
+        self.counts += other.counts
+        return self
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        """Approximate q-quantile (linear within the bin); NaN if empty."""
+        total = self.count
+        if total == 0:
+            return np.nan
+        cum = np.cumsum(self.counts)
+        target = q * total
+        b = int(np.searchsorted(cum, target, side="left"))
+        before = cum[b - 1] if b > 0 else 0
+        frac = (target - before) / self.counts[b] if self.counts[b] else 0.0
+        width = (self.hi - self.lo) / self.bins
+        return self.lo + (b + frac) * width
+
+    def to_dict(self):
+        nz = np.nonzero(self.counts)[0]
+        return {
+            "lo": self.lo,
+            "hi": self.hi,
+            "bins": self.bins,
+            "index": nz.tolist(),
+            "counts": self.counts[nz].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        sketch = cls(d["lo"], d["hi"], d["bins"])
+        sketch.counts[np.asarray(d["index"], dtype=np.int64)] = d["counts"]
+        return sketch
+
+
+class RunningMoments:
+    """
+    Count, mean and variance with Chan's parallel update: batches and
+    other accumulators are merged exactly without keeping the samples.
+    """
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n, self.mean, self.m2 = int(n), float(mean), float(m2)
+
+    def _combine(self, n, mean, m2):
+        if n == 0:
+            return self
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta**2 * self.n * n / total
+        self.n = total
+        return self
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return self
+        mean = values.mean()
+        return self._combine(values.size, mean, ((values - mean) ** 2).sum())
+
+    def merge(self, other):
+        return self._combine(other.n, other.mean, other.m2)
+
+    @property
+    def value(self):
+        return self.mean if self.n else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+
+    def to_dict(self):
+        return {"n": self.n, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["n"], d["mean"], d["m2"])
+
+
+# ---------------------------------------------------------
+# 2. DNA ACCUMULATOR
+# ---------------------------------------------------------
+class DnaAccumulator:
+    """
+    Driver DNA over any number of laps in constant memory.
+
+    Consumes one lap of car data at a time (update) and keeps only the
+    sketch / moments needed for the raw DNA metrics (see dna_raw_metrics):
+    - TopDecel:        quantile sketch of braking deceleration
+    - CornerSpeed, ThrottleStep, FullThrottlePct: running moments
+    - GearChanges:     running moments of the per-lap gear steps
+    Accumulators merge across sessions and processes (merge / to_dict).
+    """
+
+    MOMENTS = ["CornerSpeed", "ThrottleStep", "FullThrottlePct", "GearChanges"]
+
+    def __init__(self):
+        self.laps = 0
+        self.decel = HistogramSketch(*DECEL_RANGE, DECEL_BINS)
+        self.moments = {name: RunningMoments() for name in self.MOMENTS}
+
+    def update(self, tel: pd.DataFrame):
+        """Adds one lap of telemetry (Time, Speed, Brake, Throttle, nGear)."""
+        if tel is None or len(tel) < 2:
+            return self
+
+        t = tel["Time"].dt.total_seconds().to_numpy()
+        speed = tel["Speed"].to_numpy(dtype=float)
+        throttle = tel["Throttle"].to_numpy(dtype=float)
+        braking = tel["Brake"].to_numpy(dtype=float) > 0
+
+        dt = np.diff(t)
+        acc = np.diff(speed) / 3.6 / np.where(dt > 0, dt, np.nan)
+        self.decel.update(np.abs(acc[braking[1:]]))
+
+        self.moments["CornerSpeed"].update(speed[speed < speed.max() * 0.85])
+
+        partial = throttle[(throttle > 20) & (throttle < 95)]
+        self.moments["ThrottleStep"].update(np.abs(np.diff(partial)))
+        self.moments["FullThrottlePct"].update((throttle >= 99) * 100.0)
+
+        gear = tel["nGear"].to_numpy(dtype=float)
+        self.moments["GearChanges"].update([np.nansum(np.abs(np.diff(gear)))])
+
+        self.laps += 1
+        return self
+
+    def update_stacked(self, stacked: pd.DataFrame):
+        """Adds every lap of a stacked frame with a 'LapNumber' column."""
+        if stacked is None or stacked.empty:
+            return self
+        for _, lap in stacked.groupby("LapNumber", sort=True):
+            self.update(lap)
+        return self
+
+    def merge(self, other):
+        self.laps += other.laps
+        self.decel.merge(other.decel)
+        for name in self.MOMENTS:
+            self.moments[name].merge(other.moments[name])
+        return self
+
+    def raw_metrics(self) -> dict:
+        """Raw DNA metrics (same names as dna_raw_metrics) plus spreads."""
+        raw = {"Laps": self.laps, "TopDecel": self.decel.quantile(DECEL_QUANTILE)}
+        for name, m in self.moments.items():
+            raw[name] = m.value
+            raw[f"{name}_Std"] = m.std
+        return raw
+
+    def scores(self) -> dict:
+        """DNA scores on the absolute scale (as calculate_driver_dna)."""
+        return score_dna(pd.DataFrame([self.raw_metrics()])).iloc[0].to_dict()
+
+    def to_dict(self):
+        return {
+            "laps": self.laps,
+            "decel": self.decel.to_dict(),
+            "moments": {k: m.to_dict() for k, m in self.moments.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        acc = cls()
+        acc.laps = d["laps"]
+        acc.decel = HistogramSketch.from_dict(d["decel"])
+        acc.moments = {k: RunningMoments.from_dict(v) for k, v in d["moments"].items()}
+        return acc
+
+
+def merge_accumulators(accumulators):
+    """Combines accumulators (e.g. several sessions) into a new one."""
+    total = DnaAccumulator()
+    for acc in accumulators:
+        if acc is not None:
+            total.merge(acc)
+    return total
+
+
+def field_scores(accumulators: dict, relative: bool = False) -> pd.DataFrame:
+    """DNA scores for several drivers: driver code -> DnaAccumulator."""
+    raw = pd.DataFrame(
+        {code: acc.raw_metrics() for code, acc in accumulators.items()}
+    ).T
+    return score_dna(raw, relative=relative)
+
+
+# ---------------------------------------------------------
+# 3. SESSION PIPELINE (CHUNKED)
+# ---------------------------------------------------------
+def stream_driver_dna(session, driver_code: str, chunk_size: int = CHUNK_LAPS):
+    """
+    DNA accumulator over every valid lap of a driver. Car data is loaded
+    chunk_size laps at a time and dropped after the update.
+    """
+    acc = DnaAccumulator()
+    if session is None or not hasattr(session, "laps"):
+        return acc
+
+    laps = pick_valid_laps(session.laps.pick_driver(driver_code))
+    if laps is None or laps.empty:
+        return acc
+
+    for chunk in iter_lap_chunks(laps, chunk_size):
+        try:
+            stacked = extract_lap_telemetries(chunk)
+        except Exception as e:
+            print(f"DNA Telemetry Error ({driver_code}): {e}")
+            continue
+        acc.update_stacked(stacked)
+        del stacked
+    return acc
+
+
+@st.cache_data(
+    show_spinner="Computing race DNA...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_race_dna(session, driver_code: str):
+    """Cached per (session, driver) wrapper around stream_driver_dna."""
+    return stream_driver_dna(session, driver_code)
+
+
+def compare_race_dna(acc_1, acc_2, name_1, name_2):
+    """Radar table (as compare_driver_dna) from two accumulators."""
+    dna_1, dna_2 = acc_1.scores(), acc_2.scores()
+    return pd.DataFrame(
+        {
+            "Metric": list(DNA_METRICS),
+            name_1: [dna_1[c] for c in DNA_METRICS],
+            name_2: [dna_2[c] for c in DNA_METRICS],
+        }
+    )
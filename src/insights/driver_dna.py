@@ -1,5 +1,108 @@
+import fastf1
 import numpy as np
 import pandas as pd
+import streamlit as st
+
+from src.data.load_data import hash_session_id, load_field_telemetry
+
+# ---------------------------------------------------------
+# 1. METRIC TABLE
+# ---------------------------------------------------------
+# DNA score -> raw metric, absolute scale (raw range -> score range) and the
+# score used when the raw metric cannot be computed.
+# Smoothness is inverted: a lower throttle step means a smoother driver.
+DNA_METRICS = {
+    "Aggressiveness": ("TopDecel", [20, 65], [0, 100], 50),
+    "Cornering": ("CornerSpeed", [80, 230], [0, 100], 50),
+    "Traction/Smoothness": ("ThrottleStep", [0.5, 8.0], [100, 20], 80),
+    "Full Throttle %": ("FullThrottlePct", [40, 85], [0, 100], 50),
+    "Workload (Gears)": ("GearChanges", [30, 90], [0, 100], 50),
+}
+
+RAW_METRICS = [spec[0] for spec in DNA_METRICS.values()]
+
+
+# ---------------------------------------------------------
+# 2. RAW METRICS (BATCH)
+# ---------------------------------------------------------
+def dna_raw_metrics(stacked: pd.DataFrame, keys="Driver") -> pd.DataFrame:
+    """
+    Raw DNA metrics for many drivers (or laps) at once.
+
+    stacked: telemetry of several drivers with a key column (e.g. 'Driver').
+    All metrics are grouped aggregations over the whole frame; the input
+    is not modified.
+
+    - TopDecel:        95th percentile deceleration while braking (m/s²),
+                       from the true time between samples
+    - CornerSpeed:     mean speed below 85 % of the driver's top speed
+    - ThrottleStep:    mean throttle change in the partial-throttle range
+    - FullThrottlePct: share of samples at full throttle (%)
+    - GearChanges:     summed gear steps
+    """
+    if stacked is None or stacked.empty:
+        return pd.DataFrame(columns=RAW_METRICS)
+
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    groups = [stacked[k] for k in keys]
+
+    speed = stacked["Speed"].astype(float)
+    t = stacked["Time"].dt.total_seconds()
+    dt = t.groupby(groups).diff()
+    acc = speed.groupby(groups).diff() / 3.6 / dt.where(dt > 0)
+
+    braking = stacked["Brake"].astype(float) > 0
+    top_decel = acc.abs()[braking].groupby([g[braking] for g in groups]).quantile(0.95)
+
+    top_speed = speed.groupby(groups).transform("max")
+    cornering = speed < top_speed * 0.85
+    corner_speed = speed[cornering].groupby([g[cornering] for g in groups]).mean()
+
+    throttle = stacked["Throttle"].astype(float)
+    partial = (throttle > 20) & (throttle < 95)
+    partial_groups = [g[partial] for g in groups]
+    step = throttle[partial].groupby(partial_groups).diff().abs()
+    throttle_step = step.groupby(partial_groups).mean()
+
+    full_throttle = (throttle >= 99).groupby(groups).mean() * 100
+
+    gear = stacked["nGear"].astype(float)
+    gear_changes = gear.groupby(groups).diff().abs().groupby(groups).sum()
+
+    return pd.DataFrame(
+        {
+            "TopDecel": top_decel,
+            "CornerSpeed": corner_speed,
+            "ThrottleStep": throttle_step,
+            "FullThrottlePct": full_throttle,
+            "GearChanges": gear_changes,
+        }
+    )
+
+
+# ---------------------------------------------------------
+# 3. SCORING
+# ---------------------------------------------------------
+def score_dna(raw: pd.DataFrame, relative: bool = False) -> pd.DataFrame:
+    """
+    Raw metrics -> 0..100 DNA scores (one row per driver).
+
+    relative=False: fixed F1 ranges (DNA_METRICS).
+    relative=True:  percentile within the drivers in `raw` (the field), so
+                    50 = field median and 100 = best in the session.
+    """
+    scores = pd.DataFrame(index=raw.index)
+    for name, (col, raw_range, score_range, default) in DNA_METRICS.items():
+        values = raw[col] if col in raw.columns else pd.Series(np.nan, raw.index)
+        if relative:
+            higher_is_better = score_range[1] > score_range[0]
+            score = values.rank(pct=True, ascending=higher_is_better) * 100
+        else:
+            score = pd.Series(
+                np.interp(values, raw_range, score_range), index=values.index
+            )
+        scores[name] = score.where(values.notna(), default).round(1)
+    return scores
 
 
 def calculate_driver_dna(telemetry):
@@ -9,49 +112,46 @@ def calculate_driver_dna(telemetry):
     if telemetry is None or telemetry.empty:
         return {}
 
-    # 1. Aggressiveness (Brake Deceleration)
-    telemetry["acc"] = telemetry["Speed"].diff() / 0.1
-    braking_zones = telemetry[telemetry["Brake"] > 0]
+    raw = dna_raw_metrics(telemetry.assign(Driver="_"), keys="Driver")
+    return score_dna(raw).iloc[0].to_dict()
 
-    if not braking_zones.empty:
-        top_decel = braking_zones["acc"].abs().quantile(0.95)
-        aggressiveness = np.interp(top_decel, [20, 65], [0, 100])
-    else:
-        aggressiveness = 50
 
-    # 2. Cornering (Confidence)
-    max_speed = telemetry["Speed"].max()
-    avg_corner_speed = telemetry[telemetry["Speed"] < max_speed * 0.85]["Speed"].mean()
+def session_dna_raw(telemetries: dict) -> pd.DataFrame:
+    """
+    Raw DNA metrics of all drivers of a session in one batch.
+    telemetries: driver code -> telemetry (e.g. fastest lap).
+    """
+    frames = [
+        tel[["Time", "Speed", "Brake", "Throttle", "nGear"]].assign(Driver=code)
+        for code, tel in telemetries.items()
+        if tel is not None and not tel.empty
+    ]
+    if not frames:
+        return pd.DataFrame(columns=RAW_METRICS)
+    return dna_raw_metrics(pd.concat(frames, ignore_index=True), keys="Driver")
 
-    cornering_ability = np.interp(avg_corner_speed, [80, 230], [0, 100])
 
-    # 3. Traction (Smoothness)
-    throttle_transition = telemetry[
-        (telemetry["Throttle"] > 20) & (telemetry["Throttle"] < 95)
-    ]
-    if not throttle_transition.empty:
-        throttle_std = throttle_transition["Throttle"].diff().abs().mean()
-        smoothness = np.interp(throttle_std, [0.5, 8.0], [100, 20])
-    else:
-        smoothness = 80
-
-    # 4. Full Throttle %
-    full_throttle_pct = (
-        telemetry[telemetry["Throttle"] >= 99].count()["Throttle"] / len(telemetry)
-    ) * 100
-    full_throttle_score = np.interp(full_throttle_pct, [40, 85], [0, 100])
-
-    # 5. Gear Usage (Workload)
-    gear_changes = telemetry["nGear"].diff().abs().sum()
-    gear_workload = np.interp(gear_changes, [30, 90], [0, 100])
-
-    return {
-        "Aggressiveness": round(aggressiveness, 1),
-        "Cornering": round(cornering_ability, 1),
-        "Traction/Smoothness": round(smoothness, 1),
-        "Full Throttle %": round(full_throttle_score, 1),
-        "Workload (Gears)": round(gear_workload, 1),
-    }
+def session_driver_dna(telemetries: dict, relative: bool = False) -> pd.DataFrame:
+    """
+    DNA scores of all drivers of a session in one batch.
+    Returns DataFrame indexed by driver with one column per DNA metric.
+    """
+    raw = session_dna_raw(telemetries)
+    if raw.empty:
+        return pd.DataFrame(columns=list(DNA_METRICS))
+    return score_dna(raw, relative=relative)
+
+
+@st.cache_data(
+    show_spinner="Computing field DNA...",
+    hash_funcs={fastf1.core.Session: hash_session_id},
+)
+def load_session_dna(session, relative: bool = False):
+    """DNA of every driver's fastest lap in a session (cached per session)."""
+    telemetries = load_field_telemetry(session)
+    if not telemetries:
+        return None
+    return session_driver_dna(telemetries, relative=relative)
 
 
 def compare_driver_dna(tel_driver_1, tel_driver_2, name_1, name_2):
@@ -67,3 +167,19 @@ def compare_driver_dna(tel_driver_1, tel_driver_2, name_1, name_2):
             name_2: [dna_2[c] for c in categories],
         }
     )
+
+
+def compare_session_dna(dna_table: pd.DataFrame, code_1, code_2, name_1, name_2):
+    """Radar table for a driver pair from a session_driver_dna table."""
+    if dna_table is None or code_1 not in dna_table.index:
+        return pd.DataFrame()
+    if code_2 not in dna_table.index:
+        return pd.DataFrame()
+
+    return pd.DataFrame(
+        {
+            "Metric": list(dna_table.columns),
+            name_1: dna_table.loc[code_1].to_numpy(),
+            name_2: dna_table.loc[code_2].to_numpy(),
+        }
+    )
@@ -1,11 +1,16 @@
 import pandas as pd
 import numpy as np
 
+from src.insights.time_loss_engine import interval_crosses_zero
+
 
 def generate_race_engineer_report(tl_df, agg_types_df, driver_a, driver_b, track_name):
     """
     Generates a deeply detailed natural-language report.
     Drills down into specific corners to explain WHY time is lost.
+
+    In uncertainty mode (TimeLoss_Low / TimeLoss_High columns), corners whose
+    interval crosses zero get no advice.
     """
     if tl_df is None or tl_df.empty:
         return {
@@ -34,6 +39,10 @@ def generate_race_engineer_report(tl_df, agg_types_df, driver_a, driver_b, track
     # ----------------------------------------------------
     summary_lines = []
 
+    # Only corners with a clear sign are used for advice
+    uncertain = interval_crosses_zero(tl_df)
+    tl_all, tl_df = tl_df, tl_df[~uncertain]
+
     # --- A. PROBLEM AREA (Where do we lose the most?) ---
     # Wir filtern nur Kurven, wo wir Zeit verlieren (>0)
     losing_mask = tl_df["TimeLoss"] > 0
@@ -108,10 +117,22 @@ def generate_race_engineer_report(tl_df, agg_types_df, driver_a, driver_b, track
     # ----------------------------------------------------
     # 3. THE "KEY FIX" (High Precision Advice)
     # ----------------------------------------------------
-    # Wir nehmen die absolut schlechteste Kurve
-    worst_corner = tl_df.sort_values("TimeLoss", ascending=False).iloc[0]
+    if uncertain.any():
+        corners = ", ".join(f"T{int(c)}" for c in tl_all.loc[uncertain, "Corner"])
+        summary_lines.append(
+            f"ℹ️ **Within noise**: No advice for {corners} (interval crosses zero)."
+        )
 
     key_fix = "Review consistency."
+    if tl_df.empty:
+        return {
+            "headline": headline,
+            "type_summary": summary_lines,
+            "key_fix": key_fix,
+        }
+
+    # Wir nehmen die absolut schlechteste Kurve
+    worst_corner = tl_df.sort_values("TimeLoss", ascending=False).iloc[0]
 
     if worst_corner["TimeLoss"] > 0.05:
         c_fix = int(worst_corner["Corner"])
@@ -0,0 +1,221 @@
+"""
+Precomputed session snapshots.
+
+Everything the comparison page needs for any driver pair of a session is
+computed once at ingestion time and stored under cache/snapshots:
+
+    python -m src.insights.session_snapshot --year 2023 --track Silverstone --session Q
+"""
+
+import argparse
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.data.compare import compare_corner_features, process_telemetry
+from src.data.distance_grid import lap_length, resample_laps
+from src.data.load_data import (
+    cache_path,
+    hash_session_id,
+    load_field_telemetry,
+    load_session,
+)
+from src.insights.driver_dna import score_dna, session_dna_raw
+from src.insights.time_loss_engine import estimate_time_loss_per_corner
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+SNAPSHOT_VERSION = 3  # 3: time-based corner / smoothing windows
+SNAPSHOT_DIR = os.path.join(cache_path, "snapshots")
+GRID_CHANNELS = ("Speed", "Throttle", "Brake", "nGear", "RPM")
+
+
+def snapshot_dir(session) -> str:
+    """Folder of a session's snapshot, named after the session id."""
+    name = re.sub(r"[^A-Za-z0-9_-]+", "_", hash_session_id(session))
+    return os.path.join(SNAPSHOT_DIR, name)
+
+
+# ---------------------------------------------------------
+# 1. BUILD
+# ---------------------------------------------------------
+def build_session_snapshot(session, circuit: str, drivers=None) -> dict:
+    """
+    Precomputes for every driver's fastest lap:
+    - telemetry and corner features
+    - raw DNA metrics (scored on load, absolute or field-relative)
+    - all channels on one canonical distance grid (float32)
+    and for every ordered driver pair the corner comparison and the time
+    loss table, exactly as the live pipeline computes them.
+    """
+    field = load_field_telemetry(session)
+    if drivers is not None:
+        field = {code: tel for code, tel in field.items() if code in drivers}
+    if not field:
+        return None
+
+    codes = sorted(field)
+    features = {code: process_telemetry(field[code], code) for code in codes}
+
+    # Canonical grid: length of the session's fastest lap among the field
+    fastest = session.laps.pick_fastest()
+    ref_code = fastest["Driver"] if fastest is not None else codes[0]
+    grid, stack = resample_laps(
+        [field[c] for c in codes],
+        channels=GRID_CHANNELS,
+        length=lap_length(field.get(ref_code, field[codes[0]])),
+    )
+
+    pairs = {}
+    for a in codes:
+        for b in codes:
+            if a == b or features[a].empty or features[b].empty:
+                continue
+            comp = compare_corner_features(features[a], features[b], a, b)
+            tl = estimate_time_loss_per_corner(
+                comp, a, b, tel_a=field[a], tel_b=field[b], circuit=circuit
+            )
+            pairs[(a, b)] = (comp, tl)
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "session_id": hash_session_id(session),
+        "circuit": circuit,
+        "drivers": codes,
+        "telemetry": field,
+        "features": features,
+        "dna_raw": session_dna_raw(field),
+        "grid": grid,
+        "grid_stack": {ch: arr.astype(np.float32) for ch, arr in stack.items()},
+        "pairs": pairs,
+    }
+
+
+# ---------------------------------------------------------
+# 2. STORAGE
+# ---------------------------------------------------------
+def save_snapshot(snapshot: dict, folder: str):
+    """
+    Grid arrays go to a compressed .npz, the tables to a gzip pickle
+    (DataFrames only, no session objects).
+    """
+    os.makedirs(folder, exist_ok=True)
+    np.savez_compressed(
+        os.path.join(folder, "grid.npz"),
+        grid=snapshot["grid"],
+        drivers=np.array(snapshot["drivers"]),
+        **snapshot["grid_stack"],
+    )
+    tables = {k: v for k, v in snapshot.items() if k not in ("grid", "grid_stack")}
+    pd.to_pickle(tables, os.path.join(folder, "tables.pkl.gz"), compression="gzip")
+    return folder
+
+
+@st.cache_resource(show_spinner="Loading session snapshot...")
+def load_snapshot_folder(folder: str, mtime: float = None):
+    """
+    Reads a snapshot once per process (shared, not copied per rerun).
+    mtime is part of the cache key, so a rebuilt snapshot is picked up.
+    """
+    try:
+        snapshot = pd.read_pickle(os.path.join(folder, "tables.pkl.gz"))
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        with np.load(os.path.join(folder, "grid.npz")) as npz:
+            snapshot["grid"] = npz["grid"]
+            snapshot["grid_stack"] = {
+                k: npz[k] for k in npz.files if k not in ("grid", "drivers")
+            }
+        return snapshot
+    except Exception as e:
+        print(f"Snapshot Error ({folder}): {e}")
+        return None
+
+
+def get_snapshot(session):
+    """The session's snapshot if one was built, else None."""
+    if session is None:
+        return None
+    folder = snapshot_dir(session)
+    tables = os.path.join(folder, "tables.pkl.gz")
+    if not os.path.exists(tables):
+        return None
+    return load_snapshot_folder(folder, os.path.getmtime(tables))
+
+
+# ---------------------------------------------------------
+# 3. LOOKUPS
+# ---------------------------------------------------------
+def snapshot_pair(snapshot, driver_a: str, driver_b: str):
+    """
+    Precomputed results for a pair:
+    {"telA", "telB", "comp", "tl"} or None if the pair is not in the snapshot.
+    """
+    if not snapshot or (driver_a, driver_b) not in snapshot["pairs"]:
+        return None
+    comp, tl = snapshot["pairs"][(driver_a, driver_b)]
+    return {
+        "telA": snapshot["telemetry"][driver_a],
+        "telB": snapshot["telemetry"][driver_b],
+        "comp": comp,
+        "tl": tl,
+    }
+
+
+def snapshot_overlay(snapshot):
+    """Grid stack of the snapshot as an overlay (see src.data.overlay)."""
+    if not snapshot:
+        return None
+    return {
+        "grid": snapshot["grid"],
+        "labels": list(snapshot["drivers"]),
+        "stack": snapshot["grid_stack"],
+    }
+
+
+def snapshot_dna(snapshot, relative: bool = False):
+    """DNA table of the whole field from the stored raw metrics."""
+    if not snapshot or snapshot["dna_raw"].empty:
+        return None
+    return score_dna(snapshot["dna_raw"], relative=relative)
+
+
+# ---------------------------------------------------------
+# 4. CLI
+# ---------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a session snapshot.")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--track", required=True)
+    parser.add_argument("--session", default="Q")
+    args = parser.parse_args(argv)
+
+    session = load_session(args.year, args.track, args.session)
+    if session is None:
+        print("Session not available.")
+        return 1
+
+    t0 = time.perf_counter()
+    snapshot = build_session_snapshot(session, args.track)
+    if snapshot is None:
+        print("No telemetry for this session.")
+        return 1
+    folder = save_snapshot(snapshot, snapshot_dir(session))
+
+    size = (
+        sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder)) / 1e6
+    )
+    print(
+        f"{len(snapshot['drivers'])} drivers, {len(snapshot['pairs'])} pairs "
+        f"in {time.perf_counter() - t0:.1f}s -> {folder} ({size:.1f} MB)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
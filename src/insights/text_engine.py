@@ -1,3 +1,6 @@
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
 
@@ -16,98 +19,257 @@ def severity_level(delta, thresholds=(1.0, 3.0)):
         return "severe"
 
 
-def generate_corner_text_insights(df: pd.DataFrame, driver_a: str, driver_b: str):
-    """
-    Human-readable race-engineer insights for corner-by-corner deltas.
-    Prioritizes significant performance differences.
-    """
+def severity_levels(deltas, thresholds=(1.0, 3.0)):
+    """Vectorized severity_level for an array of deltas."""
+    low, high = thresholds
+    mag = np.abs(np.asarray(deltas, dtype=float))
+    return np.select([mag < low, mag < high], ["minor", "moderate"], "severe")
 
-    insights = []
 
-    # Score to rank importance of each corner
-    # Exit Speed is the most valuable (affects straight)
-    df["ImpactScore"] = (
+# ---------------------------------------------------------
+# 1. INSIGHT CATEGORIES
+# ---------------------------------------------------------
+# column, significance threshold, severity thresholds (None = no label),
+# always_report (emit a neutral record when below threshold)
+INSIGHT_CATEGORIES = {
+    "apex": ("Delta_ApexSpeed", 1.0, (1.0, 3.0), True),
+    "entry": ("Delta_EntrySpeed", 1.0, None, False),
+    "exit": ("Delta_ExitSpeed", 1.0, (1.0, 2.5), False),
+    "brake": ("Delta_AvgBrake", 0.1, None, False),
+    "throttle": ("Delta_ThrottleBelow30Pct", 0.05, None, False),
+}
+
+# Text per category and side: "A"/"B" = leading driver, None = no difference
+TEMPLATES = {
+    "apex": {
+        "A": "{leader} carries more apex speed (+{magnitude:.1f} km/h, {severity}).",
+        "B": "{leader} is faster at the apex (+{magnitude:.1f} km/h, {severity}).",
+        None: "Apex speed is similar.",
+    },
+    "entry": {
+        "A": "{leader} approaches faster (+{magnitude:.1f} km/h entry).",
+        "B": "{leader} approaches faster (+{magnitude:.1f} km/h entry).",
+    },
+    "exit": {
+        "A": "{leader} has stronger exit acceleration (+{magnitude:.1f} km/h, {severity}).",
+        "B": "{leader} has stronger exit acceleration (+{magnitude:.1f} km/h, {severity}).",
+    },
+    "brake": {
+        "A": "{leader} brakes harder.",
+        "B": "{leader} brakes harder.",
+    },
+    "throttle": {
+        "A": "{leader} hesitates more on throttle at the exit.",
+        "B": "{leader} hesitates more on throttle at the exit.",
+    },
+    "time_loss": {
+        "A": "In Corner {corner}, {trailer} loses ~{magnitude:.2f}s to {leader}.",
+        "B": "In Corner {corner}, {trailer} loses ~{magnitude:.2f}s to {leader}.",
+        None: "Corner {corner}: No meaningful time difference.",
+    },
+}
+
+RECORD_COLUMNS = [
+    "Corner",
+    "Category",
+    "Severity",
+    "Magnitude",
+    "Side",
+    "Leader",
+    "Trailer",
+    "ImpactScore",
+    "Rank",
+    "Order",
+]
+
+
+def impact_scores(df: pd.DataFrame) -> pd.Series:
+    """
+    Score to rank importance of each corner.
+    Exit Speed is the most valuable (affects straight).
+    """
+    return (
         df["Delta_ExitSpeed"].abs() * 2.0
         + df["Delta_ApexSpeed"].abs() * 1.5
         + df["Delta_EntrySpeed"].abs() * 1.0
     )
 
-    # Sort by most important differences (descending)
-    df = df.sort_values("ImpactScore", ascending=False)
-
-    for _, row in df.iterrows():
-        c = int(row["Corner"])
-
-        apex_delta = row["Delta_ApexSpeed"]
-        exit_delta = row["Delta_ExitSpeed"]
-        entry_delta = row["Delta_EntrySpeed"]
-        brake_delta = row["Delta_AvgBrake"]
-        throttle_low = row["Delta_ThrottleBelow30Pct"]
-
-        line = f"Corner {c}: "
-
-        # 1. Apex Speed
-        sev = severity_level(apex_delta)
-        if apex_delta > 1:
-            line += (
-                f"{driver_a} carries more apex speed (+{apex_delta:.1f} km/h, {sev}). "
-            )
-        elif apex_delta < -1:
-            line += (
-                f"{driver_b} is faster at the apex (+{-apex_delta:.1f} km/h, {sev}). "
-            )
-        else:
-            line += "Apex speed is similar. "
-
-        # 2. Entry Speed
-        if entry_delta > 1:
-            line += f"{driver_a} approaches faster (+{entry_delta:.1f} km/h entry). "
-        elif entry_delta < -1:
-            line += f"{driver_b} approaches faster (+{-entry_delta:.1f} km/h entry). "
-
-        # 3. Exit Speed (VERY IMPORTANT)
-        sev_exit = severity_level(exit_delta, thresholds=(1.0, 2.5))
-        if exit_delta > 1:
-            line += f"{driver_a} has stronger exit acceleration (+{exit_delta:.1f} km/h, {sev_exit}). "
-        elif exit_delta < -1:
-            line += f"{driver_b} has stronger exit acceleration (+{-exit_delta:.1f} km/h, {sev_exit}). "
-
-        # 4. Braking
-        if abs(brake_delta) > 0.1:
-            if brake_delta > 0:
-                line += f"{driver_a} brakes harder. "
-            else:
-                line += f"{driver_b} brakes harder. "
-
-        # 5. Throttle hesitation
-        if abs(throttle_low) > 0.05:
-            if throttle_low > 0:
-                line += f"{driver_a} hesitates more on throttle at the exit. "
-            else:
-                line += f"{driver_b} hesitates more on throttle at the exit. "
-
-        insights.append(line.strip())
-
-    return insights
 
+# ---------------------------------------------------------
+# 2. STRUCTURED RECORDS (COLUMNAR)
+# ---------------------------------------------------------
+def build_insight_records(
+    df: pd.DataFrame, driver_a: str, driver_b: str
+) -> pd.DataFrame:
+    """
+    Corner-by-corner insights as structured records (no text yet).
 
-def add_time_loss_to_text(df: pd.DataFrame, driver_a: str, driver_b: str):
+    One record per (corner, category) with a significant delta, plus a
+    neutral apex record for every corner. Corners are ranked by ImpactScore
+    (Rank 0 = most important); the caller's frame is not modified.
     """
-    Adds time loss information to the text insights.
+    if df is None or df.empty:
+        return pd.DataFrame(columns=RECORD_COLUMNS)
+
+    corners = df["Corner"].to_numpy().astype(int)
+    impact = impact_scores(df).to_numpy()
+    rank = np.empty(len(df), dtype=int)
+    rank[np.argsort(-impact, kind="stable")] = np.arange(len(df))
+
+    frames = []
+    for order, (category, spec) in enumerate(INSIGHT_CATEGORIES.items()):
+        col, threshold, sev_thresholds, always = spec
+        if col not in df.columns:
+            continue
+
+        delta = df[col].to_numpy(dtype=float)
+        significant = np.abs(delta) > threshold
+        keep = np.ones(len(df), dtype=bool) if always else significant
+        if not keep.any():
+            continue
+
+        side = np.where(significant, np.where(delta > 0, "A", "B"), None).astype(object)
+        severity = (
+            severity_levels(delta, sev_thresholds)
+            if sev_thresholds
+            else np.full(len(df), None, dtype=object)
+        )
+
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Corner": corners,
+                    "Category": category,
+                    "Severity": severity,
+                    "Magnitude": np.abs(delta),
+                    "Side": side,
+                    "ImpactScore": impact,
+                    "Rank": rank,
+                    "Order": order,
+                }
+            )[keep]
+        )
+
+    if not frames:
+        return pd.DataFrame(columns=RECORD_COLUMNS)
+
+    records = pd.concat(frames, ignore_index=True)
+    records = _assign_drivers(records, driver_a, driver_b)
+    return records.sort_values(["Rank", "Order"], kind="stable").reset_index(drop=True)[
+        RECORD_COLUMNS
+    ]
+
+
+def build_time_loss_records(
+    df: pd.DataFrame, driver_a: str, driver_b: str
+) -> pd.DataFrame:
+    """
+    One 'time_loss' record per corner (in the order of df).
+    TimeLoss > 0 means driver_a gains time.
     """
-    texts = []
+    if df is None or df.empty:
+        return pd.DataFrame(columns=RECORD_COLUMNS)
 
-    for _, row in df.iterrows():
-        c = int(row["Corner"])
-        loss = row["TimeLoss"]
+    loss = df["TimeLoss"].to_numpy(dtype=float)
+    side = np.select([loss > 0.01, loss < -0.01], ["A", "B"], "").astype(object)
+    side[side == ""] = None
 
-        if loss < -0.01:
-            text = f"In Corner {c}, {driver_a} loses ~{abs(loss):.2f}s to {driver_b}."
-        elif loss > 0.01:
-            text = f"In Corner {c}, {driver_b} loses ~{abs(loss):.2f}s to {driver_a}."
-        else:
-            text = f"Corner {c}: No meaningful time difference."
+    records = pd.DataFrame(
+        {
+            "Corner": df["Corner"].to_numpy().astype(int),
+            "Category": "time_loss",
+            "Severity": None,
+            "Magnitude": np.abs(loss),
+            "Side": side,
+            "ImpactScore": np.abs(loss),
+            "Rank": np.arange(len(df)),
+            "Order": 0,
+        }
+    )
+    return _assign_drivers(records, driver_a, driver_b)[RECORD_COLUMNS]
 
-        texts.append(text)
 
-    return texts
+def _assign_drivers(records, driver_a, driver_b):
+    """Leader = driver ahead in the metric, Trailer = the other one."""
+    side = records["Side"]
+    records["Leader"] = np.select([side == "A", side == "B"], [driver_a, driver_b], "")
+    records["Trailer"] = np.select([side == "A", side == "B"], [driver_b, driver_a], "")
+    return records
+
+
+# ---------------------------------------------------------
+# 3. LAZY TEXT RENDERING
+# ---------------------------------------------------------
+@lru_cache(maxsize=None)
+def _template(category, side):
+    """Bound formatter for one template (looked up once per process)."""
+    return TEMPLATES[category][side].format
+
+
+def render_records(records: pd.DataFrame):
+    """Renders each record to a sentence. Call only on displayed records."""
+    return [
+        _template(cat, side if isinstance(side, str) else None)(
+            corner=corner,
+            leader=leader,
+            trailer=trailer,
+            magnitude=mag,
+            severity=sev,
+        )
+        for corner, cat, side, leader, trailer, mag, sev in zip(
+            records["Corner"],
+            records["Category"],
+            records["Side"],
+            records["Leader"],
+            records["Trailer"],
+            records["Magnitude"],
+            records["Severity"],
+        )
+    ]
+
+
+def insight_page_count(records: pd.DataFrame, page_size: int = 5) -> int:
+    """Number of pages of corners for a records table."""
+    if records is None or records.empty:
+        return 0
+    n = records["Corner"].nunique()
+    return (n + page_size - 1) // page_size
+
+
+def render_corner_insights(records: pd.DataFrame, page: int = 0, page_size=None):
+    """
+    One line per corner ("Corner <n>: ..."), in ImpactScore order.
+    With page_size, only the corners of that page are rendered.
+    """
+    if records is None or records.empty:
+        return []
+
+    if page_size is not None:
+        lo, hi = page * page_size, (page + 1) * page_size
+        records = records[(records["Rank"] >= lo) & (records["Rank"] < hi)]
+
+    texts = pd.Series(render_records(records), index=records.index)
+    lines = texts.groupby(records["Rank"], sort=True).agg(" ".join)
+    corners = records.groupby("Rank", sort=True)["Corner"].first()
+
+    return ("Corner " + corners.astype(str) + ": " + lines).tolist()
+
+
+# ---------------------------------------------------------
+# 4. PUBLIC TEXT API
+# ---------------------------------------------------------
+def generate_corner_text_insights(df: pd.DataFrame, driver_a: str, driver_b: str):
+    """
+    Human-readable race-engineer insights for corner-by-corner deltas.
+    Prioritizes significant performance differences.
+    """
+    records = build_insight_records(df, driver_a, driver_b)
+    return render_corner_insights(records)
+
+
+def add_time_loss_to_text(df: pd.DataFrame, driver_a: str, driver_b: str):
+    """
+    Adds time loss information to the text insights.
+    """
+    records = build_time_loss_records(df, driver_a, driver_b)
+    return render_records(records)
@@ -1,44 +1,391 @@
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
+from src.data.distance_grid import GRID_STEP, elapsed_time, lap_length, resample_laps
+from src.data.feature_engineering import corner_boundaries
+from src.data.preprocess import preprocess_telemetry
+from src.insights.time_loss_model import FEATURES, corner_weights
+
+PHASES = ["Braking", "MidCorner", "Traction"]
+THROTTLE_ON_PCT = 50  # traction phase starts once both drivers are above this
+
+# Uncertainty mode (bootstrap over each driver's top laps)
+TOP_LAPS = 5
+BOOTSTRAP_SAMPLES = 2000
+CONFIDENCE = 0.9
+MAX_WORKERS = 4
+
+
+# ---------------------------------------------------------
+# 1. CORNER PHASE WINDOWS (COMMON GRID)
+# ---------------------------------------------------------
+def corner_phase_windows(reference_tel, grid, brake, throttle):
+    """
+    Splits the whole lap into one zone per corner, each with three phases
+    (grid indices):
+
+    - Braking:   corner entry -> last braking point before the apex
+    - MidCorner: brake release -> throttle pickup after the apex
+    - Traction:  throttle pickup -> entry of the next corner
+
+    The zone of the last corner wraps over the finish line to the first
+    entry, so the zones cover the lap exactly once.
+
+    brake / throttle: (n_laps, G) channels on the grid; phases use the
+    envelope of all laps (braking while anyone brakes, traction once
+    everyone is on throttle) so the windows are identical for every lap.
+    """
+    tel = preprocess_telemetry(reference_tel)
+    bounds = corner_boundaries(tel)
+    if bounds.empty:
+        return pd.DataFrame()
+
+    scale = grid[-1] / lap_length(tel)
+    apex = np.searchsorted(grid, bounds["ApexDistance"].to_numpy() * scale)
+    entry = np.searchsorted(grid, bounds["EntryDistance"].to_numpy() * scale)
+    exit = np.searchsorted(grid, bounds["ExitDistance"].to_numpy() * scale)
+    apex = np.clip(apex, 0, len(grid) - 1)
+
+    # Zones must not overlap: a zone starts no earlier than the previous apex
+    entry = np.minimum(entry, apex)
+    entry[1:] = np.maximum(entry[1:], apex[:-1])
+
+    idx = np.arange(len(grid))
+    braking = np.nanmax(np.nan_to_num(brake, nan=0.0), axis=0) > 0
+    throttle_on = np.nanmin(np.nan_to_num(throttle, nan=0.0), axis=0) >= THROTTLE_ON_PCT
+
+    # Last braking index at or before each point / first throttle index after
+    last_brake = np.maximum.accumulate(np.where(braking, idx, -1))
+    next_throttle = np.minimum.accumulate(np.where(throttle_on, idx, len(grid))[::-1])[
+        ::-1
+    ]
+
+    next_entry = np.append(entry[1:], entry[0] + len(grid) - 1)
+    brake_end = np.clip(last_brake[apex], entry, apex)
+    throttle_pickup = np.minimum(next_throttle[apex], next_entry)
+    exit = np.clip(exit, apex, np.minimum(next_entry, len(grid) - 1))
+
+    return pd.DataFrame(
+        {
+            "Corner": bounds["Corner"].to_numpy(),
+            "EntryIdx": entry,
+            "ApexIdx": apex,
+            "ExitIdx": exit,
+            "BrakeEndIdx": brake_end,
+            "ThrottleIdx": throttle_pickup,
+            "NextEntryIdx": next_entry,
+            "EntryDistance": grid[entry],
+            "ApexDistance": grid[apex],
+            "BrakeEndDistance": grid[brake_end],
+            "ThrottleDistance": grid[np.minimum(throttle_pickup, len(grid) - 1)],
+        }
+    )
+
+
+def corner_phase_times(tels, reference=0, step=GRID_STEP, windows=None, length=None):
+    """
+    Time spent in every corner phase for several laps at once.
+
+    All laps are resampled onto the grid of tels[reference], elapsed time is
+    integrated from dDistance / Speed, and phase times are differences of
+    that cumulative time at the window bounds (vectorized over laps and
+    corners).
+
+    windows / length: reuse windows computed earlier on a grid of that
+    length, so laps processed in separate batches share the same corners.
 
-def estimate_time_loss_per_corner(df: pd.DataFrame, driver_a: str, driver_b: str):
+    Returns:
+        windows: DataFrame from corner_phase_windows
+        times:   (n_laps, n_corners, 3) seconds per phase (PHASES order)
+        lap:     (n_laps,) integrated lap time; times.sum((1, 2)) == lap
+        speeds:  (n_laps, n_corners, 3) entry / apex (minimum) / exit speed
+                 of every lap inside the reference corner windows
     """
-    Estimates time loss per corner using weighted deltas:
-    Entry, Apex, Exit Speed.
+    grid, stack = resample_laps(
+        tels,
+        channels=("Speed", "Brake", "Throttle"),
+        length=lap_length(tels[reference]) if length is None else length,
+        step=step,
+    )
+    if windows is None:
+        windows = corner_phase_windows(
+            tels[reference], grid, stack["Brake"], stack["Throttle"]
+        )
+    t = elapsed_time(stack["Speed"], grid)
+    if windows.empty:
+        empty = np.zeros((len(tels), 0, 3))
+        return windows, empty, t[:, -1], empty
+
+    # Continue the elapsed time over a second lap for the wrap-around zone
+    t_ext = np.concatenate([t, t[:, -1:] + t[:, 1:]], axis=1)
+
+    edges = windows[["EntryIdx", "BrakeEndIdx", "ThrottleIdx", "NextEntryIdx"]]
+    at = t_ext[:, edges.to_numpy()]  # (n_laps, n_corners, 4)
+
+    speed = stack["Speed"]
+    speeds = np.stack(
+        [
+            speed[:, windows["EntryIdx"].to_numpy()],
+            np.column_stack(
+                [
+                    speed[:, e : x + 1].min(axis=1)
+                    for e, x in zip(windows["EntryIdx"], windows["ExitIdx"])
+                ]
+            ),
+            speed[:, windows["ExitIdx"].to_numpy()],
+        ],
+        axis=2,
+    )
+    return windows, np.diff(at, axis=2), t[:, -1], speeds
+
+
+def compute_corner_time_splits(tel_a, tel_b) -> pd.DataFrame:
+    """
+    Per-corner, per-phase time deltas from integrated elapsed time.
+    Positive = driver A faster (gains time), like TimeLoss.
+
+    The corner zones partition the lap, so TimeLoss summed over all corners
+    equals the integrated lap time delta exactly.
+    """
+    if tel_a is None or tel_b is None or tel_a.empty or tel_b.empty:
+        return pd.DataFrame()
+
+    windows, times, lap, _ = corner_phase_times([tel_a, tel_b], reference=0)
+    if windows.empty:
+        return pd.DataFrame()
+
+    delta = times[1] - times[0]  # B - A
+    out = windows[
+        ["Corner", "EntryDistance", "ApexDistance", "BrakeEndDistance"]
+        + ["ThrottleDistance"]
+    ].copy()
+    for i, phase in enumerate(PHASES):
+        out[f"TimeLoss_{phase}"] = delta[:, i]
+    out["CornerTime_A"] = times[0].sum(axis=1)
+    out["CornerTime_B"] = times[1].sum(axis=1)
+    out["TimeLoss"] = delta.sum(axis=1)
+    out.attrs["LapDelta"] = float(lap[1] - lap[0])
+    return out
+
+
+# ---------------------------------------------------------
+# 2. UNCERTAINTY (BOOTSTRAP OVER TOP LAPS)
+# ---------------------------------------------------------
+def split_laps(stacked: pd.DataFrame, order="LapRank"):
+    """Stacked lap telemetry (LapNumber column) -> list of per-lap frames."""
+    if stacked is None or stacked.empty:
+        return []
+    key = order if order in stacked.columns else "LapNumber"
+    return [lap.reset_index(drop=True) for _, lap in stacked.groupby(key, sort=True)]
+
+
+def _corner_times(tels, windows, length):
+    """Worker: (n_laps, n_corners) corner times on the shared windows."""
+    _, times, _, _ = corner_phase_times(tels, windows=windows, length=length)
+    return times.sum(axis=2)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _worker_pool():
+    """
+    One long-lived process pool. Workers are spawned, not forked: forking
+    the multi-threaded Streamlit server can deadlock.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=min(MAX_WORKERS, os.cpu_count() or 1),
+                mp_context=mp.get_context("spawn"),
+            )
+        return _pool
+
+
+def corner_times_for_laps(lap_groups, windows, length, parallel=False):
+    """
+    Corner times for several groups of laps (one group per driver).
+
+    With parallel=True (batch / CLI use) each group runs in a worker of a
+    shared spawn pool; the default in-process path is cheaper for the few
+    laps of an interactive comparison. Falls back to the current process
+    if the pool fails.
+    """
+    if not parallel or len(lap_groups) < 2:
+        return [_corner_times(g, windows, length) for g in lap_groups]
+
+    try:
+        pool = _worker_pool()
+        futures = [pool.submit(_corner_times, g, windows, length) for g in lap_groups]
+        return [f.result() for f in futures]
+    except Exception as e:
+        print(f"Bootstrap Pool Error: {e}")
+        return [_corner_times(g, windows, length) for g in lap_groups]
+
+
+def bootstrap_mean_delta(
+    times_a, times_b, n_boot=BOOTSTRAP_SAMPLES, confidence=CONFIDENCE, seed=0
+):
+    """
+    Bootstrap distribution of mean(B) - mean(A) per corner.
+
+    All resamples are drawn at once as index matrices, so the whole
+    bootstrap is a few array operations: (n_boot, n_laps) indices ->
+    (n_boot, n_corners) deltas.
+
+    Returns (mean, low, high, std) arrays over corners.
+    """
+    rng = np.random.default_rng(seed)
+    idx_a = rng.integers(0, len(times_a), size=(n_boot, len(times_a)))
+    idx_b = rng.integers(0, len(times_b), size=(n_boot, len(times_b)))
+
+    deltas = times_b[idx_b].mean(axis=1) - times_a[idx_a].mean(axis=1)
+
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(deltas, [tail, 1 - tail], axis=0)
+    return deltas.mean(axis=0), low, high, deltas.std(axis=0)
+
+
+def bootstrap_time_loss(
+    tel_a,
+    tel_b,
+    laps_a,
+    laps_b,
+    n_boot=BOOTSTRAP_SAMPLES,
+    confidence=CONFIDENCE,
+    parallel=False,
+) -> pd.DataFrame:
+    """
+    Per-corner time-loss intervals from each driver's top laps.
+
+    The corner windows come from the compared laps (tel_a / tel_b), exactly
+    as in compute_corner_time_splits, and are applied to every lap in
+    laps_a / laps_b. A driver with a single lap (e.g. the ideal lap)
+    contributes no spread.
+
+    Positive = driver A faster, like TimeLoss.
+    Returns: Corner, TimeLoss_Mean, TimeLoss_Low, TimeLoss_High, TimeLoss_Std
+    """
+    if tel_a is None or tel_b is None or tel_a.empty or tel_b.empty:
+        return pd.DataFrame()
+
+    laps_a = laps_a or [tel_a]
+    laps_b = laps_b or [tel_b]
+
+    length = lap_length(tel_a)
+    grid, stack = resample_laps(
+        [tel_a, tel_b], channels=("Brake", "Throttle"), length=length
+    )
+    windows = corner_phase_windows(tel_a, grid, stack["Brake"], stack["Throttle"])
+    if windows.empty:
+        return pd.DataFrame()
+
+    times_a, times_b = corner_times_for_laps(
+        [laps_a, laps_b], windows, length, parallel
+    )
+    mean, low, high, std = bootstrap_mean_delta(times_a, times_b, n_boot, confidence)
+
+    return pd.DataFrame(
+        {
+            "Corner": windows["Corner"].to_numpy(),
+            "TimeLoss_Mean": mean,
+            "TimeLoss_Low": low,
+            "TimeLoss_High": high,
+            "TimeLoss_Std": std,
+        }
+    )
+
+
+def interval_crosses_zero(df: pd.DataFrame) -> pd.Series:
+    """True where the TimeLoss interval includes zero (sign is uncertain)."""
+    if "TimeLoss_Low" not in df.columns or "TimeLoss_High" not in df.columns:
+        return pd.Series(False, index=df.index)
+    return (df["TimeLoss_Low"] <= 0) & (df["TimeLoss_High"] >= 0)
+
+
+# ---------------------------------------------------------
+# 3. TIME LOSS PER CORNER
+# ---------------------------------------------------------
+def estimate_time_loss_per_corner(
+    df: pd.DataFrame,
+    driver_a: str,
+    driver_b: str,
+    tel_a=None,
+    tel_b=None,
+    circuit: str = None,
+    laps_a=None,
+    laps_b=None,
+):
+    """
+    Estimates time loss per corner.
     Positive = driver_a faster (gaining time)
     Negative = driver_b faster (losing time)
+
+    With tel_a / tel_b (lap telemetry) the time loss is the integrated
+    elapsed-time delta per corner zone, split into braking / mid-corner /
+    traction (see compute_corner_time_splits), and sums to the lap delta.
+    Without telemetry it falls back to weighted Entry, Apex, Exit deltas
+    (TimeLossEstimate), with weights calibrated per circuit and corner type
+    when a model is available (see calibrate_time_loss).
+
+    Uncertainty mode: with laps_a / laps_b (each driver's top laps, see
+    split_laps) the output also has bootstrap intervals TimeLoss_Mean /
+    _Low / _High / _Std and TimeLoss_Uncertain (interval crosses zero).
     """
     if df is None or df.empty:
         return pd.DataFrame()
 
     df = df.copy()
 
+    splits = compute_corner_time_splits(tel_a, tel_b)
+    if not splits.empty:
+        df = splits.merge(df, on="Corner", how="left").sort_values("Corner")
+        df = df.reset_index(drop=True)
+
+    if laps_a or laps_b:
+        intervals = bootstrap_time_loss(tel_a, tel_b, laps_a, laps_b)
+        if not intervals.empty:
+            df = df.merge(intervals, on="Corner", how="left")
+            df["TimeLoss_Uncertain"] = interval_crosses_zero(df)
+
+    if not splits.empty:
+        df.attrs["LapDelta"] = splits.attrs["LapDelta"]
+
     # ---------------------------------------------------------
     # 1. FORMULA LOGIC (Weighting factors)
     # ---------------------------------------------------------
-    w_entry = 0.015  # sec per km/h
-    w_apex = 0.030
-    w_exit = 0.060
-
     # Safety check: Ensure columns exist before calculation
-    required_cols = ["Delta_EntrySpeed", "Delta_ApexSpeed", "Delta_ExitSpeed"]
-    for col in required_cols:
+    for col in FEATURES:
         if col not in df.columns:
             df[col] = 0.0
 
-    df["TimeLoss"] = (
-        df["Delta_EntrySpeed"] * w_entry
-        + df["Delta_ApexSpeed"] * w_apex
-        + df["Delta_ExitSpeed"] * w_exit
+    # Seconds per km/h, per corner (calibrated model or defaults)
+    apex_col = next(
+        (c for c in ["ApexSpeed_A", "Speed_1", "Speed_A"] if c in df.columns), None
+    )
+    apex_speed = df[apex_col] if apex_col else np.full(len(df), np.nan)
+    weights = corner_weights(apex_speed, circuit)
+
+    df["TimeLossEstimate"] = np.einsum(
+        "ij,ij->i", df[FEATURES].to_numpy(dtype=float), weights
     )
+    if splits.empty:
+        df["TimeLoss"] = df["TimeLossEstimate"]
 
     # ---------------------------------------------------------
     # 2. DIRECTION LOGIC
     # ---------------------------------------------------------
     # Negative TimeLoss means Driver A is slower (loses time)
     # Positive TimeLoss means Driver A is faster (gains time)
-    df["TimeLossSeconds_A_loses"] = df["TimeLoss"].apply(lambda x: -x if x < 0 else 0)
-    df["TimeGainSeconds_A_gains"] = df["TimeLoss"].apply(lambda x: x if x > 0 else 0)
+    df["TimeLossSeconds_A_loses"] = (-df["TimeLoss"]).clip(lower=0)
+    df["TimeGainSeconds_A_gains"] = df["TimeLoss"].clip(lower=0)
 
     # ---------------------------------------------------------
     # 3. PREPARE FOR CLASSIFICATION (CRITICAL FIX)
@@ -0,0 +1,219 @@
+import json
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from src.insights.corner_utils import classify_corner_types
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+MODEL_VERSION = 1
+MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data",
+    "models",
+    "time_loss_weights.json",
+)
+
+WEIGHT_NAMES = ["entry", "apex", "exit"]
+FEATURES = ["Delta_EntrySpeed", "Delta_ApexSpeed", "Delta_ExitSpeed"]
+
+# Seconds per km/h of speed delta (A - B), used when no model is available
+DEFAULT_WEIGHTS = np.array([0.015, 0.030, 0.060])
+
+ALL_CORNERS = "All"
+MIN_SAMPLES = 30  # smaller groups fall back to the next coarser level
+
+
+# ---------------------------------------------------------
+# 1. FITTING (GROUPED LEAST SQUARES)
+# ---------------------------------------------------------
+def fit_grouped_weights(X, y, groups, min_samples: int = MIN_SAMPLES):
+    """
+    Least-squares weights (no intercept) for every group at once.
+
+    The normal equations X'X w = X'y are accumulated per group with one
+    scatter-add and solved as a batch, so the cost is one pass over the
+    samples regardless of the number of groups.
+
+    X: (n, k) speed deltas, y: (n,) time deltas, groups: (n,) labels
+    Returns DataFrame: Group, Samples, weights..., R2, RMSE
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ok = np.isfinite(X).all(axis=1) & np.isfinite(y)
+    X, y, groups = X[ok], y[ok], np.asarray(groups, dtype=object)[ok]
+
+    labels, codes = np.unique(groups.astype(str), return_inverse=True)
+    g, k = len(labels), X.shape[1]
+
+    xtx = np.zeros((g, k, k))
+    xty = np.zeros((g, k))
+    yy = np.zeros(g)
+    ys = np.zeros(g)
+    np.add.at(xtx, codes, X[:, :, None] * X[:, None, :])
+    np.add.at(xty, codes, X * y[:, None])
+    np.add.at(yy, codes, y * y)
+    np.add.at(ys, codes, y)
+    n = np.bincount(codes, minlength=g)
+
+    w = np.einsum("gij,gj->gi", np.linalg.pinv(xtx), xty)
+
+    # Residual and total sum of squares from the same accumulated sums
+    sse = yy - 2 * np.einsum("gi,gi->g", w, xty) + np.einsum("gi,gij,gj->g", w, xtx, w)
+    sst = yy - ys**2 / np.maximum(n, 1)
+    sse = np.maximum(sse, 0.0)
+
+    out = pd.DataFrame({"Group": labels, "Samples": n})
+    for i, name in enumerate(WEIGHT_NAMES):
+        out[name] = w[:, i]
+    out["R2"] = 1 - sse / np.where(sst > 0, sst, np.nan)
+    out["RMSE"] = np.sqrt(sse / np.maximum(n, 1))
+    return out[out["Samples"] >= min_samples].reset_index(drop=True)
+
+
+def fit_time_loss_model(samples: pd.DataFrame, min_samples: int = MIN_SAMPLES):
+    """
+    Fits weights per circuit and corner type from calibration samples.
+
+    samples: one row per (lap, corner) with Circuit, CornerType, the FEATURES
+    (speed deltas vs. a reference lap) and TimeLoss (measured corner time
+    delta, positive = lap faster than the reference).
+
+    Levels (most to least specific, all fitted in one call each):
+    circuits/<circuit>/<type>, circuits/<circuit>/All, corner_types/<type>,
+    default.
+    """
+    X = samples[FEATURES].to_numpy(dtype=float)
+    y = samples["TimeLoss"].to_numpy(dtype=float)
+    circuit = samples["Circuit"].astype(str).to_numpy()
+    ctype = samples["CornerType"].astype(str).to_numpy()
+
+    levels = {
+        "circuit_type": fit_grouped_weights(X, y, circuit + "|" + ctype, min_samples),
+        "circuit": fit_grouped_weights(X, y, circuit + "|" + ALL_CORNERS, min_samples),
+        "type": fit_grouped_weights(X, y, ctype, min_samples),
+        "default": fit_grouped_weights(X, y, np.full(len(y), ALL_CORNERS), min_samples),
+    }
+
+    model = {
+        "version": MODEL_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "features": WEIGHT_NAMES,
+        "samples": int(len(samples)),
+        "default": None,
+        "corner_types": {},
+        "circuits": {},
+    }
+
+    for row in levels["default"].itertuples(index=False):
+        model["default"] = _entry(row)
+    for row in levels["type"].itertuples(index=False):
+        model["corner_types"][row.Group] = _entry(row)
+    for level in ("circuit", "circuit_type"):
+        for row in levels[level].itertuples(index=False):
+            name, ctype_name = row.Group.split("|", 1)
+            model["circuits"].setdefault(name, {})[ctype_name] = _entry(row)
+
+    return model
+
+
+def _entry(row):
+    """One fitted group as a JSON-friendly dict."""
+    return {
+        "weights": [float(getattr(row, name)) for name in WEIGHT_NAMES],
+        "samples": int(row.Samples),
+        "r2": None if pd.isna(row.R2) else round(float(row.R2), 4),
+        "rmse": round(float(row.RMSE), 5),
+    }
+
+
+def model_report(model: dict) -> pd.DataFrame:
+    """Fit quality of every group of a model as a flat table."""
+    rows = []
+    if model.get("default"):
+        rows.append(("*", ALL_CORNERS, model["default"]))
+    rows += [("*", t, e) for t, e in model.get("corner_types", {}).items()]
+    rows += [
+        (c, t, e)
+        for c, types in model.get("circuits", {}).items()
+        for t, e in types.items()
+    ]
+    return pd.DataFrame(
+        [
+            {
+                "Circuit": c,
+                "CornerType": t,
+                "Samples": e["samples"],
+                **dict(zip(WEIGHT_NAMES, e["weights"])),
+                "R2": e["r2"],
+                "RMSE": e["rmse"],
+            }
+            for c, t, e in rows
+        ]
+    )
+
+
+# ---------------------------------------------------------
+# 2. PERSISTENCE
+# ---------------------------------------------------------
+def save_time_loss_model(model: dict, path: str = MODEL_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(model, f, indent=2)
+    load_time_loss_model.cache_clear()
+    return path
+
+
+@lru_cache(maxsize=None)
+def load_time_loss_model(path: str = MODEL_PATH) -> dict:
+    """Reads the calibrated model (cached per process); {} if unavailable."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            model = json.load(f)
+    except Exception as e:
+        print(f"Time Loss Model Error: {e}")
+        return {}
+    if model.get("version") != MODEL_VERSION:
+        print(f"Time Loss Model: unsupported version {model.get('version')}")
+        return {}
+    return model
+
+
+# ---------------------------------------------------------
+# 3. LOOKUP
+# ---------------------------------------------------------
+def corner_weights(apex_speeds, circuit: str = None, model: dict = None):
+    """
+    Weights (n, 3) for corners with the given apex speeds.
+
+    Falls back from circuit + corner type to circuit, corner type, the
+    global fit and finally DEFAULT_WEIGHTS.
+    """
+    model = load_time_loss_model() if model is None else model
+    types = classify_corner_types(apex_speeds)
+
+    fallback = DEFAULT_WEIGHTS
+    if model.get("default"):
+        fallback = np.array(model["default"]["weights"])
+
+    circuit_fits = model.get("circuits", {}).get(circuit, {}) if circuit else {}
+    if ALL_CORNERS in circuit_fits:
+        fallback = np.array(circuit_fits[ALL_CORNERS]["weights"])
+
+    weights = np.tile(fallback, (len(types), 1))
+    for ctype in np.unique(types):
+        fit = circuit_fits.get(ctype) or (
+            None
+            if ALL_CORNERS in circuit_fits
+            else model.get("corner_types", {}).get(ctype)
+        )
+        if fit:
+            weights[types == ctype] = fit["weights"]
+    return weights